@@ -0,0 +1,109 @@
+"""
+Runs the benchmark suite, writing machine-readable results.
+
+    python -m benchmarks                          # everything, JSON to stdout
+    python -m benchmarks -o results.json          # ... or to a file
+    python -m benchmarks --quick models server    # a quick run of just some benchmarks
+    python -m benchmarks --compare old.json new.json
+
+Results are keyed by benchmark, then by case. Every "*_seconds" and "*_bytes" metric is lower-is-better, which is
+what ``--compare`` uses to spot regressions between two result files (e.g. from two toppy versions). Anything else
+(counts, rates, savings) is informational, so higher-is-better values must not use those suffixes.
+"""
+import datetime
+import importlib
+import json
+import platform
+import sys
+from argparse import ArgumentParser
+from typing import Dict, Iterator, Tuple
+
+import toppy.client
+
+BENCHMARKS = ("client", "models", "ratelimiter", "server", "intern", "serialization")
+
+
+def _metadata(scale: float) -> dict:
+    import aiohttp
+    import discord
+
+    return {
+        "toppy_version": toppy.client.__version__,
+        "python_version": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "aiohttp_version": aiohttp.__version__,
+        "discord_version": discord.__version__,
+        "scale": scale,
+        "started_at": datetime.datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def _metrics(results: dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _metrics(value, name)
+        elif isinstance(value, (int, float)) and key.endswith(("_seconds", "_bytes")):
+            yield name, value
+
+
+def compare(base: dict, new: dict, threshold: float) -> int:
+    """Prints every lower-is-better metric that changed by more than ``threshold``, returning how many regressed."""
+    old_metrics: Dict[str, float] = dict(_metrics(base["results"]))
+    regressions = 0
+    print(f"{base['meta']['toppy_version']} -> {new['meta']['toppy_version']}")
+    for name, value in _metrics(new["results"]):
+        old = old_metrics.get(name)
+        if not old or value < 0 or old < 0:
+            continue
+        ratio = value / old
+        if ratio > 1 + threshold:
+            regressions += 1
+            print(f"  REGRESSED {name}: {old:.6g} -> {value:.6g} ({ratio:.2f}x)")
+        elif ratio < 1 - threshold:
+            print(f"  improved  {name}: {old:.6g} -> {value:.6g} ({ratio:.2f}x)")
+    print(f"{regressions} regression(s) over {threshold:.0%}.")
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(prog="python -m benchmarks", description="top.py benchmark suite")
+    parser.add_argument("benchmarks", nargs="*", help=f"Which benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("-o", "--output", help="Where to write the JSON results (default: stdout)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for every workload size")
+    parser.add_argument("--quick", action="store_true", help="Shorthand for --scale 0.1")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files instead of running anything"
+    )
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change to report with --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        files = []
+        for path in args.compare:
+            with open(path) as file:
+                files.append(json.load(file))
+        sys.exit(1 if compare(*files, args.threshold) else 0)
+
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    scale = 0.1 if args.quick else args.scale
+    report = {"meta": _metadata(scale), "results": {}}
+    for name in args.benchmarks or BENCHMARKS:
+        print(f"Running {name}...", file=sys.stderr)
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        report["results"][name] = module.run(scale)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Stand-ins for a discord bot, for benchmarking without logging in to discord."""
+from typing import Dict, List
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+class FakeGuild:
+    __slots__ = ("id", "shard_id")
+
+    def __init__(self, guild_id: int, shard_id: int):
+        self.id = guild_id
+        self.shard_id = shard_id
+
+
+class FakeShard:
+    def __init__(self, shard_id: int):
+        self.id = shard_id
+
+
+class FakeBot:
+    """Just enough of discord.Client (or AutoShardedClient, if ``shard_count`` > 1) for toppy."""
+
+    def __init__(self, guild_count: int = 0, shard_count: int = 1, user_id: int = 619328560141697036):
+        self.user = FakeUser(user_id)
+        self.guilds: List[FakeGuild] = [FakeGuild(n, n % shard_count) for n in range(guild_count)]
+        self.shard_count = shard_count
+        self.shards: Dict[int, FakeShard] = (
+            {n: FakeShard(n) for n in range(shard_count)} if shard_count > 1 else {}
+        )
+        self.dispatched = 0
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def wait_until_ready(self):
+        return
+
+    def dispatch(self, event: str, *args, **kwargs):
+        self.dispatched += 1
+
+    def get_user(self, user_id: int):
+        return None
+
+    def get_guild(self, guild_id: int):
+        return None
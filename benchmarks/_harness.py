@@ -0,0 +1,78 @@
+"""Small timing helpers shared by the benchmarks."""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, TypeVar
+
+from toppy.ratelimiter import routes
+
+
+T = TypeVar("T")
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Runs a coroutine on a fresh event loop, closing it afterwards. Like :func:`asyncio.run`, which is 3.7+."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def scaled(count: int, scale: float) -> int:
+    """Scales a workload size, never going below one."""
+    return max(1, int(count * scale))
+
+
+def summarise(samples: List[float]) -> Dict[str, float]:
+    """Turns a list of per-operation durations (in seconds) into the summary every benchmark reports."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    return {
+        "count": len(ordered),
+        "mean_seconds": total / len(ordered),
+        "min_seconds": ordered[0],
+        "p50_seconds": percentile(0.50),
+        "p99_seconds": percentile(0.99),
+        "ops_per_second": len(ordered) / total if total else float("inf"),
+    }
+
+
+def measure(func: Callable[[], object], count: int) -> Dict[str, float]:
+    """Calls ``func`` ``count`` times, timing each call."""
+    samples = []
+    clock = time.perf_counter
+    for _ in range(count):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    return summarise(samples)
+
+
+async def measure_async(func: Callable[[], Awaitable[object]], count: int) -> Dict[str, float]:
+    """Awaits ``func()`` ``count`` times, timing each call."""
+    samples = []
+    clock = time.perf_counter
+    for _ in range(count):
+        start = clock()
+        await func()
+        samples.append(clock() - start)
+    return summarise(samples)
+
+
+@contextmanager
+def unlimited_ratelimits():
+    """Lifts the internal ratelimiter for the duration of a benchmark, restoring it (and its hits) afterwards."""
+    saved = {name: (route.max_hits, route.hits, route.expires) for name, route in routes.items()}
+    for route in routes.values():
+        route.max_hits = float("inf")
+    try:
+        yield
+    finally:
+        for name, (max_hits, hits, expires) in saved.items():
+            routes[name].max_hits, routes[name].hits, routes[name].expires = max_hits, hits, expires
@@ -0,0 +1,91 @@
+"""
+The model constructors as they were before models were declared through a schema, kept so the benchmarks can
+compare against them. Don't use these anywhere else.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from discord import User as DiscordUser
+from discord.colour import Colour
+from discord.utils import oauth_url as invite
+
+from toppy.models import Bot, SimpleUser, User
+from toppy.models.intern import _no_intern
+from toppy.models.user import calculate_avatar_url, default_avatar_url
+
+_ALWAYS_DECODED = frozenset(("id", "state", "interner"))
+
+
+class LegacySimpleUser(SimpleUser):
+    def __init__(self, **kwargs):
+        _intern = kwargs.get("interner") or _no_intern
+        self.id: int = int(kwargs.pop("id"))
+        self.discriminator: str = _intern(kwargs.get("discriminator", "#0000"))
+        self.username: str = kwargs.get("username")
+        self.avatar: Optional[str] = _intern(
+            calculate_avatar_url(self.id, int(self.discriminator[1:]), kwargs.get("avatar", None))
+        )
+
+
+class LegacyUser(User):
+    def __init__(self, **kwargs):
+        self._id: int = int(kwargs.pop("id"))
+        self._username: str = kwargs.get("username")
+        self._discriminator: str = kwargs.get("discriminator")
+        self._default_avatar: str = default_avatar_url(int(self._discriminator))
+        self._avatar: str = kwargs.get("avatar", None)
+        self._bio: Optional[str] = kwargs.get("bio", None)
+        self._banner_url: Optional[str] = kwargs.get("banner", None)
+        self._socials = kwargs.get("social", {})
+        self._raw_colour = (kwargs.get("color", "0") or "0").lstrip("#")  # can be empty, for some reason.
+        self._colour: Colour = Colour(int(self._raw_colour, base=16))
+        self._supporter: bool = kwargs.get("supporter", False)
+        self._site_mod: bool = kwargs.get("mod") or kwargs.get("webMod")  # these are the same thing as far as I'm aware
+        self._site_admin: bool = kwargs.get("admin", False)
+        self._certified: bool = kwargs.get("certified", False)  # if the user has a certified bot
+        if kwargs.get("state"):
+            self._user: Optional[DiscordUser] = kwargs["state"].get_user(self.id)
+        else:
+            self._user: Optional[DiscordUser] = None
+
+
+class LegacyBot(Bot):
+    def __init__(self, **kwargs):
+        fields = kwargs.pop("fields", None)
+        if fields is not None:
+            kwargs = {key: value for key, value in kwargs.items() if key in fields or key in _ALWAYS_DECODED}
+        _intern = kwargs.get("interner") or _no_intern
+        self.id: int = int(kwargs.pop("id"))
+        self.username: str = kwargs.get("username")
+        self.discriminator: str = _intern(kwargs.get("discriminator"))
+        self.user_avatar: Optional[str] = kwargs.get("avatar", None)
+        self.default_avatar: str = _intern(kwargs.get("defAvatar"))
+        self.avatar: str = self.user_avatar or self.default_avatar
+
+        self.prefix: str = _intern(kwargs.get("prefix"))
+        self.library: Optional[str] = _intern(kwargs.get("lib", None))
+        self.short_description: str = kwargs.get("shortdesc")
+        self.long_description: Optional[str] = kwargs.get("longdesc", None)  # NOTE: this can be empty for some reason
+        self.tags: List[str] = [_intern(tag) for tag in kwargs.get("tags", [])]
+        self.website: Optional[str] = kwargs.get("website", None)
+        self.support: Optional[str] = kwargs.get("support", None)
+        self.github: Optional[str] = kwargs.get("github", None)
+        self.owners: List[int] = list(map(int, kwargs.get("owners", [])))
+        self.featured_guilds: List[int] = list(map(int, kwargs.get("guilds", [])))
+        self.invite: str = kwargs.get("invite", None) or invite(str(self.id))
+        try:
+            self.approved_at: datetime = (
+                datetime.strptime("%Y-%m-%dT%H:%M:%S.%fZ", kwargs.get("date", "")) or datetime.min
+            )
+        except ValueError:
+            self.approved_at = datetime.min
+        self.certified: bool = kwargs.get("certifiedBot", False)
+        self.vanity_uri: Optional[str] = kwargs.get("vanity", None)
+        self.all_time_votes: int = kwargs.get("points", 0)
+        self.monthly_votes: int = kwargs.get("monthlyPoints", 0)
+        self.donations_guild: Optional[int] = kwargs.get("donatebotguildid", None)
+
+        if kwargs.get("state"):
+            self._user: Optional[DiscordUser] = kwargs["state"].get_user(self.id)
+        else:
+            self._user: Optional[DiscordUser] = None
@@ -0,0 +1,121 @@
+"""
+Synthetic top.gg payloads for the benchmarks.
+
+These mimic the shape, sizes and repetition of real /bots and /votes responses (a small pool of tags, libraries,
+prefixes and default avatars shared by thousands of bots), and are generated from a fixed seed so runs are comparable.
+"""
+import json
+import random
+from pathlib import Path
+from typing import List
+
+RECORDED = Path(__file__).parent / "payloads"
+
+TAGS = (
+    "Moderation", "Music", "Fun", "Utility", "Economy", "Game", "Leveling", "Logging", "Social", "Meme",
+    "Anime", "Media", "Roleplay", "Multipurpose", "Customizable", "Stream", "Web Dashboard", "Reddit",
+)
+LIBRARIES = ("discord.py", "discord.js", "JDA", "Eris", "DSharpPlus", "Discord.Net", "discordgo", "serenity", "Other")
+PREFIXES = ("!", "?", ".", "-", "$", ">", "+", "/", "~", ";", "%", "&")
+DEFAULT_AVATARS = (
+    "6debd47ed13483642cf09e832ed0bc1b",
+    "322c936a8c8be1b803cd94861bdfa868",
+    "dd4dbc0016779df1378e7812eabaa04d",
+    "0e291f67c9274a1abdddeb3fd919cbaa",
+    "1cbd08c76f8af6dddce02c5138971129",
+)
+
+
+def bot_payload(rng: random.Random, n: int) -> dict:
+    """A single /bots/{id} style payload."""
+    bot_id = 400000000000000000 + n
+    return {
+        "id": str(bot_id),
+        "username": f"Bot {n}",
+        "discriminator": "%04d" % rng.randrange(10000),
+        "avatar": "%032x" % rng.getrandbits(128) if rng.random() < 0.8 else None,
+        "defAvatar": rng.choice(DEFAULT_AVATARS),
+        "lib": rng.choice(LIBRARIES),
+        "prefix": rng.choice(PREFIXES),
+        "shortdesc": f"Bot number {n}, a multipurpose bot with moderation, music and more." * 2,
+        "longdesc": ("# About\n\nThis is a really long markdown description for bot %d. " % n) * rng.randint(10, 60),
+        "tags": rng.sample(TAGS, rng.randint(1, 5)),
+        "website": f"https://bot{n}.example.com" if rng.random() < 0.4 else None,
+        "support": "abcdefg" if rng.random() < 0.5 else None,
+        "github": None,
+        "owners": [str(300000000000000000 + rng.randrange(10 ** 6)) for _ in range(rng.randint(1, 3))],
+        "guilds": [],
+        "invite": None,
+        "date": "2020-%02d-%02dT%02d:%02d:%02d.%03dZ"
+        % (rng.randint(1, 12), rng.randint(1, 28), rng.randrange(24), rng.randrange(60), rng.randrange(60),
+           rng.randrange(1000)),
+        "certifiedBot": rng.random() < 0.05,
+        "vanity": None,
+        "points": rng.randrange(10 ** 6),
+        "monthlyPoints": rng.randrange(10 ** 4),
+        "donatebotguildid": "",
+    }
+
+
+def user_payload(rng: random.Random, n: int) -> dict:
+    """A single /bots/{id}/votes style payload."""
+    return {
+        "id": str(200000000000000000 + n),
+        "username": f"user{n}",
+        "discriminator": "#%04d" % rng.randrange(10000),
+        "avatar": "%032x" % rng.getrandbits(128) if rng.random() < 0.5 else None,
+    }
+
+
+def pages(payloads: List[dict], page_size: int = 500) -> List[bytes]:
+    """Splits payloads into encoded JSON pages, like the raw bodies of successive /bots responses."""
+    return [
+        json.dumps({"results": payloads[i:i + page_size]}).encode() for i in range(0, len(payloads), page_size)
+    ]
+
+
+def profile_payload(rng: random.Random, n: int) -> dict:
+    """A single /users/{id} style payload."""
+    return {
+        "id": str(200000000000000000 + n),
+        "username": f"user{n}",
+        "discriminator": "%04d" % rng.randrange(10000),
+        "avatar": "%032x" % rng.getrandbits(128) if rng.random() < 0.5 else None,
+        "defAvatar": rng.choice(DEFAULT_AVATARS),
+        "bio": f"Hello, I'm user {n}!" if rng.random() < 0.3 else None,
+        "banner": None,
+        "social": {"github": f"user{n}"} if rng.random() < 0.2 else {},
+        "color": "#%06x" % rng.randrange(0xFFFFFF) if rng.random() < 0.3 else "",
+        "supporter": rng.random() < 0.05,
+        "certifiedDev": False,
+        "mod": False,
+        "webMod": False,
+        "admin": False,
+    }
+
+
+def bots(count: int, seed: int = 0) -> List[dict]:
+    """
+    ``count`` bot payloads. They are round-tripped through JSON so that, like a real response, no two payloads
+    share any string objects.
+    """
+    rng = random.Random(seed)
+    return json.loads(json.dumps([bot_payload(rng, n) for n in range(count)]))
+
+
+def profiles(count: int, seed: int = 0) -> List[dict]:
+    """``count`` user profile payloads, round-tripped through JSON like :func:`bots`."""
+    rng = random.Random(seed)
+    return json.loads(json.dumps([profile_payload(rng, n) for n in range(count)]))
+
+
+def users(count: int, seed: int = 0) -> List[dict]:
+    """``count`` voter payloads, round-tripped through JSON like :func:`bots`."""
+    rng = random.Random(seed)
+    return json.loads(json.dumps([user_payload(rng, n) for n in range(count)]))
+
+
+def recorded(name: str):
+    """Loads one of the recorded top.gg responses in ``benchmarks/payloads``."""
+    with open(RECORDED / f"{name}.json", encoding="utf-8") as file:
+        return json.load(file)
@@ -0,0 +1,64 @@
+"""
+Client benchmark: TopGG._request overhead, and post_stats with large guild sets, against the local API emulator.
+
+The overhead is measured against a bare aiohttp request to the same endpoint, so the network itself cancels out.
+
+    python -m benchmarks.bench_client
+"""
+
+import aiohttp
+
+from toppy.client import TopGG
+from toppy.emulator import BOT_ID_BASE, FakeTopGG
+
+from ._fakes import FakeBot
+from ._harness import measure_async, run_async, scaled, unlimited_ratelimits
+
+
+async def _run(scale: float) -> dict:
+    fake = FakeTopGG(ratelimits={})
+    base = await fake.start()
+    requests = scaled(1000, scale)
+    results = {}
+    try:
+        async with aiohttp.ClientSession() as session:
+
+            async def bare():
+                async with session.get(base + "/weekend") as response:
+                    await response.json()
+
+            await measure_async(bare, 20)  # warm up the connection pool
+            results["bare_aiohttp"] = await measure_async(bare, requests)
+
+        with unlimited_ratelimits():
+            client = TopGG(FakeBot(), token="benchmark", autopost=False, base_url=base)
+            await client.is_weekend()
+            results["request"] = await measure_async(client.is_weekend, requests)
+            results["request"]["overhead_seconds"] = (
+                results["request"]["mean_seconds"] - results["bare_aiohttp"]["mean_seconds"]
+            )
+            target = FakeBot(user_id=BOT_ID_BASE).user
+            results["fetch_bot"] = await measure_async(lambda: client.fetch_bot(target), requests)
+
+            for guilds, shards in ((1000, 1), (scaled(100_000, scale), 16), (scaled(250_000, scale), 64)):
+                client.bot = FakeBot(guild_count=guilds, shard_count=shards)
+                results[f"post_stats_{guilds}_guilds_{shards}_shards"] = await measure_async(
+                    client.post_stats, scaled(20, scale)
+                )
+            await client.session.close()
+    finally:
+        await fake.close()
+    return results
+
+
+def run(scale: float = 1.0) -> dict:
+    return run_async(_run(scale))
+
+
+def main():
+    for name, result in run().items():
+        print(f"{name:>36}: {result['mean_seconds'] * 1e6:9.1f}us mean, {result['ops_per_second']:9.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory benchmark for interning repeated values during bulk model construction.
+
+Builds a 30k bot catalog (and a 1000 vote list) with and without a shared Interner, and compares how much memory
+the finished models retain.
+
+    python -m benchmarks.bench_intern
+"""
+import gc
+import json
+import tracemalloc
+
+from toppy.models import Bot, Interner, SimpleUser
+
+from . import _payloads
+from ._harness import scaled
+
+
+def _retained(model, pages, interner) -> int:
+    """Decodes every page and builds its models, returning how many bytes the finished models keep alive."""
+    gc.collect()
+    tracemalloc.start()
+    models = []
+    for page in pages:
+        # Like a bulk fetch, each page is decoded, turned into models, and then dropped.
+        for payload in json.loads(page)["results"]:
+            payload["interner"] = interner
+            models.append(model(**payload))
+    del page, payload
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained
+
+
+def run(scale: float = 1.0) -> dict:
+    results = {}
+    for name, model, count, payloads in (
+        ("bots", Bot, scaled(30_000, scale), _payloads.bots),
+        ("votes", SimpleUser, scaled(1000, scale), _payloads.users),
+    ):
+        pages = _payloads.pages(payloads(count))
+        plain = _retained(model, pages, None)
+        interner = Interner()
+        interned = _retained(model, pages, interner)
+        results[name] = {
+            "count": count,
+            "plain_bytes": plain,
+            "interned_bytes": interned,
+            # Higher is better, so not named as a *_bytes metric (which --compare treats as lower-is-better).
+            "saved_kib": round((plain - interned) / 1024, 1),
+            "saved_percent": round(100 * (plain - interned) / plain, 2),
+            "interner_hits": interner.hits,
+            "interner_size": len(interner),
+        }
+    return results
+
+
+def main():
+    for name, result in run().items():
+        print(
+            f"{name:>5}: {result['count']} models, {result['plain_bytes'] / 1024:.0f} KiB plain, "
+            f"{result['interned_bytes'] / 1024:.0f} KiB interned "
+            f"(saved {result['saved_kib']:.0f} KiB, {result['saved_percent']}%; "
+            f"{result['interner_hits']} hits, {result['interner_size']} unique values)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Model construction benchmark: schema-compiled decoders against the old hand-written constructors.
+
+Each model is built from the recorded top.gg responses in ``benchmarks/payloads``, and again in bulk from synthetic
+payloads.
+
+    python -m benchmarks.bench_models
+"""
+import timeit
+
+from toppy.models import Bot, Interner, SimpleUser, User
+
+from . import _legacy, _payloads
+from ._harness import scaled
+
+
+def _per_call(func, number: int) -> float:
+    """Best-of-five seconds per call."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def run(scale: float = 1.0) -> dict:
+    number, bulk = scaled(2000, scale), scaled(5000, scale)
+    cases = {
+        "bot": (Bot, _legacy.LegacyBot, _payloads.recorded("bot")),
+        "user": (User, _legacy.LegacyUser, _payloads.recorded("user")),
+        "simple_user": (SimpleUser, _legacy.LegacySimpleUser, _payloads.recorded("votes")[0]),
+    }
+    results = {}
+    for name, (model, legacy, payload) in cases.items():
+        results[name] = {
+            "legacy_seconds": _per_call(lambda: legacy(**payload), number),
+            "schema_seconds": _per_call(lambda: model(**payload), number),
+        }
+
+    for name, model, legacy, payloads in (
+        ("bulk_bots", Bot, _legacy.LegacyBot, _payloads.bots(bulk)),
+        ("bulk_users", User, _legacy.LegacyUser, _payloads.profiles(bulk)),
+        ("bulk_simple_users", SimpleUser, _legacy.LegacySimpleUser, _payloads.users(bulk)),
+    ):
+        interner = Interner()
+        results[name] = {
+            "count": len(payloads),
+            "legacy_seconds": _per_call(lambda: [legacy(**payload) for payload in payloads], 1),
+            "schema_seconds": _per_call(lambda: [model(**payload) for payload in payloads], 1),
+            "schema_interned_seconds": _per_call(
+                lambda: [model(**payload, interner=interner) for payload in payloads], 1
+            ),
+        }
+
+    for result in results.values():
+        result["speedup"] = round(result["legacy_seconds"] / result["schema_seconds"], 2)
+    return results
+
+
+def main():
+    for name, result in run().items():
+        unit = f" ({result['count']} models)" if "count" in result else " (per model)"
+        print(
+            f"{name:>17}{unit}: legacy {result['legacy_seconds'] * 1e6:.1f}us, "
+            f"schema {result['schema_seconds'] * 1e6:.1f}us ({result['speedup']}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Ratelimiter benchmark: the cost of the checks and hits TopGG._request makes on every call.
+
+    python -m benchmarks.bench_ratelimiter
+"""
+import timeit
+
+from toppy.ratelimiter import Ratelimit
+
+from ._harness import scaled
+
+
+def _per_call(stmt, number: int) -> dict:
+    seconds = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    return {"mean_seconds": seconds, "ops_per_second": 1 / seconds}
+
+
+def run(scale: float = 1.0) -> dict:
+    number = scaled(100_000, scale)
+    idle = Ratelimit(route="idle", hits=number * 10, cooldown=3600)
+    limited = Ratelimit(route="limited", hits=1, cooldown=3600)
+    limited.add_hit()
+    busy = Ratelimit(route="busy", hits=number * 10, cooldown=3600)
+    return {
+        "ratelimited_idle": _per_call(lambda: idle.ratelimited, number),
+        "ratelimited_limited": _per_call(lambda: limited.ratelimited, number),
+        "retry_after": _per_call(lambda: limited.retry_after, number),
+        "add_hit": _per_call(busy.add_hit, number),
+    }
+
+
+def main():
+    for name, result in run().items():
+        print(f"{name:>20}: {result['mean_seconds'] * 1e9:7.0f}ns, {result['ops_per_second']:12.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Round-trip benchmark for the binary model format.
+
+Serializes a bulk catalog with to_bytes/from_bytes and dump_models/load_models (with every available codec), and
+compares it to re-building the same models from the raw API payloads.
+
+    python -m benchmarks.bench_serialization
+"""
+import json
+import time
+
+from toppy.models import Bot, dump_models, load_models
+from toppy.models import serialization
+
+from . import _payloads
+from ._harness import scaled
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(scale: float = 1.0) -> dict:
+    count = scaled(5000, scale)
+    payloads = _payloads.bots(count)
+    bots, _ = _timed(lambda: [Bot(**payload) for payload in payloads])
+    raw = json.dumps(payloads).encode()
+    _, rebuild = _timed(lambda: [Bot(**payload) for payload in json.loads(raw)])
+
+    results = {"count": count, "from_api_json": {"load_seconds": rebuild, "bytes": len(raw)}}
+    codecs = ["json"] + (["msgpack"] if serialization.msgpack is not None else [])
+    for codec in codecs:
+        blobs, dump_each = _timed(lambda: [bot.to_bytes(codec) for bot in bots])
+        _, load_each = _timed(lambda: [Bot.from_bytes(blob) for blob in blobs])
+        blob, dump_all = _timed(dump_models, bots, codec)
+        loaded, load_all = _timed(load_models, blob)
+        assert len(loaded) == count
+        results[codec] = {
+            "to_bytes_seconds": dump_each,
+            "from_bytes_seconds": load_each,
+            "dump_models_seconds": dump_all,
+            "load_models_seconds": load_all,
+            "bytes": len(blob),
+        }
+    return results
+
+
+def main():
+    results = run()
+    count = results.pop("count")
+    api = results.pop("from_api_json")
+    print(f"{count} bots. Rebuilding from API JSON: {api['load_seconds'] * 1000:.1f}ms ({api['bytes'] / 1024:.0f} KiB)")
+    for codec, result in results.items():
+        print(
+            f"{codec:>8}: to_bytes {result['to_bytes_seconds'] * 1000:.1f}ms, "
+            f"from_bytes {result['from_bytes_seconds'] * 1000:.1f}ms, "
+            f"dump_models {result['dump_models_seconds'] * 1000:.1f}ms, "
+            f"load_models {result['load_models_seconds'] * 1000:.1f}ms ({result['bytes'] / 1024:.0f} KiB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
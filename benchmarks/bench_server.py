@@ -0,0 +1,68 @@
+"""
+Webhook server benchmark: how many votes per second the vote callback can accept.
+
+The callback is called directly with in-memory requests, so this measures toppy's own per-vote cost (auth,
+parsing, casting and dispatch) without any HTTP overhead.
+
+    python -m benchmarks.bench_server
+"""
+import json
+
+from toppy.server import _create_callback
+
+from ._fakes import FakeBot
+from ._harness import measure_async, run_async, scaled
+
+BOT_VOTE = {
+    "bot": "619328560141697036",
+    "user": "421698654189912064",
+    "type": "upvote",
+    "isWeekend": False,
+    "query": "?ref=benchmark",
+}
+SERVER_VOTE = {"guild": "729779146682793984", "user": "421698654189912064", "type": "upvote", "query": ""}
+
+
+class FakeRequest:
+    remote = "127.0.0.1"
+
+    def __init__(self, data: dict, auth: str = "benchmark"):
+        self.headers = {"Authorization": auth, "Content-Type": "application/json"}
+        self.body = json.dumps(data).encode()
+        self.content_length = len(self.body)
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def json(self):
+        return json.loads(self.body)
+
+    async def text(self) -> str:
+        return self.body.decode()
+
+
+async def _run(scale: float) -> dict:
+    votes = scaled(20_000, scale)
+    bot = FakeBot()
+    callback = _create_callback(bot, "benchmark", disable_warnings=True)
+    results = {}
+    for name, request in (
+        ("bot_vote", FakeRequest(BOT_VOTE)),
+        ("server_vote", FakeRequest(SERVER_VOTE)),
+        ("bad_auth", FakeRequest(BOT_VOTE, auth="wrong")),
+    ):
+        results[name] = await measure_async(lambda: callback(request), votes)
+    return results
+
+
+def run(scale: float = 1.0) -> dict:
+    return run_async(_run(scale))
+
+
+def main():
+    for name, result in run().items():
+        print(f"{name:>12}: {result['mean_seconds'] * 1e6:7.1f}us mean, {result['ops_per_second']:9.0f} votes/s")
+
+
+if __name__ == "__main__":
+    main()
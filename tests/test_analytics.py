@@ -0,0 +1,74 @@
+import time
+from calendar import timegm
+
+from toppy.models import SimpleUser
+from toppy.server import _create_callback, VoteAnalytics
+
+from .test_server import FakeRequest, POST_DATA, Recorder
+
+DAY = 86400
+# 2021-06-10T00:00:00Z
+T0 = timegm((2021, 6, 10, 0, 0, 0))
+
+
+def test_rolling_windows():
+    analytics = VoteAnalytics(windows=(3600, DAY), bucket=60)
+    for minute in range(0, 120, 10):
+        analytics.record(1, T0 + minute * 60)
+    now = T0 + 120 * 60
+    assert analytics.votes_in(DAY, now) == 12
+    assert analytics.votes_in(3600, now) == 6
+    # Late votes land in the right bucket.
+    analytics.record(2, T0 + 5)
+    assert analytics.votes_in(DAY, now) == 13
+    assert analytics.votes_in(3600, now) == 6
+    assert analytics.votes_in(DAY, now + DAY) == 0
+
+
+def test_streaks():
+    analytics = VoteAnalytics()
+    for day in (0, 1, 1, 2):
+        analytics.record(1, T0 + day * DAY)
+    assert analytics.streak(1, T0 + 2 * DAY) == 3
+    assert analytics.streak(1, T0 + 3 * DAY) == 3  # there's still time to vote today
+    assert analytics.streak(1, T0 + 4 * DAY) == 0
+    analytics.record(1, T0 + 5 * DAY)
+    assert analytics.streak(1, T0 + 5 * DAY) == 1
+    assert analytics.best_streak(1) == 3
+    assert analytics.streak(2) == 0
+
+
+def test_leaderboard():
+    analytics = VoteAnalytics(top_k=3)
+    for user, votes in ((1, 5), (2, 1), (3, 3), (4, 2), (5, 4)):
+        for _ in range(votes):
+            analytics.record(user, T0)
+    assert analytics.leaderboard() == [(1, 5), (5, 4), (3, 3)]
+    for _ in range(5):
+        analytics.record(2, T0)
+    assert analytics.leaderboard(2) == [(2, 6), (1, 5)]
+    assert analytics.monthly_votes(2) == 6
+    # A new month starts a new leaderboard.
+    analytics.record(4, T0 + 30 * DAY)
+    assert analytics.leaderboard() == [(4, 1)]
+    assert analytics.monthly_votes(2) == 0
+
+
+def test_bounded_users():
+    analytics = VoteAnalytics(max_users=2)
+    for user in range(5):
+        analytics.record(user, T0)
+    assert analytics.streak(0, T0) == 0 and analytics.streak(4, T0) == 1
+    assert analytics.total == 5
+
+
+async def test_analytics_from_server_and_seed():
+    recorder = Recorder()
+    analytics = VoteAnalytics()
+    # Seeded votes (whose real times are unknown) count towards the leaderboard, but not the rolling windows.
+    analytics.seed([SimpleUser(id=1, username="a"), SimpleUser(id=int(POST_DATA["user"]), username="b")], time.time())
+    cb = _create_callback(recorder, "foobar", analytics=analytics)
+    assert (await cb(FakeRequest())).status == 200
+    assert analytics.total == 1
+    assert analytics.leaderboard(1) == [(int(POST_DATA["user"]), 2)]
+    assert analytics.votes_in(3600) == 1
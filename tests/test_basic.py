@@ -70,3 +70,249 @@ def test_short_ratelimit():
     assert not route.ratelimited
     route.add_hit()
     assert not route.ratelimited, "Still ratelimited after cooldown period"
+
+
+def test_priorities():
+    from toppy.ratelimiter import Priority, Ratelimit
+
+    route = Ratelimit(route="/", hits=10, cooldown=60, reserved=0.2)
+    assert (route.limit_for(Priority.LOW), route.limit_for(Priority.NORMAL), route.limit_for(Priority.HIGH)) == (8, 8, 10)
+    for _ in range(3):
+        route.add_hit()
+    assert route.delay_for(Priority.LOW) == 0.0
+    route.add_hit()
+    # Half of the low priority budget is gone, so the rest is spread over what's left of the window.
+    assert 14 < route.delay_for(Priority.LOW) <= 15
+    assert route.delay_for(Priority.NORMAL) == 0.0
+    for _ in range(4):
+        route.add_hit()
+    assert route.ratelimited_for(Priority.NORMAL) and route.ratelimited_for(Priority.LOW)
+    assert not route.ratelimited_for(Priority.HIGH) and not route.ratelimited
+
+
+def test_unlimited_bucket():
+    # Benchmarks disable ratelimiting with an infinite bucket, which has no reserved share to work out.
+    from toppy.ratelimiter import Priority, Ratelimit
+
+    route = Ratelimit(route="/", hits=float("inf"), cooldown=60)
+    route.add_hit()
+    for priority in Priority:
+        assert route.limit_for(priority) == float("inf")
+        assert not route.ratelimited_for(priority) and route.delay_for(priority) == 0.0
+
+
+def test_window_resets():
+    from toppy.ratelimiter import Ratelimit
+
+    route = Ratelimit(route="/", hits=10, cooldown=0.1)
+    for _ in range(5):
+        route.add_hit()
+    time.sleep(0.15)
+    route.add_hit()
+    assert route.hits == 1
+
+
+def test_budget_forecast():
+    from toppy.ratelimiter import Priority, Ratelimit
+
+    route = Ratelimit(route="/", hits=10, cooldown=60, reserved=0.2)
+    assert route.resets_at is None and route.rate == 0.0
+    assert route.time_to_exhaustion() == float("inf")
+    for _ in range(6):
+        route.add_hit()
+    assert (route.remaining, route.remaining_for(Priority.NORMAL)) == (4, 2)
+    assert route.resets_at > datetime.datetime.utcnow()
+    assert route.rate == 6.0  # measured over at least a second
+    assert route.time_to_exhaustion(Priority.HIGH) == 4 / 6
+    # A job that fits in what's left of the budget isn't slowed down; one that doesn't is spread over the window.
+    assert route.delay_for(Priority.LOW, pending=2) == 0.0
+    assert route.delay_for(Priority.LOW, pending=3) > 0.0
+    for _ in range(2):
+        route.add_hit()
+    assert route.time_to_exhaustion() == 0.0
+
+
+BOT_DATA = {
+    "id": "619328560141697036",
+    "username": "top.py",
+    "discriminator": "0001",
+    "defAvatar": "6debd47ed13483642cf09e832ed0bc1b",
+    "prefix": "!",
+    "shortdesc": "A short description",
+    "longdesc": "A very long description " * 100,
+    "tags": ["Utility", "Fun"],
+    "owners": ["421698654189912064"],
+    "guilds": [],
+    "points": 1000,
+    "monthlyPoints": 50,
+}
+
+
+def test_bot_field_projection():
+    from toppy.models import Bot
+
+    bot = Bot(**BOT_DATA, fields=("id", "username", "points"))
+    assert bot.id == 619328560141697036
+    assert bot.username == "top.py"
+    assert bot.all_time_votes == 1000
+    assert bot.long_description is None
+    assert bot.owners == []
+    assert bot.monthly_votes == 0
+
+
+async def test_fetch_bots_fields():
+    from toppy.client import TopGG
+
+    client = TopGG(None, token="hi", autopost=False)
+    sent = []
+
+    async def fake_stream_request(method, uri, key=None, **kwargs):
+        sent.append(uri)
+        yield dict(BOT_DATA)
+
+    client._stream_request = fake_stream_request
+    results = await client.fetch_bots(10, fields=["username", "points"])
+    assert sent == ["/bots?limit=10&fields=id,username,points"]
+    bot, = results
+    assert bot.username == "top.py"
+    assert bot.long_description is None
+
+    # A single field as a bare string isn't split into characters.
+    await client.fetch_bots(10, fields="username")
+    assert sent[-1] == "/bots?limit=10&fields=id,username"
+
+
+def test_interner_dedupes_bot_values():
+    import json
+    from toppy.models import Bot, Interner, SimpleUser
+
+    interner = Interner()
+    first, second = (Bot(**json.loads(json.dumps(BOT_DATA)), interner=interner) for _ in range(2))
+    assert first.tags == second.tags
+    assert all(a is b for a, b in zip(first.tags, second.tags))
+    assert first.prefix is second.prefix
+    assert first.default_avatar is second.default_avatar
+    assert interner.hits > 0
+
+    # Default avatars are shared, so they're interned. Custom ones are unique to each user, so they aren't.
+    defaults = [SimpleUser(id=str(n), username="voter", discriminator="#0001", interner=interner) for n in range(2)]
+    assert defaults[0].avatar is defaults[1].avatar
+    size = len(interner)
+    custom = SimpleUser(id="1", username="voter", discriminator="#0001", avatar="a_1234", interner=interner)
+    assert custom.avatar.endswith("/1/a_1234.webp") and len(interner) == size
+
+    bounded = Interner(max_size=1)
+    bounded("a"), bounded("b")
+    assert len(bounded) == 1
+
+
+USER_DATA = {
+    "id": "421698654189912064",
+    "username": "eek",
+    "discriminator": "7574",
+    "avatar": "a_1234",
+    "bio": "hello",
+    "social": {"github": "EEKIM10"},
+    "color": "#ff0000",
+    "supporter": True,
+}
+
+
+class _State:
+    @staticmethod
+    def get_user(user_id):
+        return ("discord user", user_id)
+
+
+@pytest.mark.parametrize("codec", ["json", "msgpack"])
+def test_model_binary_round_trip(codec: str):
+    if codec == "msgpack":
+        pytest.importorskip("msgpack")
+    from toppy.models import Bot, BotStats, SimpleUser, User, dump_models, load_models
+
+    models = [
+        Bot(**BOT_DATA, state=_State()),
+        User(**USER_DATA),
+        SimpleUser(id="1", username="voter", discriminator="#0001"),
+        BotStats(server_count=30, shards=[10, 20], shard_count=2),
+    ]
+    for model in models:
+        loaded = type(model).from_bytes(model.to_bytes(codec), state=_State())
+        expected = dict(vars(model))
+        if "_user" in expected:
+            expected["_user"] = _State.get_user(model.id)
+        assert vars(loaded) == expected
+
+    loaded = load_models(dump_models(models, codec))
+    assert [type(model) for model in loaded] == [Bot, User, SimpleUser, BotStats]
+    assert loaded[0]._user is None
+    assert loaded[1].colour.value == 0xFF0000
+    assert loaded[3].shards == {0: 10, 1: 20}
+
+    with pytest.raises(ValueError):
+        User.from_bytes(models[0].to_bytes(codec))
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2017-04-26T18:08:17.125Z", datetime.datetime(2017, 4, 26, 18, 8, 17, 125000)),
+        ("2017-04-26T18:08:17Z", datetime.datetime(2017, 4, 26, 18, 8, 17)),
+        ("2017-04-26T18:08:17.123456789Z", datetime.datetime(2017, 4, 26, 18, 8, 17, 123456)),
+        ("2017-04-26T18:08:17.5+01:30", datetime.datetime(2017, 4, 26, 16, 38, 17, 500000)),
+        ("2017-04-26 18:08:17-02:00", datetime.datetime(2017, 4, 26, 20, 8, 17)),
+    ],
+)
+def test_parse_iso8601(value: str, expected: datetime.datetime):
+    from toppy.models import parse_iso8601
+
+    assert parse_iso8601(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "yesterday", "2017-04-26", "2017-04-26T18:08:17.Z", "2017-04-26T18:08:17+1"])
+def test_parse_iso8601_invalid(value: str):
+    from toppy.models import parse_iso8601
+
+    with pytest.raises(ValueError):
+        parse_iso8601(value)
+
+
+def test_bot_approved_at():
+    from toppy.models import Bot
+
+    bot = Bot(**BOT_DATA, date="2017-04-26T18:08:17.125Z")
+    assert bot.approved_at == datetime.datetime(2017, 4, 26, 18, 8, 17, 125000)
+    assert Bot(**BOT_DATA, date="garbage").approved_at == datetime.datetime.min
+    assert Bot(**BOT_DATA).approved_at == datetime.datetime.min
+
+
+def test_schema_decoder():
+    from toppy.models import Field, Interner, Schema
+
+    class Model:
+        pass
+
+    schema = Schema(
+        "Model",
+        Field("id", "id", convert=int, required=True),
+        Field("name", "name", default="nobody"),
+        Field("ids", "ids", many=True, convert=int, factory=list),
+        Field("tag", "tag", intern=True),
+        Field("computed", None, default=0),
+    )
+    model = Model()
+    schema.decode(model, {"id": "1", "ids": ["2", "3"], "tag": "a"}, Interner())
+    assert vars(model) == {"id": 1, "name": "nobody", "ids": [2, 3], "tag": "a", "computed": 0}
+
+    model = Model()
+    schema.decoder(["name"])(model, {"id": "1", "name": "bob", "ids": ["2"], "tag": "a"}, Interner())
+    assert vars(model) == {"id": 1, "name": "bob", "ids": [], "tag": None, "computed": 0}
+    assert schema.decoder(["name"]) is schema.decoder(("name",))
+
+    # An explicit null gets the default too, not just a missing key.
+    model = Model()
+    schema.decode(model, {"id": "1", "name": None, "ids": None, "tag": None}, Interner())
+    assert vars(model) == {"id": 1, "name": "nobody", "ids": [], "tag": None, "computed": 0}
+
+    with pytest.raises(KeyError):
+        schema.decode(Model(), {}, Interner())
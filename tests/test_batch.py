@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+
+from toppy.client import TopGG
+from toppy.emulator import BOT_ID_BASE, FakeTopGG
+from toppy.errors import NotFound, Ratelimited
+from toppy.models import cast_vote
+from toppy.ratelimiter import routes
+
+from .test_emulator import FakeBot, Obj, reset_ratelimits  # noqa: F401
+
+
+@pytest.fixture
+async def fake():
+    async with FakeTopGG(token="token", bot_count=100) as fake:
+        yield fake
+
+
+@pytest.fixture
+async def client(fake):
+    client = TopGG(token="token", bot_id=BOT_ID_BASE, base_url=fake.url)
+    yield client
+    await client.session.close()
+
+
+async def test_fetch_bots_by_id(client: TopGG, fake: FakeTopGG):
+    ids = [BOT_ID_BASE + 3, BOT_ID_BASE + 200, BOT_ID_BASE + 1, BOT_ID_BASE + 3, Obj(BOT_ID_BASE + 1)]
+    batch = await client.fetch_bots_by_id(ids, concurrency=2)
+    assert list(batch.results) == [BOT_ID_BASE + 3, BOT_ID_BASE + 1]
+    assert batch[BOT_ID_BASE + 1].username == "Bot 1"
+    assert isinstance(batch.errors[BOT_ID_BASE + 200], NotFound)
+    assert not batch.ok and len(batch) == 2
+    assert fake.requests["GET /bots/{id}"] == 3
+    with pytest.raises(NotFound):
+        batch.raise_for_errors()
+
+    # The missing bot is cached, so only the stats of listed bots are requested.
+    stats = await client.get_stats_many([BOT_ID_BASE, BOT_ID_BASE + 200])
+    assert BOT_ID_BASE in stats and isinstance(stats.errors[BOT_ID_BASE + 200], NotFound)
+    assert fake.requests["GET /bots/{id}/stats"] == 1
+
+
+async def test_fetch_users(client: TopGG, fake: FakeTopGG):
+    voters = await client.fetch_votes()
+    batch = await client.fetch_users(voters[:50] + voters[:50])
+    assert batch.ok and len(batch) == 50
+    assert [user.id for user in batch] == [voter.id for voter in voters[:50]]
+    assert fake.requests["GET /users/{id}"] == 50
+
+
+async def test_batch_budget(client: TopGG, fake: FakeTopGG):
+    # Normal priority may use 4 of these 5 hits, so the rest of the batch fails without being sent.
+    routes["/bots/*"].max_hits, routes["/bots/*"].cooldown = 5, 0.5
+    batch = await client.fetch_bots_by_id(range(BOT_ID_BASE, BOT_ID_BASE + 10), concurrency=10)
+    assert len(batch) == 4 and len(batch.errors) == 6
+    assert all(isinstance(error, Ratelimited) and error.internal for error in batch.errors.values())
+    assert fake.requests["GET /bots/{id}"] == 4
+
+    # Waiting for the budget instead gets every bot, 4 per window.
+    client.cache = None
+    batch = await client.fetch_bots_by_id(range(BOT_ID_BASE, BOT_ID_BASE + 10), wait=True)
+    assert batch.ok and len(batch) == 10
+    assert fake.requests["GET /bots/{id}"] == 14
+
+
+class ResolvingBot(FakeBot):
+    # A bot that has only cached some users, and knows of the rest through fetch_user.
+    def __init__(self, cached, known):
+        self.cached = {user_id: SimpleNamespace(id=user_id, cached=True) for user_id in cached}
+        self.known = set(known)
+        self.fetched = []
+
+    def get_user(self, user_id):
+        return self.cached.get(user_id)
+
+    async def fetch_user(self, user_id):
+        import discord
+
+        self.fetched.append(user_id)
+        if user_id not in self.known:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown User")
+        return SimpleNamespace(id=user_id, cached=False)
+
+
+async def test_resolve_users(fake: FakeTopGG):
+    discord = pytest.importorskip("discord")
+    client = TopGG(FakeBot(), token="token", autopost=False, base_url=fake.url)
+    voters = await client.fetch_votes()
+    ids = list(dict.fromkeys(voter.id for voter in voters))
+    client.bot = bot = ResolvingBot(cached=ids[:500], known=ids[:-10])
+    votes = [cast_vote({"bot": str(BOT_ID_BASE), "user": str(voter.id), "type": "upvote"}) for voter in voters[:600]]
+
+    resolved = await client.resolve_users(voters + votes, concurrency=5)
+    assert list(resolved.results) == ids[:-10] and list(resolved.errors) == ids[-10:]
+    assert all(isinstance(error, discord.NotFound) for error in resolved.errors.values())
+    assert resolved[ids[0]].cached and not resolved[ids[500]].cached
+    # Only the uncached voters were fetched, and each of them once.
+    assert sorted(bot.fetched) == sorted(ids[500:])
+    await client.session.close()
+
+    with pytest.raises(TypeError):
+        await TopGG(token="token", bot_id=BOT_ID_BASE).resolve_users(voters)
@@ -0,0 +1,60 @@
+import pytest
+
+from toppy.cache import ResponseCache
+from toppy.client import TopGG
+from toppy.emulator import BOT_ID_BASE, USER_ID_BASE, FakeTopGG
+from toppy.errors import NotFound
+
+from .test_emulator import Obj, reset_ratelimits  # noqa: F401
+
+
+def test_expiry_and_eviction():
+    now = [0.0]
+    cache = ResponseCache(ttl=10, negative_ttl=60, max_size=2)
+    cache._clock = lambda: now[0]
+    cache.set("bot", 1, "one")
+    cache.set_missing("bot", 2)
+    assert cache.get("bot", 1) == "one"
+    with pytest.raises(NotFound):
+        cache.get("bot", 2)
+    assert cache.missing("bot", 2) and not cache.missing("bot", 1)
+
+    now[0] = 30  # found entries have expired, missing ones haven't
+    assert cache.get("bot", 1) is None
+    assert cache.missing("bot", 2)
+    cache.set("bot", 2, "two")  # replaces the missing entry
+    assert cache.get("bot", 2) == "two"
+    cache.set("user", 3, "three")
+    cache.set("user", 4, "four")  # evicts the least recently used entry
+    assert len(cache) == 2 and cache.get("bot", 2) is None
+    assert (cache.hits, cache.negative_hits, cache.misses) == (2, 1, 2)
+
+
+async def test_negative_cache():
+    async with FakeTopGG(token="token", bot_count=10) as fake:
+        client = TopGG(token="token", base_url=fake.url)
+        missing = Obj(BOT_ID_BASE + 20)
+        for _ in range(3):
+            with pytest.raises(NotFound):
+                await client.fetch_bot(missing)
+        # Stats for a bot that isn't listed are missing too, and shared with fetch_bot.
+        with pytest.raises(NotFound):
+            await client.get_stats(missing)
+        assert fake.requests["GET /bots/{id}"] == 1 and client.cache.negative_hits == 2
+
+        with pytest.raises(NotFound):
+            await client.fetch_user(Obj(1))
+        with pytest.raises(NotFound):
+            await client.fetch_user(Obj(1))
+        assert fake.requests["GET /users/{id}"] == 1
+
+        # Seeing a bot in the listing clears it from the negative cache.
+        client.cache.set_missing("bot", BOT_ID_BASE + 5)
+        await client.fetch_bots(10)
+        assert not client.cache.missing("bot", BOT_ID_BASE + 5)
+
+        client.cache = ResponseCache(ttl=60)
+        first = await client.fetch_user(Obj(USER_ID_BASE + 1))
+        assert await client.fetch_user(Obj(USER_ID_BASE + 1)) is first
+        assert fake.requests["GET /users/{id}"] == 2
+        await client.session.close()
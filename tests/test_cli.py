@@ -0,0 +1,198 @@
+import asyncio
+import csv
+import io
+import json
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from toppy.__main__ import build_parser, export, loadtest_webhook, serve
+from toppy.client import TopGG
+from toppy.emulator import BOT_ID_BASE, FakeTopGG
+from toppy.export import export_bots
+from toppy.loadtest import run_loadtest
+from toppy.ratelimiter import routes
+from toppy.server import WebhookServer
+from toppy.server.sinks import HTTPSink, NDJSONSink, UnixSocketSink, open_sink
+
+from .test_emulator import reset_ratelimits  # noqa: F401
+from .test_server import POST_DATA
+
+unix_only = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+def test_parser():
+    parser = build_parser()
+    assert parser.parse_args(["-V"]).version
+    args = parser.parse_args(["serve", "votes.ndjson", "--port", "9000", "--auth", "foo", "--batch-size", "10"])
+    assert (args.command, args.sink, args.port, args.auth, args.batch_size) == ("serve", "votes.ndjson", 9000, "foo", 10)
+    assert isinstance(open_sink("unix:/tmp/x.sock"), UnixSocketSink)
+    assert isinstance(open_sink("https://example.com/votes"), HTTPSink)
+
+
+@unix_only
+async def test_serve_to_ndjson(tmp_path):
+    sock, out = str(tmp_path / "webhook.sock"), tmp_path / "votes.ndjson"
+    args = build_parser().parse_args(
+        ["serve", str(out), "--port", "-1", "--unix-path", sock, "--auth", "foobar", "--batch-delay", "0.01"]
+    )
+    stop = asyncio.Event()
+    task = asyncio.ensure_future(serve(args, stop))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if (tmp_path / "webhook.sock").exists():
+            break
+    async with aiohttp.ClientSession(connector=aiohttp.UnixConnector(path=sock)) as session:
+        for user in ("1", "2", "2"):
+            data = dict(POST_DATA, user=user)
+            async with session.post("http://localhost/", json=data, headers={"Authorization": "foobar"}) as response:
+                assert response.status == 200
+    stop.set()
+    await task
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [line["user"] for line in lines] == ["1", "2"]  # the repeat delivery was deduplicated
+
+
+@unix_only
+async def test_serve_journal_keeps_undelivered_votes(tmp_path):
+    sock, journal, out = str(tmp_path / "webhook.sock"), str(tmp_path / "votes.journal"), tmp_path / "votes.ndjson"
+
+    async def run(sink, users):
+        args = build_parser().parse_args(
+            ["serve", sink, "--port", "-1", "--unix-path", sock, "--journal", journal, "--batch-delay", "0.01"]
+        )
+        stop = asyncio.Event()
+        task = asyncio.ensure_future(serve(args, stop))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if (tmp_path / "webhook.sock").exists():
+                break
+        async with aiohttp.ClientSession(connector=aiohttp.UnixConnector(path=sock)) as session:
+            for user in users:
+                async with session.post("http://localhost/", json=dict(POST_DATA, user=user)) as response:
+                    assert response.status == 200
+        await asyncio.sleep(0.05)
+        stop.set()
+        await task
+
+    # Nothing is listening on the sink's socket, so its batches fail, and stay in the journal.
+    await run("unix:" + str(tmp_path / "missing.sock"), ["1", "2"])
+    await run(str(out), ["3"])
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [line["user"] for line in lines] == ["1", "2", "3"]
+
+
+@unix_only
+async def test_unix_socket_sink(tmp_path):
+    received = []
+
+    async def client(reader, writer):
+        received.extend(json.loads(line) for line in (await reader.read()).splitlines())
+
+    path = str(tmp_path / "sink.sock")
+    server = await asyncio.start_unix_server(client, path)
+    sink = UnixSocketSink(path)
+    await sink.send([{"n": 1}, {"n": 2}])
+    await sink.close()
+    await asyncio.sleep(0.05)
+    server.close()
+    assert received == [{"n": 1}, {"n": 2}]
+
+
+async def test_http_sink():
+    received = []
+    attempts = []
+
+    async def handler(request):
+        attempts.append(1)
+        if len(attempts) == 1:
+            return web.Response(status=503)
+        received.extend(await request.json())
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post("/votes", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    sink = HTTPSink(f"http://{host}:{port}/votes")
+    await sink.send([{"n": 1}])  # retried after the 503
+    await sink.close()
+    await runner.cleanup()
+    assert received == [{"n": 1}] and len(attempts) == 2
+
+
+async def test_ndjson_sink(tmp_path):
+    sink = NDJSONSink(str(tmp_path / "out.ndjson"))
+    await sink.send([{"n": 1}])
+    await sink.send([{"n": 2}, {"n": 3}])
+    await sink.close()
+    assert (tmp_path / "out.ndjson").read_text() == '{"n":1}\n{"n":2}\n{"n":3}\n'
+
+
+async def test_export(tmp_path):
+    async with FakeTopGG(token="token", bot_count=1200) as fake:
+        client = TopGG(token="token", base_url=fake.url)
+        out = io.StringIO()
+        assert await export_bots(client, out, limit=700) == 700
+        bots = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert len(bots) == 700 and bots[-1]["id"] == str(BOT_ID_BASE + 699)
+        assert fake.requests["GET /bots"] == 2
+
+        # Resume where that left off, as CSV with only some fields, through a ratelimit.
+        fake.ratelimits["*"] = (1, 0.2)
+        out = io.StringIO()
+        assert await export_bots(client, out, format="csv", fields=("username", "tags"), offset=700) == 1200
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert len(rows) == 500 and list(rows[0]) == ["id", "username", "tags"]
+        assert rows[0]["id"] == str(BOT_ID_BASE + 700) and isinstance(json.loads(rows[0]["tags"]), list)
+        await client.session.close()
+
+
+async def test_export_waits_for_bots_bucket():
+    # The listing counts against /bots/* too, so an export must wait for that bucket, not just the global one.
+    route = routes["/bots/*"]
+    route.max_hits, route.cooldown = 2, 0.3
+    route.add_hit()
+    route.add_hit()
+    async with FakeTopGG(token="token", bot_count=30) as fake:
+        client = TopGG(token="token", base_url=fake.url)
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        assert await export_bots(client, io.StringIO(), page_size=10) == 30
+        # One low priority page per window, after waiting out the first.
+        assert loop.time() - started >= 0.9
+        assert fake.requests["GET /bots"] == 3 and route.hits <= route.limit_for()
+        await client.session.close()
+
+
+async def test_export_command(tmp_path):
+    async with FakeTopGG(token="token", bot_count=30) as fake:
+        output = str(tmp_path / "bots.csv")
+        argv = ["export", "-o", output, "--token", "token", "--base-url", fake.url, "--fields", "username"]
+        assert await export(build_parser().parse_args(argv + ["--limit", "10"])) == 0
+        assert await export(build_parser().parse_args(argv + ["--offset", "10"])) == 0
+        rows = list(csv.DictReader(open(output, newline="")))
+        assert [row["username"] for row in rows] == [f"Bot {n}" for n in range(30)]
+        argv[4] = "wrong"
+        assert await export(build_parser().parse_args(argv)) == 1
+
+
+async def test_loadtest_webhook():
+    async with WebhookServer(host="127.0.0.1", port=0) as server:
+        await server.register(None, path="/dbl", auth="foobar", dedup_window=60)
+        host, port = server.addresses[0][:2]
+        url = f"http://{host}:{port}/dbl"
+        result = await run_loadtest(url, auth="foobar", requests=200, concurrency=2, ramp_to=8, kind="mixed", seed=1)
+        assert result.sent == 200 and result.statuses == {200: 200} and result.errors == 0
+        assert 0 < result.percentile(50) <= result.percentile(95) <= result.percentile(99) <= result.percentile(100)
+        assert result.throughput > 0 and "p99" in result.summary()
+
+        result = await run_loadtest(url, auth="wrong", requests=10, concurrency=4)
+        assert result.statuses == {401: 10} and result.ok == 0
+
+        args = build_parser().parse_args(["loadtest-webhook", url, "--auth", "foobar", "-n", "20", "-c", "3"])
+        assert await loadtest_webhook(args) == 0
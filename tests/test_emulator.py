@@ -0,0 +1,156 @@
+import subprocess
+import sys
+
+import pytest
+
+from toppy.client import TopGG
+from toppy.emulator import BOT_ID_BASE, USER_ID_BASE, FakeTopGG
+from toppy.errors import Forbidden, NotFound, Ratelimited, TopGGServerError
+from toppy.ratelimiter import Priority, routes
+
+
+class FakeBot:
+    class user:
+        id = BOT_ID_BASE
+
+    def is_ready(self):
+        return True
+
+    def dispatch(self, *args, **kwargs):
+        pass
+
+    def get_user(self, _id):
+        return None
+
+
+class Obj:
+    def __init__(self, _id: int):
+        self.id = _id
+
+
+@pytest.fixture(autouse=True)
+def reset_ratelimits():
+    # The internal ratelimiter is global, so make sure every test starts (and leaves it) fresh.
+    saved = {name: (route.max_hits, route.cooldown) for name, route in routes.items()}
+
+    def reset():
+        for name, (max_hits, cooldown) in saved.items():
+            route = routes[name]
+            route.max_hits, route.cooldown, route.hits = max_hits, cooldown, 0
+            route.expires = route.expires.min
+
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture
+async def fake():
+    async with FakeTopGG(token="token", bot_count=1200) as fake:
+        yield fake
+
+
+@pytest.fixture
+async def client(fake):
+    client = TopGG(FakeBot(), token="token", autopost=False, base_url=fake.url)
+    yield client
+    if client.session:
+        await client.session.close()
+
+
+async def test_fetch_bot(client: TopGG):
+    bot = await client.fetch_bot(Obj(BOT_ID_BASE + 5))
+    assert bot.id == BOT_ID_BASE + 5
+    assert bot.username == "Bot 5"
+    assert bot.approved_at.year >= 2017
+    with pytest.raises(NotFound):
+        await client.fetch_bot(Obj(1))
+
+
+async def test_fetch_bots_pages(client: TopGG, fake: FakeTopGG):
+    page = list(await client.fetch_bots(500, offset=1000, fields=("username",)))
+    assert len(page) == 200
+    assert page[0].id == BOT_ID_BASE + 1000
+    assert page[0].long_description is None
+    assert fake.requests["GET /bots"] == 1
+
+
+async def test_votes_and_stats(client: TopGG, fake: FakeTopGG):
+    voters = await client.fetch_votes()
+    assert len(voters) == 1000
+    assert await client.upvote_check(voters[0]) is True
+    assert await client.upvote_check(Obj(USER_ID_BASE - 1)) is False
+    client.bot.guilds = [object()] * 42
+    assert await client.post_stats() == 42
+    assert fake.posted_stats[BOT_ID_BASE]["server_count"] == 42
+    assert (await client.get_stats(Obj(BOT_ID_BASE))).server_count == 42
+    assert (await client.fetch_user(Obj(USER_ID_BASE + 7))).name == "user7"
+    assert await client.is_weekend() is False
+
+
+async def test_headless(fake: FakeTopGG):
+    client = TopGG(token="token", bot_id=BOT_ID_BASE, base_url=fake.url)
+    assert client.autopost is None
+    assert client.vote_url == f"https://top.gg/bot/{BOT_ID_BASE}/vote"
+    voters = await client.fetch_votes()
+    assert await client.upvote_check(voters[0]) is True
+    bot = await client.fetch_bot(Obj(BOT_ID_BASE + 5))
+    assert bot.invite.endswith(f"client_id={BOT_ID_BASE + 5}&scope=bot+applications.commands")
+    with pytest.raises(TypeError):
+        await client.post_stats()
+    await client.session.close()
+
+
+def test_headless_import():
+    # Importing top.py (and using the models) shouldn't import discord.py.
+    code = "import sys, toppy; toppy.cast_vote({'bot': '1', 'user': '2', 'type': 'test'}); print('discord' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout.strip() == b"False"
+
+
+async def test_priorities(client: TopGG):
+    # Use up everything but the reserved share of the global bucket.
+    route = routes["*"]
+    for _ in range(route.limit_for(Priority.NORMAL)):
+        route.add_hit()
+    with pytest.raises(Ratelimited) as exc:
+        await client.is_weekend()
+    assert exc.value.internal
+    assert await client.upvote_check(Obj(USER_ID_BASE)) in (True, False)  # high priority by default
+    assert await client.is_weekend(priority=Priority.HIGH) is False
+
+
+async def test_bulk_fetch_waits_for_budget(client: TopGG):
+    # Only one page fits in each (short) window, so this can only finish by waiting for the budget to reset.
+    route = routes["*"]
+    route.max_hits, route.cooldown = 2, 0.2
+    bots = await client.bulk_fetch_bots(1200)
+    assert len(bots) == 1200
+
+
+async def test_bad_token(fake: FakeTopGG):
+    client = TopGG(FakeBot(), token="wrong", autopost=False, base_url=fake.url)
+    with pytest.raises(Forbidden):
+        await client.is_weekend()
+    await client.session.close()
+
+
+async def test_server_errors(client: TopGG, fake: FakeTopGG):
+    fake.error_rate = 1
+    with pytest.raises(TopGGServerError):
+        await client.is_weekend()
+
+
+async def test_real_ratelimit(client: TopGG, fake: FakeTopGG):
+    fake.ratelimits["/bots/*"] = (2, 30.0)
+    # Let the client think it has plenty of budget left, so the emulator is what catches it.
+    routes["/bots/*"].max_hits = 100
+    for _ in range(2):
+        await client.fetch_bot(Obj(BOT_ID_BASE))
+    with pytest.raises(Ratelimited) as exc:
+        await client.fetch_bot(Obj(BOT_ID_BASE))
+    assert not exc.value.internal
+    assert 29 < exc.value.retry_after <= 30
+    # ...and the internal ratelimiter has been re-synced.
+    with pytest.raises(Ratelimited) as exc:
+        await client.fetch_bot(Obj(BOT_ID_BASE))
+    assert exc.value.internal
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from toppy.server import _create_callback, _replay, VoteBatcher, VoteDeduplicator, VoteDispatcher, VoteJournal
+
+from .test_server import FakeRequest, POST_DATA, Recorder
+
+
+async def test_journal_replays_unacked(tmp_path):
+    path = str(tmp_path / "votes.log")
+    journal = VoteJournal(path)
+    assert await journal.open() == []
+    first = await journal.append(POST_DATA)
+    second = await journal.append(dict(POST_DATA, user="1"))
+    journal.ack(first)
+    await journal.close()
+
+    journal = VoteJournal(path)
+    assert await journal.open() == [(second, dict(POST_DATA, user="1"))]
+    # New IDs carry on from the old ones.
+    assert await journal.append(POST_DATA) > second
+    await journal.close()
+
+
+async def test_journal_group_commit(tmp_path):
+    journal = VoteJournal(str(tmp_path / "votes.log"))
+    await journal.open()
+    entries = await asyncio.gather(*(journal.append(dict(POST_DATA, user=str(n))) for n in range(100)))
+    assert sorted(entries) == list(range(100))
+    assert journal.appended == 100
+    assert journal.batches < 10
+    await journal.close()
+
+
+async def test_journal_compaction_and_torn_write(tmp_path):
+    path = tmp_path / "votes.log"
+    journal = VoteJournal(str(path), compact_every=10)
+    await journal.open()
+    for n in range(30):
+        journal.ack(await journal.append(dict(POST_DATA, user=str(n))))
+    kept = await journal.append(POST_DATA)
+    await journal.compact()
+    await journal.close()
+    assert path.read_bytes().count(b"\n") <= 10
+    with open(path, "ab") as file:
+        file.write(b'[99,{"user":')  # crashed mid-write
+
+    journal = VoteJournal(str(path))
+    assert [entry for entry, _ in await journal.open()] == [kept]
+    await journal.close()
+
+
+async def test_server_journal_and_replay(tmp_path):
+    path = str(tmp_path / "votes.log")
+    recorder = Recorder()
+    journal = VoteJournal(path)
+    await journal.open()
+    # A handler that never finishes, as if the bot was killed straight after acknowledging the votes.
+    dispatcher = VoteDispatcher(workers=1, journal=journal)
+    dispatcher.add_listener(lambda _: asyncio.Event().wait())
+    cb = _create_callback(recorder, "foobar", dispatcher=dispatcher, journal=journal)
+    for n in range(3):
+        assert (await cb(FakeRequest(dict(POST_DATA, user=str(n))))).status == 200
+    await dispatcher.close(timeout=0)
+    await journal.close()
+    assert journal.pending == 3
+
+    journal = VoteJournal(path)
+    dispatcher = VoteDispatcher(recorder, workers=2, journal=journal)
+    await _replay(recorder, journal, dispatcher)
+    await dispatcher.close()
+    assert sorted(vote._user for vote in recorder.votes) == ["0", "1", "2"]
+    assert journal.pending == 0
+    await journal.close()
+
+
+async def test_batcher_acks_after_batch(tmp_path):
+    # With a batcher, votes stay in the journal until their batch has been handled, not just on_vote.
+    journal = VoteJournal(str(tmp_path / "votes.log"))
+    await journal.open()
+    batcher = VoteBatcher(max_size=10, max_delay=10, journal=journal)
+    stored = []
+
+    @batcher.add_listener
+    async def store(votes):
+        if len(stored) == 0:
+            stored.append(None)
+            raise RuntimeError("database is down")
+        stored.extend(votes)
+
+    cb = _create_callback(Recorder(), "foobar", journal=journal, batcher=batcher)
+    for n in range(3):
+        assert (await cb(FakeRequest(dict(POST_DATA, user=str(n))))).status == 200
+    assert journal.pending == 3  # on_vote has been dispatched, but the batch hasn't been handled
+    await batcher.flush()
+    assert journal.pending == 3  # and the batch failed, so they'll be replayed
+    assert (await cb(FakeRequest(dict(POST_DATA, user="3")))).status == 200
+    await batcher.flush()
+    assert journal.pending == 3 and len(stored) == 2
+    await journal.close()
+
+
+class FailingJournal(VoteJournal):
+    # A journal whose disk fills up for one write.
+    fail = True
+
+    async def append(self, data: dict) -> int:
+        if self.fail:
+            self.fail = False
+            raise OSError(28, "No space left on device")
+        return await super().append(data)
+
+
+async def test_failed_append_isnt_a_duplicate(tmp_path):
+    recorder = Recorder()
+    journal = FailingJournal(str(tmp_path / "votes.log"))
+    await journal.open()
+    cb = _create_callback(recorder, "foobar", deduplicator=VoteDeduplicator(60), journal=journal)
+    with pytest.raises(OSError):
+        await cb(FakeRequest())
+    # top.gg's retry is handled, rather than ignored as a duplicate of the vote that was never written.
+    assert (await cb(FakeRequest())).status == 200
+    assert len(recorder.votes) == 1 and journal.pending == 0
+    await journal.close()
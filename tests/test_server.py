@@ -6,7 +6,7 @@ import discord
 from aiohttp.web import Response
 import pytest
 
-from toppy.server import _create_callback, cast_vote
+from toppy.server import _create_callback, cast_vote, VoteBatcher, VoteDeduplicator, VoteDispatcher
 from toppy.models import VoteType, BotVote, ServerVote
 
 Vote = Union[BotVote, ServerVote]
@@ -38,6 +38,8 @@ class Sponge:
 class FakeRequest:
     headers = {"Authorization": "foobar"}
     remote = "127.0.0.1"
+    path = "/"
+    content_length = None
 
     def __init__(self, new_data=None):
         if new_data is None:
@@ -80,6 +82,27 @@ async def test_vote_server_broken_data():
     assert response.status == 422
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data",
+    (
+        [POST_DATA],
+        dict(POST_DATA, user="not a snowflake"),
+        dict(POST_DATA, bot=1.5),
+        dict(POST_DATA, user=True),
+    ),
+)
+async def test_vote_server_invalid_ids(data):
+    # Rejected before deduplication, so that top.gg's retry isn't mistaken for a duplicate of it.
+    sponge = Sponge()
+    dedup = VoteDeduplicator(60)
+    cb = _create_callback(sponge, "foobar", deduplicator=dedup)
+    assert (await cb(FakeRequest(data))).status == 422
+    assert len(dedup) == 0
+    with pytest.raises((TypeError, ValueError)):
+        cast_vote(data)
+
+
 @pytest.mark.parametrize(
     ("data", "expected_type"),
     (
@@ -107,3 +130,173 @@ async def test_vote_server_broken_data():
 def test_vote_cast(data: dict, expected_type: type):
     casted = cast_vote(data)
     assert isinstance(casted, expected_type)
+
+
+class Recorder:
+    def __init__(self):
+        self.votes = []
+
+    def dispatch(self, _, vote: Vote):
+        self.votes.append(vote)
+
+    def get_user(self, _id):
+        return discord.Object(_id)
+
+
+async def test_vote_server_acks_before_handling():
+    recorder = Recorder()
+    dispatcher = VoteDispatcher(recorder, workers=1)
+    cb = _create_callback(recorder, "foobar", dispatcher=dispatcher)
+    response = await cb(FakeRequest())
+    assert response.status == 200
+    # The vote has been accepted, but the worker hasn't had a chance to run yet.
+    assert recorder.votes == []
+    await dispatcher.join()
+    assert len(recorder.votes) == 1
+    await dispatcher.close()
+
+
+async def test_vote_server_sheds_load():
+    recorder = Recorder()
+    dispatcher = VoteDispatcher(recorder, workers=1, max_queue=2, retry_after=7)
+    cb = _create_callback(recorder, "foobar", dispatcher=dispatcher)
+    statuses = [(await cb(FakeRequest())).status for _ in range(3)]
+    assert statuses == [200, 200, 503]
+    response = await cb(FakeRequest())
+    assert response.headers["Retry-After"] == "7"
+    assert dispatcher.accepted == 2 and dispatcher.refused == 2
+    await dispatcher.close()
+    assert len(recorder.votes) == 2
+
+
+class SlowBot(Recorder):
+    # A discord.py bot, whose on_vote (and listeners) bot.dispatch would only schedule, and not wait for.
+    def __init__(self):
+        super().__init__()
+        self.gate = asyncio.Event()
+        self.running = 0
+        self.extra_events = {"on_vote": [self.listener]}
+
+    async def on_vote(self, vote: Vote):
+        self.running += 1
+        await self.gate.wait()
+        self.votes.append(vote)
+
+    async def listener(self, vote: Vote):
+        raise RuntimeError
+
+
+async def test_vote_server_sheds_load_with_slow_on_vote():
+    bot = SlowBot()
+    dispatcher = VoteDispatcher(bot, workers=1, max_queue=1)
+    cb = _create_callback(bot, "foobar", dispatcher=dispatcher)
+    assert (await cb(FakeRequest())).status == 200
+    await asyncio.sleep(0.01)  # the worker takes the vote, and waits on on_vote
+    assert (await cb(FakeRequest())).status == 200
+    assert (await cb(FakeRequest())).status == 503
+    assert bot.running == 1 and dispatcher.pending == 1
+    bot.gate.set()
+    await dispatcher.close()
+    assert len(bot.votes) == 2 and dispatcher.handled == 2 and dispatcher.failed == 2
+
+
+async def test_vote_dispatcher_workers():
+    seen = []
+    dispatcher = VoteDispatcher(workers=4, max_queue=100)
+
+    @dispatcher.add_listener
+    async def slow(vote):
+        await asyncio.sleep(0.01)
+        seen.append(vote)
+
+    @dispatcher.add_listener
+    def broken(_):
+        raise RuntimeError
+
+    for _ in range(20):
+        assert dispatcher.submit(cast_vote(POST_DATA))
+    assert dispatcher.pending == 20
+    await dispatcher.close()
+    assert len(seen) == 20
+    assert dispatcher.handled == 20 and dispatcher.failed == 20
+    assert not dispatcher.running
+
+
+async def test_vote_server_dedup():
+    recorder = Recorder()
+    dedup = VoteDeduplicator(60)
+    cb = _create_callback(recorder, "foobar", deduplicator=dedup)
+    for _ in range(3):
+        assert (await cb(FakeRequest())).status == 200
+    assert len(recorder.votes) == 1
+    assert dedup.hits == 2 and dedup.misses == 1
+    other = dict(POST_DATA, user="421698654189912065")
+    assert (await cb(FakeRequest(other))).status == 200
+    assert len(recorder.votes) == 2
+
+
+def test_dedup_expiry_and_bound():
+    now = [0.0]
+    dedup = VoteDeduplicator(10, max_size=2)
+    dedup._clock = lambda: now[0]
+    votes = [cast_vote(dict(POST_DATA, user=str(n))) for n in range(3)]
+    assert not dedup.check(votes[0])
+    now[0] = 5
+    assert dedup.check(votes[0])
+    now[0] = 10
+    assert not dedup.check(votes[0])  # expired
+    assert not dedup.check(votes[1])
+    assert not dedup.check(votes[2])  # evicts votes[0]
+    assert len(dedup) == 2 and votes[0] not in dedup
+    dedup.forget(votes[1])
+    assert not dedup.check(votes[1])
+
+
+async def test_vote_server_dedup_forgets_refused():
+    recorder = Recorder()
+    dedup = VoteDeduplicator(60)
+    dispatcher = VoteDispatcher(recorder, workers=1, max_queue=1)
+    cb = _create_callback(recorder, "foobar", dispatcher=dispatcher, deduplicator=dedup)
+    assert (await cb(FakeRequest())).status == 200
+    other = dict(POST_DATA, user="1")
+    assert (await cb(FakeRequest(other))).status == 503
+    await dispatcher.join()
+    # The refused vote must be accepted when top.gg retries it.
+    assert (await cb(FakeRequest(other))).status == 200
+    await dispatcher.close()
+    assert len(recorder.votes) == 2
+
+
+async def test_vote_batcher_size_and_delay():
+    recorder = Recorder()
+    batcher = VoteBatcher(recorder, max_size=3, max_delay=0.05)
+    cb = _create_callback(recorder, "foobar", batcher=batcher)
+    for n in range(4):
+        assert (await cb(FakeRequest(dict(POST_DATA, user=str(n))))).status == 200
+    await asyncio.sleep(0)
+    # The first three filled a batch; the last one waits for max_delay.
+    assert batcher.batches == 1 and batcher.pending == 1
+    await asyncio.sleep(0.1)
+    assert batcher.batches == 2 and batcher.votes == 4
+    assert len(recorder.votes) == 4 + 2  # on_vote for each vote, and on_vote_batch for each batch
+
+
+async def test_vote_batcher_serialises_batches():
+    batcher = VoteBatcher(max_size=2, max_delay=10)
+    sizes = []
+
+    @batcher.add_listener
+    async def slow(votes):
+        sizes.append(len(votes))
+        await asyncio.sleep(0.01)
+
+    batcher.add(cast_vote(POST_DATA))
+    batcher.add(cast_vote(POST_DATA))
+    await asyncio.sleep(0)
+    # While the first batch is being handled, everything that arrives is merged into the next one.
+    for _ in range(7):
+        batcher.add(cast_vote(POST_DATA))
+    await asyncio.sleep(0)
+    await batcher.close()
+    assert sizes == [2, 7]
+    assert batcher.pending == 0
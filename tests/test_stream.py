@@ -0,0 +1,67 @@
+import asyncio
+import os
+
+from toppy.models import cast_vote
+from toppy.server import VoteSubscription, WebhookServer
+
+from .test_server import FakeRequest, POST_DATA, Recorder
+
+
+def votes(count):
+    return [cast_vote(dict(POST_DATA, user=str(n))) for n in range(count)]
+
+
+async def drain(subscription):
+    return [vote._user async for vote in subscription]
+
+
+async def test_drop_oldest():
+    subscription = VoteSubscription(max_size=2)
+    for vote in votes(5):
+        await subscription.put(vote)
+    subscription.close()
+    assert await drain(subscription) == ["3", "4"]
+    assert subscription.dropped == 3
+
+
+async def test_block():
+    subscription = VoteSubscription(max_size=2, overflow="block")
+    producer = asyncio.ensure_future(asyncio.gather(*(subscription.put(vote) for vote in votes(4))))
+    await asyncio.sleep(0)
+    assert not producer.done() and len(subscription) == 2
+    assert (await subscription.get())._user == "0"
+    assert (await subscription.get())._user == "1"
+    await producer
+    subscription.close()
+    assert await drain(subscription) == ["2", "3"]
+    assert subscription.dropped == 0
+
+
+async def test_spill_keeps_order(tmp_path):
+    path = str(tmp_path / "spill.ndjson")
+    subscription = VoteSubscription(max_size=2, overflow="spill", spill_path=path)
+    for vote in votes(5):
+        await subscription.put(vote)
+    assert subscription.spilled == 3 and len(subscription) == 5
+    assert [(await subscription.get())._user for _ in range(3)] == ["0", "1", "2"]
+    # Still spilling until the spill file has been read, so that votes stay in order.
+    await subscription.put(cast_vote(dict(POST_DATA, user="5")))
+    subscription.close()
+    assert await drain(subscription) == ["3", "4", "5"]
+    assert os.path.getsize(path) == 0
+
+
+async def test_server_fan_out():
+    server = WebhookServer()
+    await server.register(Recorder(), path="/one", auth="foobar")
+    await server.register(Recorder(), path="/two", auth="foobar")
+    everything = server.votes()
+    only_one = server.votes("/one", max_size=1)
+    for path in ("/one", "/two", "/one"):
+        request = FakeRequest()
+        request.path = path
+        assert (await server._route(request)).status == 200
+    await server.close()
+    assert len(await drain(everything)) == 3
+    assert len(await drain(only_one)) == 1 and only_one.dropped == 1
+    assert not server._subscriptions
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from toppy.streaming import iter_json_array
+
+
+async def _chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+BOTS = [
+    {"id": str(n), "username": "bot ☃ %d" % n, "points": n * 1000, "tags": ["a", "b"], "certifiedBot": n % 2 == 0}
+    for n in range(25)
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 20])
+async def test_stream_keyed_array(chunk_size: int):
+    document = json.dumps({"limit": 25, "results": BOTS, "offset": 12345, "count": 25}, indent=1).encode()
+    meta = {}
+    items = [item async for item in iter_json_array(_chunked(document, chunk_size), "results", meta=meta)]
+    assert items == BOTS
+    assert meta == {"limit": 25, "offset": 12345, "count": 25}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 20])
+async def test_stream_top_level_array(chunk_size: int):
+    document = json.dumps(BOTS).encode()
+    items = [item async for item in iter_json_array(_chunked(document, chunk_size))]
+    assert items == BOTS
+
+
+@pytest.mark.parametrize("document", [b"[]", b" [ ] ", b'{"results": []}', b"{}"])
+async def test_stream_empty(document: bytes):
+    key = "results" if document.startswith(b"{") else None
+    assert [item async for item in iter_json_array(_chunked(document, 1), key)] == []
+
+
+@pytest.mark.parametrize("document", [b'[{"id": 1}', b'[{"id": 1} {"id": 2}]', b'{"results": 1}'])
+async def test_stream_malformed(document: bytes):
+    with pytest.raises(ValueError):
+        async for _ in iter_json_array(_chunked(document, 4), "results" if document.startswith(b"{") else None):
+            pass
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import socket
+import time
+
+import aiohttp
+import pytest
+
+from toppy.server import WebhookServer
+from toppy.server.ipc import _Forwarder, _IPCServer
+from toppy.server.limits import _RejectionLog, _SourceLimiter
+
+from .test_server import POST_DATA, Recorder
+
+
+async def post(session, url, auth, data=None):
+    async with session.post(url, json=data or POST_DATA, headers={"Authorization": auth}) as response:
+        return response.status
+
+
+async def test_multiple_bots_one_server():
+    one, two = Recorder(), Recorder()
+    server = WebhookServer(host="127.0.0.1", port=0)
+    await server.register(one, path="/one", auth="first")
+    await server.register(two, path="/two", auth="second", workers=2)
+    async with server, aiohttp.ClientSession() as session:
+        host, port = server.addresses[0][:2]
+        base = f"http://{host}:{port}"
+        assert await post(session, base + "/one", "first") == 200
+        assert await post(session, base + "/two", "second") == 200
+        assert await post(session, base + "/two", "first") == 401
+        assert await post(session, base + "/three", "first") == 404
+
+        # Bots can come and go while the server is running.
+        await server.unregister("/one")
+        assert await post(session, base + "/one", "first") == 404
+        await server.register(one, path="/three", auth="third")
+        assert await post(session, base + "/three", "third") == 200
+        assert sorted(server.paths) == ["/three", "/two"]
+    assert len(one.votes) == 2
+    assert len(two.votes) == 1  # the dispatcher was drained on close
+    assert server.paths == []
+
+
+async def test_duplicate_path():
+    server = WebhookServer()
+    await server.register(Recorder(), path="/")
+    with pytest.raises(ValueError):
+        await server.register(Recorder(), path="/")
+
+
+unix_only = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@unix_only
+async def test_unix_socket(tmp_path):
+    recorder = Recorder()
+    sock = str(tmp_path / "webhook.sock")
+    server = WebhookServer(port=None, unix_path=sock)
+    await server.register(recorder, auth="foobar")
+    async with server, aiohttp.ClientSession(connector=aiohttp.UnixConnector(path=sock)) as session:
+        assert await post(session, "http://localhost/", "foobar") == 200
+    assert len(recorder.votes) == 1
+
+
+@unix_only
+async def test_worker_processes():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    recorder = Recorder()
+    server = WebhookServer(host="127.0.0.1", port=port, processes=2, max_body_size=128 * 1024)
+    await server.register(recorder, path="/votes", auth="foobar", dedup_window=60)
+    async with server, aiohttp.ClientSession() as session:
+        base = f"http://127.0.0.1:{port}"
+        url = base + "/votes"
+        # Bigger than asyncio's default 64 KiB line limit, but within max_body_size.
+        large = dict(POST_DATA, user="2", query="x" * 70_000)
+        for _ in range(3):  # enough that both workers are likely to forward one
+            assert await post(session, url, "foobar", large) == 200
+        assert await post(session, url, "foobar") == 200
+        assert await post(session, url, "foobar") == 200  # a duplicate, caught in this process
+        assert await post(session, url, "wrong") == 401
+        assert await post(session, url + "/nope", "foobar") == 404
+        assert await post(session, url, "foobar", {"user": None}) == 422
+        # Workers check auth themselves, so unauthorised requests never reach this process, even for new paths.
+        await server.register(recorder, path="/late", auth="late")
+        await asyncio.sleep(0.1)
+        forwarded = []
+        server._ipc.router = lambda *args: forwarded.append(args) or server._route_forwarded(*args)
+        for _ in range(4):
+            assert await post(session, url, "wrong") == 401
+            assert await post(session, base + "/late", "foobar") == 401
+        assert not forwarded
+        assert await post(session, base + "/late", "late", dict(POST_DATA, user="3")) == 200
+        assert len(forwarded) == 1
+    assert len(recorder.votes) == 3
+    assert not server._workers
+
+
+@unix_only
+async def test_ipc_recovers(tmp_path):
+    async def router(path, remote, authorization, data):
+        return 200, str(len(data["query"])), None
+
+    path = str(tmp_path / "ipc.sock")
+    server = _IPCServer(path, router, max_body_size=1024)
+    await server.start()
+    forwarder = _Forwarder(path, max_body_size=1024, timeout=1)
+    await forwarder.connect()
+    assert await forwarder.forward("/", "remote", "", {"query": "\x01" * 1024}) == [200, "1024", None]
+
+    # A bad record is skipped, without dropping the connection.
+    forwarder._writer.write(b"not json\n" + b"x" * server.limit * 2 + b"\n")
+    assert await forwarder.forward("/", "remote", "", {"query": "x"}) == [200, "1", None]
+
+    # A lost connection is re-established by the next vote.
+    forwarder._writer.close()
+    await asyncio.sleep(0.05)
+    assert forwarder._writer is None
+    assert await forwarder.forward("/", "remote", "", {"query": "xy"}) == [200, "2", None]
+    assert server.connected == 1
+    await forwarder.close()
+    await server.close()
+
+
+async def test_request_limits():
+    recorder = Recorder()
+    server = WebhookServer(host="127.0.0.1", port=0, max_body_size=1024, rate_limit=1, rate_burst=3)
+    await server.register(recorder, auth="foobar")
+    async with server, aiohttp.ClientSession() as session:
+        host, port = server.addresses[0][:2]
+        url = f"http://{host}:{port}/"
+        assert await post(session, url, "foobar", dict(POST_DATA, query="x" * 2048)) == 413
+        assert await post(session, url, "wrong") == 401
+        assert await post(session, url, "foobar") == 200
+        assert await post(session, url, "foobar") == 429
+    assert server.rejections == {"too large": 1, "unauthorized": 1, "ratelimited": 1}
+    assert len(recorder.votes) == 1
+
+
+def test_source_limiter(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    limiter = _SourceLimiter(rate=2, burst=2, max_sources=2)
+    assert [limiter.allow("a") for _ in range(3)] == [True, True, False]
+    assert limiter.allow("b")
+    now[0] = 0.5
+    assert limiter.allow("a") and not limiter.allow("a")
+    limiter.allow("c")  # "b" is forgotten, so it starts with a full bucket again
+    assert limiter.allow("b") and limiter.allow("b")
+
+
+def test_rejection_log_is_sampled(caplog):
+    log = _RejectionLog(interval=60)
+    with caplog.at_level(logging.WARNING, logger="toppy.server.limits"):
+        for _ in range(100):
+            log("unauthorized", "127.0.0.1")
+    assert len(caplog.records) == 1
+    assert log.totals == {"unauthorized": 100}
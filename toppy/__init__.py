@@ -1,20 +1,25 @@
 from sys import version_info as python_version_info
 
-try:
-    from discord import version_info as discord_version_info
-except ImportError as e:
-    raise ImportError("A module with the 'discord' namespace is not installed.") from e
+from importlib.util import find_spec
 from warnings import warn
 
-if python_version_info <= (3, 6, 0) and discord_version_info >= (1, 8, 0):
-    warn(
-        "Python 3.6 is no-longer supported by discord.py. Please update your python version.\n"
-        "This module will cease support when discord.py 2.0.0 is released.",
-        DeprecationWarning,
-    )
+# discord.py is optional: without it, the client can still be used headless (see TopGG's bot_id), and webhooks can be
+# received (see ``python -m toppy serve``). It's slow to import, so it's only imported here when there's a reason to.
+if python_version_info <= (3, 6, 0) and find_spec("discord") is not None:
+    from discord import version_info as discord_version_info
+
+    if discord_version_info >= (1, 8, 0):
+        warn(
+            "Python 3.6 is no-longer supported by discord.py. Please update your python version.\n"
+            "This module will cease support when discord.py 2.0.0 is released.",
+            DeprecationWarning,
+        )
 
 from .client import TopGG
 from .client import TopGG as Client
 from .client import TopGG as DBLClient
+from .batch import BatchResult
+from .cache import ResponseCache
 from .models import *
+from .ratelimiter import Priority
 from .server import *
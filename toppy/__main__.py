@@ -1,4 +1,8 @@
-from argparse import ArgumentParser
+from argparse import SUPPRESS, ArgumentParser, Namespace
+import asyncio
+import logging
+import os
+import signal
 import sys
 import platform
 from re import compile
@@ -6,14 +10,12 @@ from subprocess import run, PIPE, DEVNULL
 import datetime
 from pathlib import Path
 
-parser = ArgumentParser()
-
 CLIENT = Path(__file__).parent / "client.py"
 
-parser.add_argument("-V", "--version", help="Display version information", action="store_true")
-args = parser.parse_args()
+logger = logging.getLogger("toppy")
+
 
-if args.version:
+def print_version():
     try:
         pip_version = run(("pip", "--version"), stdout=PIPE, stderr=DEVNULL).stdout.split(b" ")[1].decode()
     except FileNotFoundError:
@@ -38,3 +40,262 @@ if args.version:
     except ImportError:
         print("Not Installed")
     print("-" * 15)
+
+
+async def serve(args: Namespace, stop: asyncio.Event = None):
+    """
+    Runs a webhook server without a discord bot, forwarding every vote to a sink (see toppy.server.sinks).
+
+    Runs until SIGINT/SIGTERM (or until ``stop`` is set), then shuts down gracefully, sending any votes still
+    waiting to be batched.
+
+    With ``--journal``, every vote is written to disk before top.gg gets its 200, and only marked as handled once the
+    sink has taken its batch. Batches the sink failed to take are sent again on the next start.
+    """
+    from .server import VoteBatcher, WebhookServer
+    from .server.sinks import open_sink
+
+    sink = open_sink(args.sink)
+    batcher = VoteBatcher(max_size=args.batch_size, max_delay=args.batch_delay)
+
+    @batcher.add_listener
+    async def forward(votes):
+        await sink.send([vote.to_dict() for vote in votes])
+
+    server = WebhookServer(
+        host=args.host,
+        port=None if args.port < 0 else args.port,
+        unix_path=args.unix_path,
+        processes=args.processes,
+        max_body_size=args.max_body_size,
+        rate_limit=args.rate_limit,
+        verbose=args.verbose,
+    )
+    await server.register(
+        None,
+        path=args.path,
+        auth=args.auth,
+        dedup_window=args.dedup_window,
+        journal_path=args.journal,
+        batcher=batcher,
+    )
+
+    if stop is None:
+        stop = asyncio.Event()
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:  # Windows, where Ctrl+C raises KeyboardInterrupt instead
+                pass
+    await server.start()
+    logger.info("Receiving votes on %s and sending them to %s.", args.path, args.sink)
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Shutting down.")
+        await server.close()
+        await sink.close()
+
+
+async def export(args: Namespace) -> int:
+    """
+    Exports the bot listing to a file (or stdout), page by page. See toppy.export.export_bots.
+
+    Returns the exit code: non-zero if the export stopped early, in which case how to resume it is logged.
+    """
+    from .client import TopGG
+    from .errors import ToppyError
+    from .export import export_bots
+
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "ndjson")
+    fields = args.fields.split(",") if args.fields else None
+    search = dict(pair.partition("=")[::2] for pair in args.search)
+    client = TopGG(token=args.token, base_url=args.base_url)
+    offset = args.offset
+    if args.output == "-":
+        out, header = sys.stdout, True
+    else:
+        # Resuming appends to what the earlier export wrote.
+        out = open(args.output, "a" if args.offset else "w", newline="" if fmt == "csv" else None, encoding="utf-8")
+        header = out.tell() == 0
+    try:
+        offset = await export_bots(
+            client,
+            out,
+            format=fmt,
+            fields=fields,
+            offset=args.offset,
+            limit=args.limit,
+            search=search or None,
+            sort=args.sort,
+            header=header,
+        )
+    except (ToppyError, OSError) as e:
+        logger.error("Export failed: %s", e)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if client.session:
+            await client.session.close()
+    logger.info("Exported %d bots.", offset - args.offset)
+    return 0
+
+
+async def loadtest_webhook(args: Namespace) -> int:
+    """Sends synthetic votes to a webhook server and prints how it coped. See toppy.loadtest.run_loadtest."""
+    from .loadtest import run_loadtest
+
+    if args.ramp_to:
+        logger.info(
+            "Sending %d votes to %s, ramping from %d to %d concurrent requests...",
+            args.requests,
+            args.url,
+            args.concurrency,
+            args.ramp_to,
+        )
+    else:
+        logger.info("Sending %d votes to %s, %d at a time...", args.requests, args.url, args.concurrency)
+    result = await run_loadtest(
+        args.url,
+        auth=args.auth,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        ramp_to=args.ramp_to,
+        kind=args.kind,
+        target_id=args.target_id,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    print(result.summary())
+    return 0 if result.ok else 1
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(prog="python -m toppy")
+    parser.add_argument("-V", "--version", help="Display version information", action="store_true")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    serve_parser = commands.add_parser(
+        "serve",
+        help="Run a standalone webhook server, forwarding votes to a file, socket or URL",
+        description="Receives top.gg vote webhooks without logging in to Discord, and forwards them in batches to "
+        "a sink: '-' (stdout), a file (NDJSON), 'unix:<path>' (NDJSON over a Unix socket), or an http(s) URL "
+        "(POSTed as a JSON array).",
+    )
+    serve_parser.add_argument("sink", help="Where to send votes")
+    serve_parser.add_argument("--host", default="0.0.0.0", help="The host to listen on (default: %(default)s)")
+    serve_parser.add_argument("--port", type=int, default=8080, help="The port to listen on, or -1 for no TCP")
+    serve_parser.add_argument("--path", default="/", help="The path top.gg sends votes to (default: %(default)s)")
+    serve_parser.add_argument(
+        "--auth",
+        default=os.environ.get("TOPPY_WEBHOOK_AUTH"),
+        help="The webhook authorization set on top.gg. Defaults to $TOPPY_WEBHOOK_AUTH",
+    )
+    serve_parser.add_argument("--unix-path", help="Also listen on this Unix domain socket")
+    serve_parser.add_argument("--processes", type=int, default=0, help="Receive votes in this many processes")
+    serve_parser.add_argument("--batch-size", type=int, default=100, help="The most votes to send at once")
+    serve_parser.add_argument(
+        "--batch-delay", type=float, default=1.0, help="The longest to wait for a batch to fill, in seconds"
+    )
+    serve_parser.add_argument(
+        "--dedup-window", type=float, default=300, help="Ignore repeated deliveries within this many seconds"
+    )
+    serve_parser.add_argument(
+        "--journal", help="Keep votes in this file until the sink has taken them, and resend any it didn't on start"
+    )
+    serve_parser.add_argument("--max-body-size", type=int, default=16 * 1024, help="The largest body to accept")
+    serve_parser.add_argument("--rate-limit", type=float, help="Requests per second allowed from each address")
+    serve_parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+
+    export_parser = commands.add_parser(
+        "export",
+        help="Export the bot listing to NDJSON or CSV",
+        description="Pages through every bot on top.gg, writing each page as it arrives. Waits out ratelimits "
+        "instead of failing, and can resume from an offset.",
+    )
+    export_parser.add_argument(
+        "-o", "--output", default="-", help="The file to write to, or '-' for stdout (default: %(default)s)"
+    )
+    export_parser.add_argument(
+        "--format", choices=("ndjson", "csv"), help="The format to write. Defaults to csv for .csv files, else ndjson"
+    )
+    export_parser.add_argument("--fields", help="Comma separated top.gg fields to export, e.g. id,username,points")
+    export_parser.add_argument(
+        "--offset", type=int, default=0, help="How many bots to skip. Appends to --output, to resume an export"
+    )
+    export_parser.add_argument("--limit", type=int, help="The most bots to export (default: all of them)")
+    export_parser.add_argument("--sort", help="The field to sort by, e.g. -points. Keeps pages stable when resuming")
+    export_parser.add_argument(
+        "--search", action="append", default=[], metavar="FIELD=VALUE", help="Only export matching bots. Repeatable"
+    )
+    export_parser.add_argument(
+        "--token",
+        default=os.environ.get("TOPPY_TOKEN"),
+        help="Your top.gg API token. Defaults to $TOPPY_TOKEN",
+    )
+    export_parser.add_argument("--base-url", help=SUPPRESS)
+
+    loadtest_parser = commands.add_parser(
+        "loadtest-webhook",
+        help="Measure how many votes per second a webhook server can take",
+        description="Sends synthetic votes to a webhook server, then reports throughput and p50/p95/p99 latency. "
+        "Only use this against servers you run: the bots behind them will see every vote.",
+    )
+    loadtest_parser.add_argument("url", help="The webhook URL, e.g. http://localhost:8080/dblwebhook")
+    loadtest_parser.add_argument(
+        "--auth",
+        default=os.environ.get("TOPPY_WEBHOOK_AUTH"),
+        help="The webhook authorization. Defaults to $TOPPY_WEBHOOK_AUTH",
+    )
+    loadtest_parser.add_argument("-n", "--requests", type=int, default=1000, help="How many votes to send")
+    loadtest_parser.add_argument(
+        "-c", "--concurrency", type=int, default=10, help="How many requests to have in flight at once"
+    )
+    loadtest_parser.add_argument("--ramp-to", type=int, help="Ramp concurrency up to this by the end of the test")
+    loadtest_parser.add_argument(
+        "--kind", choices=("bot", "server", "mixed"), default="bot", help="What kind of votes to send"
+    )
+    loadtest_parser.add_argument("--target-id", type=int, default=1, help="The bot/server ID to put in votes")
+    loadtest_parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for each response")
+    loadtest_parser.add_argument("--seed", type=int, help="Seeds the random voter IDs, for repeatable runs")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.version:
+        print_version()
+        return 0
+    if args.command is None:
+        parser.print_help()
+        return 0
+    if args.command == "export" and not args.token:
+        parser.error("export needs an API token: pass --token or set $TOPPY_TOKEN")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+    if args.command == "serve" and not args.auth:
+        logger.warning("No --auth given, so anyone can send votes to this server.")
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        if args.command == "export":
+            return loop.run_until_complete(export(args))
+        if args.command == "loadtest-webhook":
+            return loop.run_until_complete(loadtest_webhook(args))
+        loop.run_until_complete(serve(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+from typing import TYPE_CHECKING
+
+import aiohttp
+
+from .errors import Ratelimited, ToppyError
+from .ratelimiter import Priority
+
+if TYPE_CHECKING:
+    from .client import TopGG
+
+
+__all__ = (
+    "BatchResult",
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _snowflake(item) -> int:
+    if isinstance(item, int):
+        return item
+    # Webhook votes are about the user who voted, not the vote itself.
+    user_id = getattr(item, "user_id", None)
+    return int(item.id) if user_id is None else user_id
+
+
+def _unique_ids(items: Iterable) -> List[int]:
+    # IDs, or anything with an ``id`` (discord users, SimpleUsers...) or ``user_id`` (votes), in order, once each.
+    return list(dict.fromkeys(map(_snowflake, items)))
+
+
+class BatchResult(Generic[T]):
+    r"""
+    The results of a batch lookup, such as :meth:`toppy.client.TopGG.fetch_bots_by_id`.
+
+    One failed lookup doesn't fail the batch: every ID ends up in exactly one of :attr:`results` or :attr:`errors`,
+    in the order they were asked for.
+
+    .. code-block::
+
+        batch = await client.fetch_bots_by_id(team_bot_ids)
+        for bot in batch:
+            print(bot.username, bot.monthly_votes)
+        for bot_id, error in batch.errors.items():
+            print(bot_id, "failed:", error)
+
+    Attributes:
+        results: :class:`py:dict`
+            ``{id: result}`` for every ID that was looked up successfully.
+        errors: :class:`py:dict`
+            ``{id: exception}`` for every ID that wasn't, e.g. :class:`toppy.errors.NotFound`.
+    """
+
+    def __init__(self, results: Dict[int, T], errors: Dict[int, Exception]):
+        self.results = results
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        r"""Whether every lookup succeeded."""
+        return not self.errors
+
+    def raise_for_errors(self):
+        r"""
+        Raises the first error, if any lookup failed.
+
+        :raises toppy.errors.ToppyError: A lookup failed.
+        """
+        for error in self.errors.values():
+            raise error
+
+    def __getitem__(self, snowflake: int) -> T:
+        return self.results[snowflake]
+
+    def __contains__(self, snowflake: int) -> bool:
+        return snowflake in self.results
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.results.values())
+
+    def __len__(self):
+        return len(self.results)
+
+    def __repr__(self):
+        return f"BatchResult(results={len(self.results)}, errors={len(self.errors)})"
+
+
+async def _run_batch(
+    client: "TopGG",
+    items: Iterable,
+    fetch: Callable[[int], Awaitable[T]],
+    *,
+    uri: str = None,
+    priority: Priority = Priority.NORMAL,
+    concurrency: int = 10,
+    wait: bool = False,
+    lookup: Callable[[int], Optional[T]] = None,
+    catch: Tuple[Type[BaseException], ...] = (ToppyError, aiohttp.ClientError, asyncio.TimeoutError),
+) -> BatchResult[T]:
+    # Looks up every unique ID in ``items`` with ``fetch``, at most ``concurrency`` at a time, and never sending more
+    # requests at once than the ratelimit buckets for ``uri`` (if any) have budget left for. ``lookup`` answers from
+    # the cache first, if it can (raising NotFound for a cached miss), so that cached IDs never wait for budget.
+    # Errors in ``catch`` are recorded against their ID; anything else fails the batch.
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1.")
+    ids = _unique_ids(items)
+    buckets = client._buckets(uri) if uri is not None else ()
+    condition = asyncio.Condition()
+    in_flight = 0
+    results: Dict[int, T] = {}
+    errors: Dict[int, Exception] = {}
+
+    async def acquire():
+        nonlocal in_flight
+        async with condition:
+            while True:
+                budget = min((bucket.remaining_for(priority) for bucket in buckets), default=concurrency)
+                if in_flight < min(concurrency, budget):
+                    in_flight += 1
+                    return
+                if in_flight:
+                    # Whatever is in flight will either free up a slot, or use up the budget it was counted against.
+                    await condition.wait()
+                elif wait:
+                    await client._wait_for_budget(uri, priority)
+                else:
+                    raise Ratelimited(max(bucket.retry_after for bucket in buckets), internal=True)
+
+    async def release():
+        nonlocal in_flight
+        async with condition:
+            in_flight -= 1
+            condition.notify_all()
+
+    async def one(snowflake: int):
+        try:
+            if lookup is not None:
+                cached = lookup(snowflake)
+                if cached is not None:
+                    results[snowflake] = cached
+                    return
+            await acquire()
+            try:
+                results[snowflake] = await fetch(snowflake)
+            finally:
+                await release()
+        except catch as e:
+            logger.debug(f"Batch lookup of {snowflake} failed: {e!r}")
+            errors[snowflake] = e
+
+    await asyncio.gather(*(one(snowflake) for snowflake in ids))
+    # gather finished them in whatever order; hand them back in the order they were asked for.
+    return BatchResult(
+        {snowflake: results[snowflake] for snowflake in ids if snowflake in results},
+        {snowflake: errors[snowflake] for snowflake in ids if snowflake in errors},
+    )
@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+from .errors import NotFound
+
+
+__all__ = (
+    "ResponseCache",
+)
+
+# Stored in place of a value to remember that top.gg said there wasn't one.
+_MISSING = object()
+
+
+class ResponseCache:
+    r"""
+    A bounded cache of API lookups, used by :meth:`toppy.client.TopGG.fetch_bot`,
+    :meth:`toppy.client.TopGG.fetch_user` and :meth:`toppy.client.TopGG.get_stats`.
+
+    It remembers both what was found (for ``ttl`` seconds) and what wasn't (for ``negative_ttl`` seconds). Asking
+    again about an ID that top.gg said isn't listed raises :class:`toppy.errors.NotFound` straight away, without
+    spending a request (or ratelimit budget) on it.
+
+    Found and missing entries share one table, keyed by ``(kind, id)``, so storing one always replaces the other,
+    and :meth:`invalidate` drops whichever there is. Once full, the least recently used entries are evicted first.
+
+    .. code-block::
+
+        client.cache = ResponseCache(ttl=60, negative_ttl=3600)  # also cache bots and users for a minute
+        client.cache.invalidate("bot", bot_id)  # e.g. after being told it was just approved
+
+    :param ttl: How long, in seconds, to remember bots and users that were found. 0 disables this.
+    :param negative_ttl: How long, in seconds, to remember IDs that weren't found. 0 disables this.
+    :param max_size: The most entries to keep.
+    :type ttl: :class:`py:float`
+    :type negative_ttl: :class:`py:float`
+    :type max_size: :class:`py:int`
+
+    Attributes:
+        hits: :class:`py:int`
+            How many lookups were answered with a cached value.
+        negative_hits: :class:`py:int`
+            How many lookups were answered with a cached :class:`toppy.errors.NotFound`.
+        misses: :class:`py:int`
+            How many lookups weren't cached, so had to be sent to top.gg.
+    """
+
+    def __init__(self, *, ttl: float = 0.0, negative_ttl: float = 300.0, max_size: int = 10000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.hits = self.negative_hits = self.misses = 0
+        # (kind, key) -> (expiry, value), least recently used first.
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._clock = time.monotonic
+
+    def get(self, kind: str, key: Hashable) -> Any:
+        r"""
+        Returns the cached value for ``key``, or None if it isn't cached.
+
+        :param kind: What was looked up, e.g. ``"bot"`` or ``"user"``.
+        :param key: The ID that was looked up.
+        :raises toppy.errors.NotFound: top.gg recently said there is nothing with that ID.
+        """
+        entry = self._entries.get((kind, key))
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end((kind, key))
+                if entry[1] is _MISSING:
+                    self.negative_hits += 1
+                    raise NotFound()
+                self.hits += 1
+                return entry[1]
+            del self._entries[(kind, key)]
+        self.misses += 1
+        return None
+
+    def missing(self, kind: str, key: Hashable) -> bool:
+        r"""
+        Whether top.gg recently said there is nothing with that ID. Unlike :meth:`get`, this never raises.
+
+        :rtype: :class:`py:bool`
+        """
+        entry = self._entries.get((kind, key))
+        return entry is not None and entry[1] is _MISSING and entry[0] > self._clock()
+
+    def _store(self, kind: str, key: Hashable, value: Any, ttl: float):
+        if ttl <= 0:
+            # Not caching this kind of result, but it still replaces whatever was cached before.
+            self._entries.pop((kind, key), None)
+            return
+        self._entries[(kind, key)] = (self._clock() + ttl, value)
+        self._entries.move_to_end((kind, key))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def set(self, kind: str, key: Hashable, value: Any):
+        r"""Remembers that ``key`` was found, replacing any record of it being missing."""
+        self._store(kind, key, value, self.ttl)
+
+    def set_missing(self, kind: str, key: Hashable):
+        r"""Remembers that ``key`` wasn't found, replacing any cached value for it."""
+        self._store(kind, key, _MISSING, self.negative_ttl)
+
+    def invalidate(self, kind: str, key: Hashable):
+        r"""Forgets whatever is cached for ``key``, found or missing."""
+        self._entries.pop((kind, key), None)
+
+    def clear(self):
+        r"""Forgets everything."""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (
+            f"ResponseCache(ttl={self.ttl}, negative_ttl={self.negative_ttl}, size={len(self)}, hits={self.hits}, "
+            f"negative_hits={self.negative_hits}, misses={self.misses})"
+        )
@@ -1,15 +1,21 @@
 import logging
 import warnings
 from json import dumps
+from typing import AsyncIterator
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import TYPE_CHECKING
+from typing import Tuple
 from typing import Union
 
+import asyncio
+
 import aiohttp
-import discord
-from discord.ext.tasks import loop
 
+from .batch import BatchResult
+from .batch import _run_batch
+from .cache import ResponseCache
 from .errors import Forbidden
 from .errors import NotFound
 from .errors import Ratelimited
@@ -18,13 +24,18 @@ from .errors import ToppyError
 from .models import Bot
 from .models import BotSearchResults
 from .models import BotStats
+from .models import Interner
+from .models import SharedVote
 from .models import SimpleUser
 from .models import User
+from .ratelimiter import Priority
 from .ratelimiter import routes
+from .streaming import iter_json_array
 
 # noinspection PyPep8Naming
 
 if TYPE_CHECKING:
+    import discord
     from discord import AutoShardedClient as _AutoClient
     from discord import Client as _Client
     from discord.ext.commands import AutoShardedBot as _AutoBot
@@ -43,6 +54,20 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _in_bots_bucket(uri: str) -> bool:
+    """Whether a request to ``uri`` counts against the ``/bots/*`` bucket: the listing (``/bots?...``) does too."""
+    path = uri.partition("?")[0]
+    return path == "/bots" or path.startswith("/bots/")
+
+
+def _projection(fields: Iterable[str]) -> Tuple[str, ...]:
+    """Normalises a field projection, making sure ``id`` is always requested and there are no duplicates."""
+    if isinstance(fields, str):
+        # A single field, rather than the characters of one.
+        fields = (fields,)
+    return tuple(dict.fromkeys(("id", *fields)))
+
+
 class TopGG:
     r"""
     The client class for the top.gg API.
@@ -51,36 +76,83 @@ class TopGG:
     class.
 
     Attributes:
-        bot: Union[:class:`discord:discord.Client`, :class:`discord:discord.ext.commands.Bot`]
+        bot: Optional[Union[:class:`discord:discord.Client`, :class:`discord:discord.ext.commands.Bot`]]
             The bot that this instance is running under. Can be any instance of bot, not just the ones listed.
+            None if the client is headless (see ``bot_id``).
+
+        bot_id: Optional[:class:`py:int`]
+            The ID of the bot that this client acts as, if given when created. Otherwise, this is taken from ``bot``
+            once it has logged in.
+
+        autopost: Optional[:class:`discord:discord.ext.tasks.Loop`]
+            The task that posts server count every 30 minutes, if there is a ``bot``. None for headless clients.
 
         token: :class:`py:str`
             The token you use for top.gg's API
+
+        stream_chunk_size: :class:`py:int`
+            How many bytes to read at a time when streaming list responses (see :meth:`TopGG.iter_bots`).
+
+        interner: Optional[:class:`toppy.models.Interner`]
+            The table used to deduplicate repeated values (tags, prefixes, avatars...) across every bot and voter
+            fetched through this client. Set to None to disable.
+
+        cache: Optional[:class:`toppy.cache.ResponseCache`]
+            Remembers lookups of bots and users. By default, only IDs that top.gg said aren't listed are remembered
+            (for 5 minutes), so asking about them again raises :class:`toppy.errors.NotFound` without a request.
+            Set to None to disable.
     """
     __api_version__ = "v0"
     _base_ = "https://top.gg/api"
-
-    def __init__(self, bot: "bot_types", *, token: str, autopost: bool = True):
+    stream_chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        bot: Optional["bot_types"] = None,
+        *,
+        token: str,
+        autopost: bool = True,
+        base_url: str = None,
+        bot_id: int = None,
+    ):
         r"""
         Initialises an instance of the top.gg client. Please don't call this multiple times, it WILL break stuff.
 
         Parameters
         ----------
-        bot: :obj:`discord.Client`
+        bot: Optional[:obj:`discord.Client`]
             The bot instance to use. Can be client or bot, and their auto-sharded equivalents.
+            Can be None if ``bot_id`` is given, in which case the client is "headless": it only talks to the API, and
+            never imports discord.py. Server count can't be posted without a bot, so ``autopost`` is ignored.
         token: :obj:`py:str`
             Your bot's API token from top.gg.
         autopost: :obj:`py:bool`
             Whether to automatically post server count every 30 minutes or not.
+        base_url: Optional[:obj:`py:str`]
+            Where to send requests instead of top.gg, e.g. a :class:`toppy.emulator.FakeTopGG` for testing.
+        bot_id: Optional[:obj:`py:int`]
+            Your bot's user ID. Needed by headless clients for requests about your own bot, such as
+            :meth:`TopGG.upvote_check`. Defaults to the ID of ``bot``.
         """
         self.bot = bot
+        self.bot_id = int(bot_id) if bot_id is not None else None
+        if base_url is not None:
+            self._base_ = base_url.rstrip("/")
         self.token = token
         self.ratelimit_persistence = True
+        self.interner: Optional[Interner] = Interner()
+        self.cache: Optional[ResponseCache] = ResponseCache()
         # noinspection PyTypeChecker
         self._session: Optional[aiohttp.ClientSession] = None
-        if autopost:
-            logger.debug("Starting autopost task.")
-            self.autopost.start()
+        self.autopost = None
+        if bot is not None:
+            # discord.ext.tasks is only imported when there's a bot to post for.
+            from discord.ext.tasks import loop
+
+            self.autopost = loop(minutes=30)(self._autopost)
+            if autopost:
+                logger.debug("Starting autopost task.")
+                self.autopost.start()
 
         # Function aliases
         self.vote_check = self.upvote_check
@@ -98,8 +170,9 @@ class TopGG:
 
     def __del__(self):
         r"""Lower-level garbage collection function fired when the variable is discarded, performs cleanup."""
-        logger.debug(f"{id(self)} __del__ called - Stopping autopost task")
-        self.autopost.stop()
+        if getattr(self, "autopost", None) is not None:
+            logger.debug(f"{id(self)} __del__ called - Stopping autopost task")
+            self.autopost.stop()
 
     @property
     def session(self) -> Optional[aiohttp.ClientSession]:
@@ -122,16 +195,28 @@ class TopGG:
 
         :rtype: :class:`py:str`
         """
-        if not self.bot.is_ready():
-            raise TypeError("Bot is not ready, can't produce a vote URL.")
-        return f"https://top.gg/bot/{self.bot.user.id}/vote"
+        return f"https://top.gg/bot/{self._own_id('a vote URL')}/vote"
 
     @property
     def invite_url(self) -> str:
         r"""Just gives you a link to your bot's invite page."""
+        return f"https://top.gg/bot/{self._own_id('an invite URL')}/invite"
+
+    def _own_id(self, what: str) -> int:
+        # The ID of the bot this client acts as, without waiting for it to log in.
+        if self.bot_id is not None:
+            return self.bot_id
+        if self.bot is None:
+            raise TypeError(f"Headless clients need a bot_id to produce {what}.")
         if not self.bot.is_ready():
-            raise TypeError("Bot is not ready, can't produce an invite URL.")
-        return f"https://top.gg/bot/{self.bot.user.id}/invite"
+            raise TypeError(f"Bot is not ready, can't produce {what}.")
+        return self.bot.user.id
+
+    async def _wait_for_id(self) -> int:
+        # The ID of the bot this client acts as, waiting for it to log in if need be.
+        if self.bot_id is None and self.bot is not None and not self.bot.is_ready():
+            await self.bot.wait_until_ready()
+        return self._own_id("requests about your own bot")
 
     async def _wf_s(self):
         if not self.session:
@@ -145,15 +230,85 @@ class TopGG:
             )
         return
 
-    @loop(minutes=30)
-    async def autopost(self):
-        r"""The task that automatically posts our stats to top.gg."""
+    async def _autopost(self):
+        # The body of the autopost task, which automatically posts our stats to top.gg.
         if not self.bot.is_ready():
             await self.bot.wait_until_ready()
-        result = await self.post_stats()
+        result = await self.post_stats(priority=Priority.LOW)
         self.bot.dispatch("toppy_stat_autopost", result)
 
-    async def _request(self, method: str, uri: str, **kwargs) -> dict:
+    @staticmethod
+    def _buckets(uri: str) -> tuple:
+        # The internal ratelimit buckets that a request to ``uri`` counts against.
+        return (routes["/bots/*"], routes["*"]) if _in_bots_bucket(uri) else (routes["*"],)
+
+    async def _wait_for_budget(self, uri: str, priority: Priority):
+        # For jobs that would rather wait than fail: sleeps until a request to ``uri`` wouldn't be ratelimited.
+        for bucket in self._buckets(uri):
+            while bucket.ratelimited_for(priority):
+                logger.info(f"Out of {bucket.route} budget, waiting {bucket.retry_after:.0f}s for it to reset.")
+                await asyncio.sleep(bucket.retry_after)
+
+    async def _check_ratelimits(self, uri: str, priority: Priority = Priority.NORMAL, pending: int = None):
+        # Raises before a request is sent if we know it would be ratelimited anyway, and paces low priority requests.
+        if _in_bots_bucket(uri):
+            rlc = routes["/bots/*"]
+            if rlc.ratelimited_for(priority):
+                logger.warning(
+                    f"Ratelimted for {rlc.retry_after*1000}ms. Handled under the bucket /bots/* "
+                    f"(at {priority.name} priority)."
+                )
+                raise Ratelimited(rlc.retry_after, internal=True)
+        if routes["*"].ratelimited_for(priority):
+            logger.warning(
+                f"Ratelimited for {routes['*'].retry_after*1000}ms. Handled under the bucket /*."
+                f" Perhaps review how many requests you're sending?"
+            )
+            raise Ratelimited(routes["*"].retry_after, internal=True)
+        delay = max(bucket.delay_for(priority, pending) for bucket in self._buckets(uri))
+        if delay:
+            logger.debug(f"Pacing low priority request to {uri} by {delay:.2f}s.")
+            await asyncio.sleep(delay)
+
+    async def _check_response(
+        self, response: aiohttp.ClientResponse, method: str, uri: str, url: str, expected_codes: List[int]
+    ):
+        # Everything that has to happen between getting a response and reading its body.
+        if response.status in range(500, 600):
+            raise TopGGServerError()
+        else:
+            if self.bot is not None:
+                self.bot.dispatch("toppy_request", url=url, method=method)
+            # NOTE: This has moved from just before the return since the hits count as soon as a response
+            # is generated (unless it's 5xx).
+            if _in_bots_bucket(uri):
+                routes["/bots/*"].add_hit()
+            routes["*"].add_hit()
+
+        if "application/json" not in response.headers.get("content-type", "none").lower():
+            logger.warning(f"Got unexpected content type {response.headers['Content-Type']!r} from top.gg.")
+            raise ToppyError("Unexpected response from server.")
+        if response.status in [403, 401]:
+            raise Forbidden()
+        if response.status == 429:
+            logging.warning("Unexpected ratelimit. Re-syncing internal ratelimit handler.")
+            data = await response.json()
+            if _in_bots_bucket(uri):
+                routes["/bots/*"].sync_from_ratelimit(data["retry-after"])
+            routes["*"].sync_from_ratelimit(data["retry-after"])
+
+            # NOTE: This is a bit of a whack way to deal with this.
+            # There should definitely be only one way to handle a ratelimit
+            # however not every user wants to handle an exception.
+            # We'll keep this for now, however it will definitely change when top.gg releases v[1|2] of their
+            # API.
+            raise Ratelimited(data["retry-after"])
+        if response.status == 404:
+            raise NotFound()
+        if response.status not in expected_codes:
+            raise ToppyError("Unexpected status code '{}'".format(str(response.status)))
+
+    async def _request(self, method: str, uri: str, *, priority: Priority = Priority.NORMAL, **kwargs) -> dict:
         # Hello fellow code explorer!
         # Yes, this is the function that single-handedly carries this module
         # Yes, it's a bit jank
@@ -162,17 +317,7 @@ class TopGG:
         # It works perfectly fine
         # JUST DON'T *TRY* TO BREAK IT
         # Many thanks, eek
-        if "/bots/" in uri:
-            rlc = routes["/bots/*"]
-            if rlc.ratelimited:
-                logger.warning(f"Ratelimted for {rlc.retry_after*1000}ms. Handled under the bucket /bots/*.")
-                raise Ratelimited(rlc.retry_after, internal=True)
-        if routes["*"].ratelimited:
-            logger.warning(
-                f"Ratelimited for {routes['*'].retry_after*1000}ms. Handled under the bucket /*."
-                f" Perhaps review how many requests you're sending?"
-            )
-            raise Ratelimited(routes["*"].retry_after, internal=True)
+        await self._check_ratelimits(uri, priority)
 
         if kwargs.get("data") and isinstance(kwargs["data"], dict):
             kwargs["data"] = dumps(kwargs["data"])
@@ -183,51 +328,63 @@ class TopGG:
 
         logger.info('Sending "{} {}"...'.format(method, url))
         async with self.session.request(method, url, **kwargs) as response:
-            if response.status in range(500, 600):
-                raise TopGGServerError()
-            else:
-                self.bot.dispatch("toppy_request", url=url, method=method)
-                # NOTE: This has moved from just before the return since the hits count as soon as a response
-                # is generated (unless it's 5xx).
-                if "/bots/" in uri:
-                    routes["/bots/*"].add_hit()
-                routes["*"].add_hit()
-
-            if "application/json" not in response.headers.get("content-type", "none").lower():
-                logger.warning(f"Got unexpected content type {response.headers['Content-Type']!r} from top.gg.")
-                raise ToppyError("Unexpected response from server.")
-            if response.status in [403, 401]:
-                raise Forbidden()
-            if response.status == 429:
-                logging.warning("Unexpected ratelimit. Re-syncing internal ratelimit handler.")
-                data = await response.json()
-                if "/bots/" in uri:
-                    routes["/bots/*"].sync_from_ratelimit(data["retry-after"])
-                routes["*"].sync_from_ratelimit(data["retry-after"])
-
-                # NOTE: This is a bit of a whack way to deal with this.
-                # There should definitely be only one way to handle a ratelimit
-                # however not every user wants to handle an exception.
-                # We'll keep this for now, however it will definitely change when top.gg releases v[1|2] of their
-                # API.
-                raise Ratelimited(data["retry-after"])
-            if response.status == 404:
-                raise NotFound()
-            if response.status not in expected_codes:
-                raise ToppyError("Unexpected status code '{}'".format(str(response.status)))
-
+            await self._check_response(response, method, uri, url, expected_codes)
             data = await response.json()
             # inject metadata
             if isinstance(data, dict):
                 data["_toppy_meta"] = {"headers": response.headers, "status": response.status}
         return data
 
-    async def fetch_bot(self, bot: Union[discord.User, discord.Member, discord.Object]) -> Bot:
+    def _cached(self, kind: str, key: int):
+        # The cached result of a lookup, if any. Raises NotFound if top.gg recently said there isn't one.
+        return self.cache.get(kind, key) if self.cache is not None else None
+
+    async def _cache_request(self, kind: str, key: int, method: str, uri: str, **kwargs) -> dict:
+        # _request, remembering a NotFound for ``key``.
+        try:
+            return await self._request(method, uri, **kwargs)
+        except NotFound:
+            if self.cache is not None:
+                self.cache.set_missing(kind, key)
+            raise
+
+    async def _stream_request(
+        self,
+        method: str,
+        uri: str,
+        key: str = None,
+        *,
+        meta: dict = None,
+        priority: Priority = Priority.NORMAL,
+        pending: int = None,
+        **kwargs,
+    ) -> AsyncIterator[dict]:
+        # The streaming sibling of _request.
+        # Rather than buffering and decoding the whole body, this yields each element of a JSON array
+        # (or of the array under ``key``) as soon as it has been received.
+        # ``pending`` is how many requests the job this is part of still has to send, including this one, if known.
+        await self._check_ratelimits(uri, priority, pending)
+
+        expected_codes = kwargs.pop("expected_codes", [200])
+        url = self._base_ + uri
+        await self._wf_s()
+
+        logger.info('Streaming "{} {}"...'.format(method, url))
+        async with self.session.request(method, url, **kwargs) as response:
+            await self._check_response(response, method, uri, url, expected_codes)
+            chunks = response.content.iter_chunked(self.stream_chunk_size)
+            async for item in iter_json_array(chunks, key, meta=meta):
+                yield item
+
+    async def fetch_bot(
+        self, bot: "Union[discord.User, discord.Member, discord.Object]", *, priority: Priority = Priority.NORMAL
+    ) -> Bot:
         r"""
         Fetches a bot from top.gg
 
         :param bot: The bot's user to fetch
         :type bot: Union[:class:`discord:discord.User`, :class:`discord:discord.Member`]
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
         :return: The retrieved bot
         :rtype: :class:`toppy.models.Bot`
         :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
@@ -235,13 +392,99 @@ class TopGG:
         :raises toppy.errors.NotFound: The specified bot is not on top.gg.
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
         """
-        response = await self._request("GET", "/bots/" + str(bot.id))
+        cached = self._cached("bot", int(bot.id))
+        if cached is not None:
+            return cached
+        return await self._fetch_bot(int(bot.id), priority)
+
+    async def _fetch_bot(self, bot_id: int, priority: Priority) -> Bot:
+        # fetch_bot, without looking in the cache first.
+        response = await self._cache_request("bot", bot_id, "GET", f"/bots/{bot_id}", priority=priority)
         response["state"] = self.bot
         logger.debug(f"Response from fetch_bot: {response}")
-        return Bot(**response)
+        result = Bot(**response)
+        if self.cache is not None:
+            self.cache.set("bot", result.id, result)
+        return result
+
+    @staticmethod
+    def _bots_uri(limit: int, offset: int, search: Optional[dict], sort: Optional[str], fields: Optional[Tuple[str]]):
+        uri = "/bots?limit=" + str(limit)
+        if search:
+            search = ", ".join(f"{x}: {y}" for x, y in search.items())
+            uri += "&search=" + search
+        if sort:
+            uri += "&sort=" + sort
+        if offset:
+            uri += "&offset=" + str(offset)
+        if fields is not None:
+            uri += "&fields=" + ",".join(fields)
+        return uri
+
+    async def iter_bots(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        search: dict = None,
+        sort: str = None,
+        fields: Iterable[str] = None,
+        *,
+        priority: Priority = Priority.NORMAL,
+    ) -> AsyncIterator[Bot]:
+        r"""
+        Streams up to ``limit`` bots from top.gg, yielding each bot as soon as it has been received.
+
+        This takes the same arguments as :meth:`TopGG.fetch_bots`, however the response is decoded incrementally,
+        so only one bot needs to be held in memory at a time.
+
+        Example: ::
+
+            async for bot in client.iter_bots(500, fields=("id", "username", "points")):
+                print(bot.username, bot.all_time_votes)
+
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
+        :return: An async iterator of bots.
+        :rtype: AsyncIterator[:class:`toppy.models.Bot`]
+        :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
+        :raises toppy.errors.Forbidden: You didn't specify a valid API token, or you are banned from the API.
+        :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
+        """
+        async for bot in self._iter_bots(limit, offset, search, sort, fields, priority):
+            yield bot
+
+    async def _iter_bots(
+        self,
+        limit: int,
+        offset: int,
+        search: Optional[dict],
+        sort: Optional[str],
+        fields: Optional[Iterable[str]],
+        priority: Priority,
+        pending: int = None,
+    ) -> AsyncIterator[Bot]:
+        limit = max(2, min(500, limit))
+        if fields is not None:
+            fields = _projection(fields)
+        uri = self._bots_uri(limit, offset, search, sort, fields)
+        async for bot in self._stream_request("GET", uri, "results", priority=priority, pending=pending):
+            bot["state"] = self.bot
+            bot["fields"] = fields
+            bot["interner"] = self.interner
+            bot = Bot(**bot)
+            if self.cache is not None and self.cache.missing("bot", bot.id):
+                # It's listed after all (e.g. it was just approved).
+                self.cache.invalidate("bot", bot.id)
+            yield bot
 
     async def fetch_bots(
-        self, limit: int = 50, offset: int = 0, search: dict = None, sort: str = None
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        search: dict = None,
+        sort: str = None,
+        fields: Iterable[str] = None,
+        *,
+        priority: Priority = Priority.NORMAL,
     ) -> BotSearchResults:
         r"""
         Fetches up to ``limit`` bots from top.gg
@@ -250,10 +493,16 @@ class TopGG:
         :param offset: How many bots to "skip" (pagination)
         :param search: Search pairs (e.g. {"library": "discord.py"})
         :param sort: What field to sort by. Prefix with dash to reverse results.
+        :param fields: Which fields to fetch (e.g. ``("id", "username", "points")``). These are the raw top.gg field
+            names, and are sent to top.gg so that it only returns those fields. The returned bots will also only
+            decode those fields. ``id`` is always included. Defaults to every field.
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
         :type limit: :class:`py:int`
         :type offset: :class:`py:int`
         :type search: Optional[:class:`py:dict`]
         :type sort: Optional[:class:`py:str`]
+        :type fields: Optional[Iterable[:class:`py:str`]]
+        :type priority: :class:`toppy.ratelimiter.Priority`
         :return: The results of your search (up to ``limit`` results)
         :rtype: :class:`toppy.models.BotSearchResults`
         :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
@@ -261,23 +510,19 @@ class TopGG:
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
         """
         limit = max(2, min(500, limit))
-        uri = "/bots?limit=" + str(limit)
-        if search:
-            search = ", ".join(f"{x}: {y}" for x, y in search.items())
-            uri += "&search=" + search
-        if sort:
-            uri += "&sort=" + sort
-        if offset:
-            uri += "&offset=" + str(offset)
-        result = await self._request("GET", "/bots")
-        logger.debug(f"Response from fetching bots: {result}")
-        new_results = []
-        for bot in result["results"]:
-            bot["state"] = self.bot
-            new_results.append(Bot(**bot))
+        new_results = [bot async for bot in self.iter_bots(limit, offset, search, sort, fields, priority=priority)]
+        logger.debug(f"Fetched {len(new_results)} bots.")
         return BotSearchResults(*new_results, limit=limit, offset=offset)
 
-    async def bulk_fetch_bots(self, limit: int = 500, *args) -> dict:
+    async def bulk_fetch_bots(
+        self,
+        limit: int = 500,
+        search: dict = None,
+        sort: str = None,
+        fields: Iterable[str] = None,
+        *,
+        priority: Priority = Priority.LOW,
+    ) -> dict:
         r"""Similar to fetch_bots, except allows for requesting more than 500 bots at once.
 
         .. warning::
@@ -290,8 +535,9 @@ class TopGG:
 
             Since this function sends multiple requests, it can take a long time.
 
-            Furthermore, sending a bulk request for more than thirty thousand (30,000) bots will cause you to be
-            ratelimited.
+            Requests are paced to fit the ratelimit: if the budget runs out part way, this waits for it to reset
+            (which can take up to an hour) instead of raising. Use :attr:`toppy.ratelimiter.Ratelimit.remaining` and
+            :attr:`toppy.ratelimiter.Ratelimit.resets_at` on ``toppy.ratelimiter.routes`` to see where you stand.
 
         This is equivalent to: ::
 
@@ -300,16 +546,18 @@ class TopGG:
             batch_three = await TopGG.fetch_bots(500, offset=1000)
 
         :param limit: How many bots to fetch.
-        :param offset: How many bots to "skip" (pagination)
         :param search: Search pairs (e.g. {"library": "discord.py"})
         :param sort: What field to sort by. Prefix with dash to reverse results.
+        :param fields: Which fields to fetch. See :meth:`TopGG.fetch_bots`.
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`. Defaults to low,
+            so that a bulk fetch is paced, and can't use up the budget reserved for user-facing requests.
         :type limit: :class:`py:int`
-        :type offset: :class:`py:int`
         :type search: Optional[:class:`py:dict`]
         :type sort: Optional[:class:`py:str`]
-        :return: The results of your search (up to ``limit`` results)
-        :rtype: :class:`toppy.models.BotSearchResults`
-        :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
+        :type fields: Optional[Iterable[:class:`py:str`]]
+        :type priority: :class:`toppy.ratelimiter.Priority`
+        :return: A dictionary of ``{bot_id: bot}`` (up to ``limit`` results)
+        :rtype: :class:`py:dict`
         :raises toppy.errors.Forbidden: You didn't specify a valid API token, or you are banned from the API.
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
         """
@@ -317,73 +565,118 @@ class TopGG:
             raise ValueError("Cannot process more than 30 thousand bots at once (definite ratelimit)")
         results = {}
         remaining = limit
-        for i in range(0, limit, 500):
+        offsets = range(0, limit, 500)
+        for page, i in enumerate(offsets):
             amount = min(500, remaining)
-            batch_results = await self.fetch_bots(amount, offset=i, *args)
+            # Rather than raising part way through, wait for the budget to come back. Until then, each page is sent
+            # as soon as the budget allows (see Ratelimit.delay_for), knowing how many pages are still to come.
+            while True:
+                await self._wait_for_budget(self._bots_uri(amount, i, search, sort, None), priority)
+                try:
+                    async for bot in self._iter_bots(amount, i, search, sort, fields, priority, len(offsets) - page):
+                        results[bot.id] = bot
+                except Ratelimited as e:
+                    # Something else is using the same token. The internal ratelimiter has been synced to top.gg's,
+                    # so wait it out and try the page again.
+                    logger.warning(f"Ratelimited by top.gg during a bulk fetch, retrying in {e.retry_after:.0f}s.")
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                break
             remaining -= amount
-            results = {**results, **{x.id: x for x in batch_results}}
         return results
 
-    async def fetch_votes(self) -> List[SimpleUser]:
+    async def iter_votes(self, *, priority: Priority = Priority.NORMAL) -> AsyncIterator[SimpleUser]:
+        r"""
+        Streams the last 1000 voters for your bot, yielding each voter as soon as it has been received.
+
+        This is the streaming equivalent of :meth:`TopGG.fetch_votes`.
+
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
+        :rtype: AsyncIterator[:class:`toppy.models.SimpleUser`]
+        :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
+        :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
+        """
+        bot_id = await self._wait_for_id()
+        async for raw_user in self._stream_request("GET", f"/bots/{bot_id}/votes", priority=priority):
+            raw_user["interner"] = self.interner
+            yield SimpleUser(**raw_user)
+
+    async def fetch_votes(self, *, priority: Priority = Priority.NORMAL) -> List[SimpleUser]:
         r"""
         Fetches the last 1000 voters for your bot.
 
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
         :returns: A list of up to 1000 SimpleUser objects who have voted for your bot in the past (any time period).
         :rtype: :class:`py:list` [:class:`toppy.models.SimpleUser`]
         :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
         """
-        if not self.bot.is_ready():
-            await self.bot.wait_until_ready()
-        raw_users = await self._request("GET", f"/bots/{self.bot.user.id}/votes")
-        resolved = list(map(lambda u: SimpleUser(**u), raw_users))
+        resolved = [user async for user in self.iter_votes(priority=priority)]
         logger.debug(f"Response from fetching votes: {resolved}")
         return resolved
 
-    async def upvote_check(self, user: Union[discord.User, discord.Member, discord.Object]) -> bool:
+    async def upvote_check(
+        self, user: "Union[discord.User, discord.Member, discord.Object]", *, priority: Priority = Priority.HIGH
+    ) -> bool:
         r"""
         Checks to see if the provided user has voted for your bot in the pas 12 hours.
 
         :param user: The user to fetch upvote for.
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`. Defaults to high,
+            as vote checks are usually made for a user who's waiting on the answer.
         :returns: True if the has user voted in the past 12 hours, False if not
         :rtype: :class:`py:bool`
         :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
         """
-        if not self.bot.is_ready():
-            await self.bot.wait_until_ready()
-        uri = f"/bots/{self.bot.user.id}/check?userId={user.id}"
-        raw_users = await self._request("GET", uri)
+        uri = f"/bots/{await self._wait_for_id()}/check?userId={user.id}"
+        raw_users = await self._request("GET", uri, priority=priority)
         logger.debug(f"Response from fetching upvote check: {raw_users}")
         # Ah yes, three pieces of recycled code. How cool.
         return raw_users["voted"] == 1
 
-    async def get_stats(self, bot: Union[discord.User, discord.Member, discord.Object]) -> BotStats:
+    async def get_stats(
+        self, bot: "Union[discord.User, discord.Member, discord.Object]", *, priority: Priority = Priority.NORMAL
+    ) -> BotStats:
         r"""Fetches the server & shard count for a bot.
 
         NOTE: this does NOT fetch votes. Use the fetch_bot function for that.
 
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
         :returns: Basic statistics on the specified bot.
         :rtype: :class:`toppy.models.BotStats`
         :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given."""
-        uri = f"/bots/{bot.id}/stats"
-        raw_stats = await self._request("GET", uri)
+        # Stats change all the time, so only a bot being missing is cached (and shared with fetch_bot).
+        self._stats_missing(int(bot.id))
+        return await self._fetch_stats(int(bot.id), priority)
+
+    def _stats_missing(self, bot_id: int) -> None:
+        # Raises NotFound if top.gg recently said the bot isn't listed.
+        if self.cache is not None and self.cache.missing("bot", bot_id):
+            raise NotFound()
+
+    async def _fetch_stats(self, bot_id: int, priority: Priority) -> BotStats:
+        raw_stats = await self._cache_request("bot", bot_id, "GET", f"/bots/{bot_id}/stats", priority=priority)
         logger.debug(f"Response from fetching stats: {raw_stats}")
         return BotStats(**raw_stats)
 
-    async def post_stats(self, force_shard_count: bool = False) -> int:
+    async def post_stats(self, force_shard_count: bool = False, *, priority: Priority = Priority.NORMAL) -> int:
         r"""
         Posts your bot's current statistics to top.gg
 
         :type force_shard_count: :class:`py:bool`
         :param force_shard_count: If true, always include shard data, even when it would normally be excluded
 
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
         :returns: an integer of how many servers got posted.
         :rtype: :class:`py:int`
         :raises toppy.errors.Ratelimited: You've sent too many requests to the API recently.
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
+        :raises TypeError: The client is headless, so has no server count to post.
         """
+        if self.bot is None:
+            raise TypeError("Headless clients can't post stats, as they have no bot to count servers for.")
         if not self.bot.is_ready():
             await self.bot.wait_until_ready()
         stats = {"server_count": len(self.bot.guilds)}
@@ -394,29 +687,199 @@ class TopGG:
             stats["shards"] = shards
             stats["shard_count"] = max(self.bot.shard_count, 1)
 
-        response = await self._request("POST", f"/bots/{self.bot.user.id}/stats", data=dumps(stats))
+        response = await self._request(
+            "POST", f"/bots/{self.bot.user.id}/stats", data=dumps(stats), priority=priority
+        )
         logger.debug(f"Response from fetching posting stats: {response}")
         self.bot.dispatch("guild_post", stats)
         return stats["server_count"]
 
-    async def is_weekend(self) -> bool:
+    async def is_weekend(self, *, priority: Priority = Priority.NORMAL) -> bool:
         r"""Returns True or False, depending on if it's a "weekend".
 
         If it's a weekend, votes count as double.
 
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
         :rtype: :class:`py:bool:`
         :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given."""
-        data = await self._request("GET", f"/weekend")
+        data = await self._request("GET", f"/weekend", priority=priority)
         return data["is_weekend"]
 
-    async def fetch_user(self, user: Union[discord.User, discord.Member, discord.Object]) -> User:
+    async def fetch_user(
+        self, user: "Union[discord.User, discord.Member, discord.Object]", *, priority: Priority = Priority.NORMAL
+    ) -> User:
         """
         Fetches a user's profile from top.gg.
 
         :param user: Union[discord.User, discord.Member] - Who's top.gg profile to fetch.
+        :param priority: How important this request is. See :class:`toppy.ratelimiter.Priority`.
         :raises toppy.errors.Forbidden: - Your API token was invalid.
         :raises toppy.errors.NotFound: - The user who you requested does not have a top.gg profile.
         :returns toppy.models.User: The fetched user's profile
         """
-        data = await self._request("GET", f"/users/{user.id}")
-        return User(**data, state=self.bot)
+        cached = self._cached("user", int(user.id))
+        if cached is not None:
+            return cached
+        return await self._fetch_user(int(user.id), priority)
+
+    async def _fetch_user(self, user_id: int, priority: Priority) -> User:
+        # fetch_user, without looking in the cache first.
+        data = await self._cache_request("user", user_id, "GET", f"/users/{user_id}", priority=priority)
+        result = User(**data, state=self.bot)
+        if self.cache is not None:
+            self.cache.set("user", result.id, result)
+        return result
+
+    async def fetch_bots_by_id(
+        self,
+        bots: "Iterable[Union[int, discord.abc.Snowflake]]",
+        *,
+        concurrency: int = 10,
+        wait: bool = False,
+        priority: Priority = Priority.NORMAL,
+    ) -> "BatchResult[Bot]":
+        r"""
+        Fetches many bots by ID, like calling :meth:`TopGG.fetch_bot` for each of them.
+
+        Repeated IDs are only fetched once, and cached bots (or IDs cached as not found) don't cost a request. At most
+        ``concurrency`` requests are in flight at once, and never more than the ratelimit budget has room for.
+
+        A bot that can't be fetched doesn't fail the others: its error (e.g. :class:`toppy.errors.NotFound`) is put in
+        :attr:`toppy.batch.BatchResult.errors` instead.
+
+        :param bots: The bots (or their IDs) to fetch.
+        :param concurrency: The most requests to send at once.
+        :param wait: Whether to wait for the ratelimit budget to reset when it runs out, which can take up to an hour.
+            Otherwise, bots left over once it runs out get a :class:`toppy.errors.Ratelimited` error.
+        :param priority: How important these requests are. See :class:`toppy.ratelimiter.Priority`.
+        :type bots: Iterable[Union[:class:`py:int`, :class:`discord:discord.abc.Snowflake`]]
+        :type concurrency: :class:`py:int`
+        :type wait: :class:`py:bool`
+        :type priority: :class:`toppy.ratelimiter.Priority`
+        :rtype: :class:`toppy.batch.BatchResult`
+        :raises ValueError: ``concurrency`` is less than 1.
+        """
+        return await _run_batch(
+            self,
+            bots,
+            lambda bot_id: self._fetch_bot(bot_id, priority),
+            uri="/bots/0",
+            priority=priority,
+            concurrency=concurrency,
+            wait=wait,
+            lookup=lambda bot_id: self._cached("bot", bot_id),
+        )
+
+    async def fetch_users(
+        self,
+        users: "Iterable[Union[int, discord.abc.Snowflake]]",
+        *,
+        concurrency: int = 10,
+        wait: bool = False,
+        priority: Priority = Priority.NORMAL,
+    ) -> "BatchResult[User]":
+        r"""
+        Fetches many users' top.gg profiles by ID, like calling :meth:`TopGG.fetch_user` for each of them.
+
+        See :meth:`TopGG.fetch_bots_by_id` for how IDs are deduplicated, paced and reported.
+
+        :param users: The users (or their IDs) to fetch, e.g. the result of :meth:`TopGG.fetch_votes`.
+        :param concurrency: The most requests to send at once.
+        :param wait: Whether to wait for the ratelimit budget to reset when it runs out.
+        :param priority: How important these requests are. See :class:`toppy.ratelimiter.Priority`.
+        :type users: Iterable[Union[:class:`py:int`, :class:`discord:discord.abc.Snowflake`]]
+        :type concurrency: :class:`py:int`
+        :type wait: :class:`py:bool`
+        :type priority: :class:`toppy.ratelimiter.Priority`
+        :rtype: :class:`toppy.batch.BatchResult`
+        :raises ValueError: ``concurrency`` is less than 1.
+        """
+        return await _run_batch(
+            self,
+            users,
+            lambda user_id: self._fetch_user(user_id, priority),
+            uri="/users/0",
+            priority=priority,
+            concurrency=concurrency,
+            wait=wait,
+            lookup=lambda user_id: self._cached("user", user_id),
+        )
+
+    async def get_stats_many(
+        self,
+        bots: "Iterable[Union[int, discord.abc.Snowflake]]",
+        *,
+        concurrency: int = 10,
+        wait: bool = False,
+        priority: Priority = Priority.NORMAL,
+    ) -> "BatchResult[BotStats]":
+        r"""
+        Fetches the server & shard counts of many bots, like calling :meth:`TopGG.get_stats` for each of them.
+
+        See :meth:`TopGG.fetch_bots_by_id` for how IDs are deduplicated, paced and reported.
+
+        :param bots: The bots (or their IDs) to fetch stats for.
+        :param concurrency: The most requests to send at once.
+        :param wait: Whether to wait for the ratelimit budget to reset when it runs out.
+        :param priority: How important these requests are. See :class:`toppy.ratelimiter.Priority`.
+        :type bots: Iterable[Union[:class:`py:int`, :class:`discord:discord.abc.Snowflake`]]
+        :type concurrency: :class:`py:int`
+        :type wait: :class:`py:bool`
+        :type priority: :class:`toppy.ratelimiter.Priority`
+        :rtype: :class:`toppy.batch.BatchResult`
+        :raises ValueError: ``concurrency`` is less than 1.
+        """
+        return await _run_batch(
+            self,
+            bots,
+            lambda bot_id: self._fetch_stats(bot_id, priority),
+            uri="/bots/0/stats",
+            priority=priority,
+            concurrency=concurrency,
+            wait=wait,
+            lookup=self._stats_missing,
+        )
+
+    async def resolve_users(
+        self,
+        voters: Iterable[Union[int, SimpleUser, User, SharedVote]],
+        *,
+        concurrency: int = 10,
+    ) -> "BatchResult[discord.User]":
+        r"""
+        Resolves many voters to discord users at once, e.g. to thank everyone who voted this week.
+
+        Every voter is first looked up in the bot's cache (``bot.get_user``), in a single pass. Those that aren't cached
+        are then fetched from discord (``bot.fetch_user``), each only once however many times they voted, with at most
+        ``concurrency`` fetches at once.
+
+        .. code-block::
+
+            voters = await client.resolve_users(await client.fetch_votes())
+            for user in voters:
+                await user.send("Thanks for voting!")
+
+        :param voters: The output of :meth:`TopGG.fetch_votes`, webhook votes (see :class:`toppy.models.BotVote`),
+            top.gg users, or plain user IDs.
+        :param concurrency: The most users to fetch from discord at once.
+        :type voters: Iterable[Union[:class:`py:int`, :class:`toppy.models.SimpleUser`, :class:`toppy.models.User`,
+            :class:`toppy.models.SharedVote`]]
+        :type concurrency: :class:`py:int`
+        :return: The resolved users, and the errors (e.g. :class:`discord:discord.NotFound`) of those that couldn't be
+            fetched, keyed by user ID.
+        :rtype: :class:`toppy.batch.BatchResult`
+        :raises TypeError: The client is headless, so has no bot to resolve users with.
+        :raises ValueError: ``concurrency`` is less than 1.
+        """
+        if self.bot is None:
+            raise TypeError("Headless clients can't resolve users, as they have no bot to resolve them with.")
+        from discord import HTTPException
+
+        return await _run_batch(
+            self,
+            voters,
+            self.bot.fetch_user,
+            concurrency=concurrency,
+            lookup=self.bot.get_user,
+            catch=(HTTPException, aiohttp.ClientError, asyncio.TimeoutError),
+        )
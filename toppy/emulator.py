@@ -0,0 +1,376 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+__all__ = (
+    "FakeTopGG",
+)
+
+logger = logging.getLogger(__name__)
+
+# The first snowflake used for generated bots and users.
+BOT_ID_BASE = 400000000000000000
+USER_ID_BASE = 200000000000000000
+
+_TAGS = (
+    "Moderation", "Music", "Fun", "Utility", "Economy", "Game", "Leveling", "Logging", "Social", "Meme",
+    "Anime", "Media", "Roleplay", "Multipurpose", "Customizable", "Stream", "Web Dashboard", "Reddit",
+)
+_LIBRARIES = ("discord.py", "discord.js", "JDA", "Eris", "DSharpPlus", "Discord.Net", "discordgo", "serenity")
+_PREFIXES = ("!", "?", ".", "-", "$", ">", "+", "/", "~", ";")
+_DEFAULT_AVATARS = (
+    "6debd47ed13483642cf09e832ed0bc1b",
+    "322c936a8c8be1b803cd94861bdfa868",
+    "dd4dbc0016779df1378e7812eabaa04d",
+    "0e291f67c9274a1abdddeb3fd919cbaa",
+    "1cbd08c76f8af6dddce02c5138971129",
+)
+
+
+class _Window:
+    """A fixed-window hit counter, mirroring how top.gg ratelimits."""
+
+    __slots__ = ("hits", "reset_at")
+
+    def __init__(self):
+        self.hits = 0
+        self.reset_at = 0.0
+
+
+class FakeTopGG:
+    r"""
+    A local, in-process emulation of the top.gg API, for testing and load-testing without touching the real thing.
+
+    It serves ``/bots``, ``/bots/{id}``, ``/bots/{id}/votes``, ``/bots/{id}/check``, ``/bots/{id}/stats``
+    (GET and POST), ``/users/{id}`` and ``/weekend`` with realistically sized payloads. Bots and users are generated
+    on demand from their ID, so a catalog of any size costs no memory.
+
+    Example: ::
+
+        async with FakeTopGG(token="test", latency=0.05) as fake:
+            client = TopGG(bot, token="test", base_url=fake.url, autopost=False)
+            await client.fetch_bots(500)
+
+    :param token: The API token requests must be authorised with. If None, any token is accepted.
+    :param bot_count: How many bots are listed.
+    :param latency: Seconds to wait before answering every request.
+    :param jitter: Up to this many extra seconds (uniformly random) are added to ``latency``.
+    :param error_rate: The probability (0-1) of answering a request with a random 5xx status instead.
+    :param ratelimits: ``{bucket: (hits, per_seconds)}``. The ``"/bots/*"`` bucket applies to the bot listing and
+        every request under ``/bots/``, and ``"*"`` applies to every request. Exceeding a bucket returns a 429 with a
+        ``retry-after``, just like top.gg. Defaults to top.gg's documented limits.
+    :param weekend: What ``/weekend`` returns.
+    :param seed: The seed used to generate every payload.
+    :type token: Optional[:class:`py:str`]
+    :type bot_count: :class:`py:int`
+    :type latency: :class:`py:float`
+    :type jitter: :class:`py:float`
+    :type error_rate: :class:`py:float`
+    :type ratelimits: Optional[:class:`py:dict`]
+    :type weekend: :class:`py:bool`
+    :type seed: :class:`py:int`
+
+    Attributes:
+        requests: :class:`py:dict`
+            How many requests each route has answered (including errors), e.g. ``{"GET /bots/{id}": 3}``.
+        posted_stats: :class:`py:dict`
+            The last stats posted for each bot ID.
+    """
+
+    DEFAULT_RATELIMITS = {"/bots/*": (60, 60.0), "*": (100, 1.0)}
+
+    def __init__(
+        self,
+        *,
+        token: Optional[str] = None,
+        bot_count: int = 30_000,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        ratelimits: Dict[str, Tuple[int, float]] = None,
+        weekend: bool = False,
+        seed: int = 0,
+    ):
+        self.token = token
+        self.bot_count = bot_count
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.ratelimits = dict(self.DEFAULT_RATELIMITS if ratelimits is None else ratelimits)
+        self.weekend = weekend
+        self.seed = seed
+        self.requests: Dict[str, int] = {}
+        self.posted_stats: Dict[int, dict] = {}
+        self.voters: Dict[int, List[int]] = {}
+        self._windows: Dict[Tuple[str, str], _Window] = {}
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.add_routes(
+            [
+                web.get("/bots", self._list_bots),
+                web.get("/bots/{id}", self._get_bot),
+                web.get("/bots/{id}/votes", self._get_votes),
+                web.get("/bots/{id}/check", self._check_vote),
+                web.get("/bots/{id}/stats", self._get_stats),
+                web.post("/bots/{id}/stats", self._post_stats),
+                web.get("/users/{id}", self._get_user),
+                web.get("/weekend", self._weekend),
+            ]
+        )
+
+    # Lifecycle
+
+    @property
+    def url(self) -> str:
+        r"""The base URL to give to :class:`toppy.client.TopGG` (as ``base_url``). Only available once started."""
+        if self._runner is None:
+            raise RuntimeError("The emulator has not been started.")
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        r"""
+        Starts listening. The default port of ``0`` picks any free port.
+
+        :returns: The base URL of the emulator.
+        :rtype: :class:`py:str`
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return self.url
+
+    async def close(self):
+        r"""Stops the emulator."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeTopGG":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    # Data
+
+    def bot_payload(self, bot_id: int) -> Optional[dict]:
+        r"""Returns the payload for the given bot, or None if there isn't a bot with that ID."""
+        n = bot_id - BOT_ID_BASE
+        if not 0 <= n < self.bot_count:
+            return None
+        rng = random.Random(self.seed * 1_000_003 + n)
+        return {
+            "id": str(bot_id),
+            "clientid": str(bot_id),
+            "username": f"Bot {n}",
+            "discriminator": "%04d" % rng.randrange(10000),
+            "avatar": "%032x" % rng.getrandbits(128) if rng.random() < 0.8 else None,
+            "defAvatar": rng.choice(_DEFAULT_AVATARS),
+            "lib": rng.choice(_LIBRARIES),
+            "prefix": rng.choice(_PREFIXES),
+            "shortdesc": f"Bot number {n}, a multipurpose bot with moderation, music, fun and more!",
+            "longdesc": ("# About\n\nThis is the long markdown description of bot %d. " % n) * rng.randint(10, 60),
+            "tags": rng.sample(_TAGS, rng.randint(1, 5)),
+            "website": f"https://bot{n}.example.com" if rng.random() < 0.4 else None,
+            "support": "%07x" % rng.getrandbits(28) if rng.random() < 0.5 else None,
+            "github": None,
+            "owners": [str(USER_ID_BASE + rng.randrange(10 ** 6)) for _ in range(rng.randint(1, 3))],
+            "guilds": [],
+            "invite": None,
+            "date": "20%02d-%02d-%02dT%02d:%02d:%02d.%03dZ"
+            % (
+                rng.randint(17, 23), rng.randint(1, 12), rng.randint(1, 28), rng.randrange(24), rng.randrange(60),
+                rng.randrange(60), rng.randrange(1000),
+            ),
+            "certifiedBot": rng.random() < 0.05,
+            "vanity": None,
+            "points": rng.randrange(10 ** 6),
+            "monthlyPoints": rng.randrange(10 ** 4),
+            "donatebotguildid": "",
+        }
+
+    def user_payload(self, user_id: int) -> Optional[dict]:
+        r"""Returns the profile payload for the given user, or None if there isn't a user with that ID."""
+        n = user_id - USER_ID_BASE
+        if not 0 <= n < 10 ** 6:
+            return None
+        rng = random.Random(self.seed * 1_000_003 + n)
+        return {
+            "id": str(user_id),
+            "username": f"user{n}",
+            "discriminator": "%04d" % rng.randrange(10000),
+            "avatar": "%032x" % rng.getrandbits(128) if rng.random() < 0.5 else None,
+            "defAvatar": rng.choice(_DEFAULT_AVATARS),
+            "bio": f"Hello, I'm user {n}!" if rng.random() < 0.3 else None,
+            "banner": None,
+            "social": {"github": f"user{n}"} if rng.random() < 0.2 else {},
+            "color": "#%06x" % rng.randrange(0xFFFFFF) if rng.random() < 0.3 else "",
+            "supporter": rng.random() < 0.05,
+            "certifiedDev": False,
+            "mod": False,
+            "webMod": False,
+            "admin": False,
+        }
+
+    def _voters(self, bot_id: int) -> List[int]:
+        if bot_id not in self.voters:
+            rng = random.Random(self.seed * 1_000_003 + bot_id)
+            self.voters[bot_id] = [USER_ID_BASE + rng.randrange(10 ** 6) for _ in range(1000)]
+        return self.voters[bot_id]
+
+    # Plumbing
+
+    @staticmethod
+    def _json(data, status: int = 200, headers: dict = None) -> web.Response:
+        return web.Response(
+            body=json.dumps(data).encode(), status=status, headers=headers, content_type="application/json"
+        )
+
+    def _hit(self, token: str, bucket: str) -> float:
+        """Counts a hit against a bucket, returning how long to retry after if the bucket is exhausted."""
+        hits, per = self.ratelimits[bucket]
+        window = self._windows.setdefault((token, bucket), _Window())
+        now = time.monotonic()
+        if now >= window.reset_at:
+            window.hits = 0
+            window.reset_at = now + per
+        if window.hits >= hits:
+            return window.reset_at - now
+        window.hits += 1
+        return 0.0
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        route = request.match_info.route.resource
+        name = f"{request.method} {route.canonical if route is not None else request.path}"
+        self.requests[name] = self.requests.get(name, 0) + 1
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self._json({"error": "Internal emulated error"}, status=self._random.choice((500, 502, 503)))
+
+        token = request.headers.get("Authorization", "")
+        if self.token is not None and token != self.token:
+            return self._json({"error": "Unauthorized"}, status=401)
+
+        buckets = [bucket for bucket in ("/bots/*", "*") if bucket in self.ratelimits]
+        if not (request.path == "/bots" or request.path.startswith("/bots/")) and "/bots/*" in buckets:
+            buckets.remove("/bots/*")
+        for bucket in buckets:
+            retry_after = self._hit(token, bucket)
+            if retry_after:
+                retry_after = round(retry_after, 3)
+                return self._json(
+                    {"retry-after": retry_after}, status=429, headers={"Retry-After": str(int(retry_after) + 1)}
+                )
+        return await handler(request)
+
+    @staticmethod
+    def _snowflake(request: web.Request, key: str = "id") -> int:
+        try:
+            return int(request.match_info.get(key) or request.query.get(key))
+        except (TypeError, ValueError):
+            raise web.HTTPBadRequest(
+                text=json.dumps({"error": f"Invalid {key}"}), content_type="application/json"
+            ) from None
+
+    def _not_found(self) -> web.Response:
+        return self._json({"error": "Not found"}, status=404)
+
+    # Routes
+
+    async def _list_bots(self, request: web.Request) -> web.Response:
+        try:
+            limit = max(1, min(500, int(request.query.get("limit", 50))))
+            offset = max(0, int(request.query.get("offset", 0)))
+        except ValueError:
+            return self._json({"error": "Invalid limit or offset"}, status=400)
+        fields = request.query.get("fields")
+        fields = set(fields.split(",")) if fields else None
+        search = {}
+        for pair in filter(None, request.query.get("search", "").split(",")):
+            key, _, value = pair.partition(":")
+            search[key.strip()] = value.strip()
+        sort = request.query.get("sort")
+
+        if search or sort:
+            # Only searching/sorting needs the whole catalog.
+            bots = (self.bot_payload(BOT_ID_BASE + n) for n in range(self.bot_count))
+            if search:
+                bots = (bot for bot in bots if all(str(bot.get(k)) == v for k, v in search.items()))
+            bots = list(bots)
+            if sort:
+                key = sort.lstrip("-")
+                bots.sort(key=lambda bot: (bot.get(key) is None, bot.get(key)), reverse=sort.startswith("-"))
+            total = len(bots)
+            page = bots[offset:offset + limit]
+        else:
+            total = self.bot_count
+            page = [self.bot_payload(BOT_ID_BASE + n) for n in range(offset, min(offset + limit, total))]
+
+        if fields is not None:
+            page = [{key: value for key, value in bot.items() if key in fields} for bot in page]
+        return self._json({"results": page, "limit": limit, "offset": offset, "count": len(page), "total": total})
+
+    async def _get_bot(self, request: web.Request) -> web.Response:
+        bot = self.bot_payload(self._snowflake(request))
+        return self._not_found() if bot is None else self._json(bot)
+
+    async def _get_votes(self, request: web.Request) -> web.Response:
+        votes = []
+        for user_id in self._voters(self._snowflake(request)):
+            user = self.user_payload(user_id)
+            votes.append(
+                {
+                    "id": user["id"],
+                    "username": user["username"],
+                    "discriminator": "#" + user["discriminator"],
+                    "avatar": user["avatar"],
+                }
+            )
+        return self._json(votes)
+
+    async def _check_vote(self, request: web.Request) -> web.Response:
+        voters = self._voters(self._snowflake(request))
+        return self._json({"voted": int(self._snowflake(request, "userId") in voters)})
+
+    async def _get_stats(self, request: web.Request) -> web.Response:
+        bot_id = self._snowflake(request)
+        if bot_id not in self.posted_stats and self.bot_payload(bot_id) is None:
+            return self._not_found()
+        stats = self.posted_stats.get(bot_id)
+        if stats is None:
+            rng = random.Random(self.seed * 1_000_003 + bot_id)
+            stats = {"server_count": rng.randrange(10 ** 5), "shards": [], "shard_count": None}
+        return self._json(stats)
+
+    async def _post_stats(self, request: web.Request) -> web.Response:
+        try:
+            data = json.loads(await request.read())
+            stats = {
+                "server_count": int(data["server_count"]),
+                "shards": list(map(int, data.get("shards") or [])),
+                "shard_count": data.get("shard_count"),
+            }
+        except (TypeError, ValueError, KeyError):
+            return self._json({"error": "Invalid stats"}, status=400)
+        self.posted_stats[self._snowflake(request)] = stats
+        return self._json({})
+
+    async def _get_user(self, request: web.Request) -> web.Response:
+        user = self.user_payload(self._snowflake(request))
+        return self._not_found() if user is None else self._json(user)
+
+    async def _weekend(self, _) -> web.Response:
+        return self._json({"is_weekend": self.weekend})
@@ -0,0 +1,133 @@
+import asyncio
+import csv
+import json
+import logging
+from typing import IO, Iterable, List, Optional
+
+from .client import TopGG, _projection
+from .errors import Ratelimited
+from .ratelimiter import Priority
+
+
+__all__ = (
+    "export_bots",
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+
+def _csv_value(value):
+    # Lists (tags, owners...) and objects don't have a CSV form, so they're written as JSON instead.
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+async def export_bots(
+    client: TopGG,
+    out: IO[str],
+    *,
+    format: str = "ndjson",
+    fields: Iterable[str] = None,
+    offset: int = 0,
+    limit: int = None,
+    search: dict = None,
+    sort: str = None,
+    page_size: int = 500,
+    header: bool = True,
+) -> int:
+    r"""
+    Pages through the bot listing, writing each page of bots to ``out`` as soon as it has been received. This is what
+    ``python -m toppy export`` does.
+
+    Bots are written as their raw top.gg payloads: as NDJSON (one JSON object per line), or as CSV, where list values
+    (such as ``tags``) are written as JSON. Only one page is held in memory at a time, and when the ratelimit is hit,
+    this waits for it to reset and carries on, instead of raising.
+
+    If this fails part way, the offset to resume from is logged. Calling this again with that offset (and
+    ``header=False``, if appending to a CSV file) carries on from the last page that was written.
+
+    :param client: The client to fetch bots with.
+    :param out: The file to write to, opened in text mode.
+    :param format: Either ``"ndjson"`` or ``"csv"``.
+    :param fields: Which top.gg fields to export (e.g. ``("id", "username", "points")``). ``id`` is always included.
+        Defaults to every field, in which case CSV columns are taken from the first bot.
+    :param offset: How many bots to skip, e.g. to resume an earlier export.
+    :param limit: The most bots to export. Defaults to every bot.
+    :param search: Search pairs (e.g. {"library": "discord.py"})
+    :param sort: What field to sort by. Prefix with dash to reverse results. Sorting keeps pages stable if bots are
+        added while exporting.
+    :param page_size: How many bots to request at a time, at most 500.
+    :param header: Whether to write the CSV header row.
+    :type client: :class:`toppy.client.TopGG`
+    :type format: :class:`py:str`
+    :type fields: Optional[Iterable[:class:`py:str`]]
+    :type offset: :class:`py:int`
+    :type limit: Optional[:class:`py:int`]
+    :type search: Optional[:class:`py:dict`]
+    :type sort: Optional[:class:`py:str`]
+    :type page_size: :class:`py:int`
+    :type header: :class:`py:bool`
+    :return: The offset after the last bot written.
+    :rtype: :class:`py:int`
+    :raises ValueError: Unknown format.
+    :raises toppy.errors.Forbidden: You didn't specify a valid API token, or you are banned from the API.
+    :raises toppy.errors.ToppyError: Either the server sent an invalid response, or an unexpected response code was given.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}. Expected one of: {', '.join(FORMATS)}")
+    page_size = max(2, min(500, page_size))
+    fields = _projection(fields) if fields is not None else None
+    writer: Optional[csv.DictWriter] = None
+    if format == "csv" and fields is not None:
+        writer = csv.DictWriter(out, fields, restval="", extrasaction="ignore")
+        if header:
+            writer.writeheader()
+
+    exported = 0
+    pending = None  # How many pages are left, once the first page says how many bots there are.
+    try:
+        while limit is None or exported < limit:
+            amount = page_size if limit is None else min(page_size, limit - exported)
+            uri = client._bots_uri(max(2, amount), offset, search, sort, fields)
+            meta = {}
+            # Exports are background work, so run at low priority, and wait for the budget rather than fail.
+            await client._wait_for_budget(uri, Priority.LOW)
+            try:
+                # The page is only written once it has been received in full, so that a page that fails part way can
+                # simply be requested again.
+                bots = client._stream_request("GET", uri, "results", meta=meta, priority=Priority.LOW, pending=pending)
+                page: List[dict] = [bot async for bot in bots]
+            except Ratelimited as e:
+                logger.warning("Ratelimited at offset %d, retrying in %.0fs.", offset, e.retry_after)
+                await asyncio.sleep(e.retry_after)
+                continue
+            page = page[:amount]
+
+            if format == "ndjson":
+                out.writelines(json.dumps(bot, separators=(",", ":")) + "\n" for bot in page)
+            else:
+                if writer is None and page:
+                    writer = csv.DictWriter(out, list(page[0]), restval="", extrasaction="ignore")
+                    if header:
+                        writer.writeheader()
+                for bot in page:
+                    writer.writerow({key: _csv_value(value) for key, value in bot.items()})
+            out.flush()
+
+            offset += len(page)
+            exported += len(page)
+            logger.info("Exported %d bots (next offset: %d).", exported, offset)
+            if "total" in meta:
+                left = meta["total"] - offset if limit is None else min(meta["total"] - offset, limit - exported)
+                pending = max(1, -(-left // page_size))
+            if len(page) < amount or ("total" in meta and offset >= meta["total"]):
+                break
+    except BaseException:
+        logger.warning("Stopped after exporting %d bots. To resume, export again from offset %d.", exported, offset)
+        raise
+    return offset
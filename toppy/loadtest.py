@@ -0,0 +1,225 @@
+import asyncio
+import itertools
+import json
+import logging
+import math
+import random
+import time
+from typing import Dict, List
+
+import aiohttp
+
+
+__all__ = (
+    "LoadTestResult",
+    "vote_payload",
+    "run_loadtest",
+)
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("bot", "server", "mixed")
+
+
+def vote_payload(kind: str, target_id: int, rng: random.Random = random) -> dict:
+    r"""
+    Creates a synthetic webhook payload, as top.gg would send for a vote.
+
+    Each payload has a random voter, so that a server with deduplication (see :class:`toppy.server.VoteDeduplicator`)
+    still handles every one of them.
+
+    :param kind: ``"bot"`` for a :class:`toppy.models.BotVote`, ``"server"`` for a :class:`toppy.models.ServerVote`.
+    :param target_id: The ID of the bot or server that was voted for.
+    :type kind: :class:`py:str`
+    :type target_id: :class:`py:int`
+    :rtype: :class:`py:dict`
+    """
+    user = str(rng.randrange(10 ** 17, 10 ** 18))
+    if kind == "server":
+        return {"guild": str(target_id), "user": user, "type": "upvote", "query": ""}
+    return {"bot": str(target_id), "user": user, "type": "upvote", "isWeekend": False, "query": ""}
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    # Nearest-rank percentile of an already sorted list.
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class LoadTestResult:
+    r"""
+    The outcome of :func:`run_loadtest`.
+
+    Attributes:
+        sent: :class:`py:int`
+            How many requests were sent.
+        statuses: :class:`py:dict`
+            How many responses there were with each status code, e.g. ``{200: 990, 503: 10}``.
+        errors: :class:`py:int`
+            How many requests failed without a response (connection errors and timeouts).
+        timeouts: :class:`py:int`
+            How many of those errors were timeouts.
+        duration: :class:`py:float`
+            How long the test took, in seconds.
+        latencies: :class:`py:list`
+            The latency of every request that got a response, in seconds, sorted.
+    """
+
+    def __init__(self, sent: int, statuses: Dict[int, int], errors: int, timeouts: int, duration: float, latencies):
+        self.sent = sent
+        self.statuses = statuses
+        self.errors = errors
+        self.timeouts = timeouts
+        self.duration = duration
+        self.latencies: List[float] = sorted(latencies)
+
+    @property
+    def ok(self) -> int:
+        r"""How many requests got a 2xx response."""
+        return sum(count for status, count in self.statuses.items() if 200 <= status < 300)
+
+    @property
+    def throughput(self) -> float:
+        r"""Successful (2xx) requests per second."""
+        return self.ok / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: float) -> float:
+        r"""
+        Returns the given latency percentile, in seconds, e.g. ``percentile(99)``.
+
+        :param percent: The percentile, from 0 to 100.
+        :type percent: :class:`py:float`
+        :rtype: :class:`py:float`
+        """
+        return _percentile(self.latencies, percent)
+
+    def summary(self) -> str:
+        r"""
+        A human readable report of the results.
+
+        :rtype: :class:`py:str`
+        """
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(self.statuses.items())) or "none"
+        return "\n".join(
+            (
+                f"Requests:   {self.sent} in {self.duration:.2f}s ({self.sent / max(self.duration, 1e-9):.1f}/s)",
+                f"Throughput: {self.throughput:.1f} accepted votes/s",
+                f"Responses:  {statuses}",
+                f"Errors:     {self.errors} ({self.timeouts} timed out)",
+                "Latency:    p50 {:.1f}ms, p95 {:.1f}ms, p99 {:.1f}ms, max {:.1f}ms".format(
+                    *(self.percentile(p) * 1000 for p in (50, 95, 99, 100))
+                ),
+            )
+        )
+
+    def __repr__(self):
+        return (
+            f"LoadTestResult(sent={self.sent}, ok={self.ok}, errors={self.errors}, "
+            f"throughput={self.throughput:.1f}, p99={self.percentile(99) * 1000:.1f}ms)"
+        )
+
+
+async def run_loadtest(
+    url: str,
+    *,
+    auth: str = None,
+    requests: int = 1000,
+    concurrency: int = 10,
+    ramp_to: int = None,
+    kind: str = "bot",
+    target_id: int = 1,
+    timeout: float = 10.0,
+    seed: int = None,
+) -> LoadTestResult:
+    r"""
+    Sends synthetic votes to a webhook server as fast as it accepts them, and measures how it copes.
+    This is what ``python -m toppy loadtest-webhook`` does.
+
+    With ``ramp_to``, concurrency rises steadily from ``concurrency`` to ``ramp_to`` over the course of the test, which
+    helps to find the point at which the server stops keeping up.
+
+    .. warning::
+        Only point this at servers you run. Every request is a (fake) vote, so the bots behind the server will see them.
+
+    :param url: The webhook URL, e.g. ``http://localhost:8080/dblwebhook``.
+    :param auth: The webhook authorization to send.
+    :param requests: How many votes to send.
+    :param concurrency: How many requests to have in flight at once.
+    :param ramp_to: Concurrency to ramp up to by the end of the test. Defaults to a fixed ``concurrency``.
+    :param kind: ``"bot"``, ``"server"``, or ``"mixed"`` (alternating) votes.
+    :param target_id: The bot/server ID to put in the votes.
+    :param timeout: How long to wait for each response, in seconds.
+    :param seed: Seeds the random voter IDs, for repeatable runs.
+    :type url: :class:`py:str`
+    :type auth: Optional[:class:`py:str`]
+    :type requests: :class:`py:int`
+    :type concurrency: :class:`py:int`
+    :type ramp_to: Optional[:class:`py:int`]
+    :type kind: :class:`py:str`
+    :type target_id: :class:`py:int`
+    :type timeout: :class:`py:float`
+    :type seed: Optional[:class:`py:int`]
+    :rtype: :class:`LoadTestResult`
+    :raises ValueError: Invalid kind or concurrency.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown vote kind {kind!r}. Expected one of: {', '.join(KINDS)}")
+    if concurrency < 1 or (ramp_to is not None and ramp_to < concurrency):
+        raise ValueError("Concurrency must be at least 1, and ramp_to at least concurrency.")
+    ramp_to = ramp_to or concurrency
+    rng = random.Random(seed)
+    kinds = itertools.cycle(("bot", "server") if kind == "mixed" else (kind,))
+    # Generated (and encoded) up front, so that building them doesn't count towards latency.
+    payloads = [json.dumps(vote_payload(next(kinds), target_id, rng)).encode() for _ in range(requests)]
+    headers = {"Content-Type": "application/json"}
+    if auth:
+        headers["Authorization"] = auth
+
+    # Worker n only starts once the ramp has reached n + 1 concurrent requests.
+    starts = [
+        0 if n < concurrency else math.ceil((n + 1 - concurrency) / (ramp_to - concurrency) * (requests - 1))
+        for n in range(ramp_to)
+    ]
+    gates = [asyncio.Event() for _ in range(ramp_to)]
+    indices = itertools.count()
+    statuses: Dict[int, int] = {}
+    latencies: List[float] = []
+    errors = timeouts = 0
+    ramped = concurrency
+
+    async def worker(n: int, session: aiohttp.ClientSession):
+        nonlocal errors, timeouts, ramped
+        await gates[n].wait()
+        for index in indices:
+            if index >= requests:
+                # Workers the ramp never reached (if there were too few requests) are still waiting; let them finish.
+                for gate in gates:
+                    gate.set()
+                return
+            while ramped < ramp_to and starts[ramped] <= index:
+                gates[ramped].set()
+                ramped += 1
+            started = time.perf_counter()
+            try:
+                async with session.post(url, data=payloads[index], headers=headers) as response:
+                    await response.read()
+            except asyncio.TimeoutError:
+                errors += 1
+                timeouts += 1
+                continue
+            except aiohttp.ClientError as e:
+                logger.debug("Request %d failed: %s", index, e)
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    for gate in gates[:concurrency]:
+        gate.set()
+    connector = aiohttp.TCPConnector(limit=ramp_to)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n, session) for n in range(ramp_to)))
+        duration = time.perf_counter() - started
+    return LoadTestResult(len(latencies) + errors, statuses, errors, timeouts, duration, latencies)
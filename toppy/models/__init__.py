@@ -1,3 +1,6 @@
 from .user import *
 from .widget import *
 from .webhooks import *
+from .intern import *
+from .serialization import *
+from .schema import *
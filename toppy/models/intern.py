@@ -0,0 +1,73 @@
+from typing import Dict, Hashable, Iterable, List, Optional, TypeVar
+
+
+__all__ = (
+    "Interner",
+)
+
+T = TypeVar("T", bound=Hashable)
+
+
+class Interner:
+    r"""
+    A bounded interning table used while building lots of models at once.
+
+    Bulk responses repeat the same small values (tags, prefixes, discriminators, default avatars...) thousands of
+    times, and every one of them is decoded into a new object. Passing each value through an interner swaps it for
+    the first equal object seen, so a whole crawl only keeps one copy of each.
+
+    Unlike :func:`py:sys.intern`, the table belongs to whoever created it, and is freed along with it.
+
+    :param max_size: The maximum number of unique values to remember. Once full, new values are passed through
+        untouched, but existing ones are still deduplicated.
+
+    Attributes:
+        hits: :class:`py:int`
+            How many values were replaced with an existing copy.
+        misses: :class:`py:int`
+            How many values were seen for the first time.
+    """
+
+    def __init__(self, max_size: int = 65536):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._table: Dict[Hashable, Hashable] = {}
+
+    def __call__(self, value: Optional[T]) -> Optional[T]:
+        r"""Returns the interned copy of ``value``, remembering it if this is the first time it was seen."""
+        if value is None:
+            return None
+        try:
+            existing = self._table[value]
+        except KeyError:
+            self.misses += 1
+            if len(self._table) < self.max_size:
+                self._table[value] = value
+            return value
+        self.hits += 1
+        return existing
+
+    def many(self, values: Iterable[T]) -> List[T]:
+        r"""Interns every item of ``values``, returning them as a new list."""
+        return [self(value) for value in values]
+
+    def clear(self):
+        r"""Forgets every remembered value and resets the counters."""
+        self._table.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._table)
+
+    def __bool__(self):
+        # An empty table is still a table.
+        return True
+
+    def __repr__(self):
+        return f"Interner(size={len(self)}, max_size={self.max_size}, hits={self.hits}, misses={self.misses})"
+
+
+def _no_intern(value):
+    # Stand-in for an Interner when a model is built on its own.
+    return value
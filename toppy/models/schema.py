@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional
+
+
+__all__ = (
+    "Field",
+    "Schema",
+    "parse_iso8601",
+)
+
+Decoder = Callable[[Any, dict, Callable[[Any], Any]], None]
+
+# datetime.fromisoformat doesn't exist on 3.6, and can't handle the "Z" suffix before 3.11.
+_fromisoformat = getattr(datetime, "fromisoformat", None)
+# The lengths of "YYYY-MM-DDTHH:MM:SSZ", with no fraction, milliseconds, or microseconds.
+_FAST_LENGTHS = frozenset((20, 24, 27))
+
+
+def parse_iso8601(value: str) -> datetime:
+    r"""
+    Parses the ISO-8601 timestamps top.gg sends (e.g. ``2017-04-26T18:08:19.163Z``) without going through strptime.
+
+    Fractional seconds of any precision and ``Z``/``±HH:MM`` offsets are supported. The result is a naive datetime
+    in UTC.
+
+    :param value: The timestamp to parse.
+    :type value: :class:`py:str`
+    :rtype: :class:`py:datetime.datetime`
+    :raises ValueError: The timestamp was not in the expected format.
+    """
+    if _fromisoformat is not None and len(value) in _FAST_LENGTHS and value[-1] in "Zz":
+        # The overwhelmingly common case (``...:SS.fffZ``), which the C parser handles once the "Z" is removed.
+        try:
+            return _fromisoformat(value[:-1])
+        except ValueError:
+            pass
+    if len(value) < 19 or value[4] != "-" or value[7] != "-" or value[10] not in "Tt " or value[13] != ":" \
+            or value[16] != ":":
+        raise ValueError(f"Invalid ISO-8601 timestamp: {value!r}")
+    result = datetime(
+        int(value[0:4]), int(value[5:7]), int(value[8:10]), int(value[11:13]), int(value[14:16]), int(value[17:19])
+    )
+    end = 19
+    if end < len(value) and value[end] == ".":
+        start = end = end + 1
+        while end < len(value) and value[end].isdigit():
+            end += 1
+        if start == end:
+            raise ValueError(f"Invalid ISO-8601 timestamp: {value!r}")
+        result = result.replace(microsecond=int(value[start:end][:6].ljust(6, "0")))
+    offset = value[end:]
+    if offset in ("", "Z", "z"):
+        return result
+    if len(offset) == 6 and offset[0] in "+-" and offset[3] == ":":
+        delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6]))
+        return result - delta if offset[0] == "+" else result + delta
+    raise ValueError(f"Invalid ISO-8601 timestamp: {value!r}")
+
+
+class Field:
+    r"""
+    Describes how one model attribute is decoded from an API payload.
+
+    :param attr: The attribute name on the model.
+    :param key: The key in the API payload. If None, the attribute isn't read from the payload and is set to its
+        default, so that the model can compute it afterwards.
+    :param convert: A callable applied to the value (or to each item, if ``many``) when it is present.
+    :param many: Whether the value is a list.
+    :param intern: Whether to intern the value (or each item, if ``many``) during bulk decoding.
+    :param default: The value to use when the key is missing or null.
+    :param factory: A callable producing the default, for mutable defaults like lists.
+    :param required: Whether the key must be present. Required fields are always decoded, even with a projection.
+    """
+
+    __slots__ = ("attr", "key", "convert", "many", "intern", "default", "factory", "required")
+
+    def __init__(
+        self,
+        attr: str,
+        key: Optional[str],
+        *,
+        convert: Callable[[Any], Any] = None,
+        many: bool = False,
+        intern: bool = False,
+        default: Any = None,
+        factory: Callable[[], Any] = None,
+        required: bool = False,
+    ):
+        self.attr = attr
+        self.key = key
+        self.convert = convert
+        self.many = many
+        self.intern = intern
+        self.default = default
+        self.factory = factory
+        self.required = required
+
+    def __repr__(self):
+        return f"Field({self.attr!r}, {self.key!r})"
+
+
+class Schema:
+    r"""
+    An ordered set of :class:`Field`\s, compiled into one specialised decode function per model.
+
+    Rather than walking the fields for every payload, the schema generates (and caches) the source of a function
+    that reads each key and sets each attribute directly, so decoding a model is a single function call with no
+    per-field dispatch.
+
+    :param name: The model's name, used to name the generated function.
+    :param fields: The model's fields, in attribute order.
+    """
+
+    # How many different projections to keep compiled decoders for.
+    max_decoders = 32
+
+    def __init__(self, name: str, *fields: Field):
+        self.name = name
+        self.fields = fields
+        self.keys: FrozenSet[str] = frozenset(field.key for field in fields if field.key is not None)
+        self._decoders: Dict[FrozenSet[str], Decoder] = {}
+        #: The decoder for full (unprojected) payloads.
+        self.decode: Decoder = self._compile(None)
+
+    def decoder(self, projection: Iterable[str] = None) -> Decoder:
+        r"""
+        Returns the decode function for this schema, compiling it if needed.
+
+        The function has the signature ``decode(obj, data, intern)`` and sets every attribute on ``obj``.
+
+        :param projection: If given, only these payload keys are decoded. Every other field is set to its default.
+        """
+        if projection is None:
+            return self.decode
+        key = frozenset(projection)
+        try:
+            return self._decoders[key]
+        except KeyError:
+            pass
+        if len(self._decoders) >= self.max_decoders:
+            self._decoders.clear()
+        decoder = self._decoders[key] = self._compile(key)
+        return decoder
+
+    def _compile(self, projection: Optional[FrozenSet[str]]) -> Decoder:
+        namespace = {}
+        body = []
+        entries = []
+        for i, field in enumerate(self.fields):
+            if field.factory is not None:
+                namespace[f"_factory{i}"] = field.factory
+                default = f"_factory{i}()"
+            else:
+                namespace[f"_default{i}"] = field.default
+                default = f"_default{i}"
+
+            if field.key is None or (projection is not None and field.key not in projection and not field.required):
+                entries.append((field.attr, default))
+                continue
+
+            item = "item" if field.many else f"_v{i}"
+            if field.convert is not None:
+                namespace[f"_convert{i}"] = field.convert
+                item = f"_convert{i}({item})"
+            if field.intern:
+                item = f"intern({item})"
+            value = f"[{item} for item in _v{i}]" if field.many else item
+
+            if field.required:
+                body.append(f"    _v{i} = data[{field.key!r}]")
+                entries.append((field.attr, value))
+            elif value == f"_v{i}" and field.factory is None and field.default is None:
+                # Nothing to do to the value, and null already means the default, so it can be read inline.
+                entries.append((field.attr, f"get({field.key!r})"))
+            else:
+                body.append(f"    _v{i} = get({field.key!r})")
+                body.append(f"    _v{i} = {default} if _v{i} is None else {value}")
+                entries.append((field.attr, f"_v{i}"))
+
+        source = "\n".join(
+            [f"def decode_{self.name}(self, data, intern):", "    get = data.get"]
+            + body
+            + [f"    self.{attr} = {value}" for attr, value in entries]
+        )
+        exec(compile(source, f"<toppy schema {self.name}>", "exec"), namespace)
+        decoder = namespace[f"decode_{self.name}"]
+        decoder.__source__ = source
+        return decoder
@@ -0,0 +1,160 @@
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, we fall back to (slower, larger) JSON without it.
+    msgpack = None
+
+
+__all__ = (
+    "dump_models",
+    "load_models",
+)
+
+_MAGIC = b"TP"
+_FORMAT_VERSION = 1
+_CODECS = {"msgpack": 1, "json": 2}
+_CODEC_NAMES = {value: key for key, value in _CODECS.items()}
+_HEADER_SIZE = len(_MAGIC) + 2
+
+# Every model that can be (de)serialized, by class name.
+_registry: Dict[str, Type["_BinaryMixin"]] = {}
+
+
+def _encode_datetime(value: datetime) -> list:
+    return [value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond]
+
+
+def _decode_datetime(value: list) -> datetime:
+    return datetime(*value)
+
+
+def _default_codec() -> str:
+    return "msgpack" if msgpack is not None else "json"
+
+
+def _pack(obj: Any, codec: str = None) -> bytes:
+    codec = codec or _default_codec()
+    if codec == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("The msgpack codec requires the 'msgpack' package to be installed.")
+        body = msgpack.packb(obj, use_bin_type=True)
+    elif codec == "json":
+        body = json.dumps(obj, separators=(",", ":")).encode()
+    else:
+        raise ValueError(f"Unknown codec {codec!r}. Expected one of: {', '.join(_CODECS)}")
+    return _MAGIC + bytes((_FORMAT_VERSION, _CODECS[codec])) + body
+
+
+def _unpack(data: bytes) -> Any:
+    if data[:len(_MAGIC)] != _MAGIC:
+        raise ValueError("Not a serialized top.py model.")
+    version, codec = data[len(_MAGIC)], data[len(_MAGIC) + 1]
+    if version != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version {version} (expected {_FORMAT_VERSION}).")
+    body = memoryview(data)[_HEADER_SIZE:]
+    if _CODEC_NAMES.get(codec) == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("This data was serialized with msgpack, which is not installed.")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if _CODEC_NAMES.get(codec) == "json":
+        return json.loads(bytes(body))
+    raise ValueError(f"Unknown codec ID {codec}.")
+
+
+class _BinaryMixin(object):
+    """
+    Mixin that gives a model a compact binary form that can be shared between processes.
+
+    Only plain attributes are stored. Anything tied to a live discord client (the ``state``) is left out, and is
+    re-attached when loading.
+    """
+
+    # Attributes that are never serialized.
+    _transient_: Tuple[str, ...] = ()
+    # Attributes that need converting to/from a msgpack/JSON friendly value: {name: (encode, decode)}
+    _codecs_: Dict[str, Tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _registry[cls.__name__] = cls
+
+    def _dump(self) -> list:
+        attrs = {}
+        for name, value in self.__dict__.items():
+            if name in self._transient_:
+                continue
+            if name in self._codecs_:
+                value = self._codecs_[name][0](value)
+            attrs[name] = value
+        return [self.__class__.__name__, attrs]
+
+    @classmethod
+    def _load(cls, attrs: dict, state=None):
+        self = cls.__new__(cls)
+        for name, (_, decode) in cls._codecs_.items():
+            if name in attrs:
+                attrs[name] = decode(attrs[name])
+        self.__dict__.update(attrs)
+        self._attach(state)
+        return self
+
+    def _attach(self, state):
+        """Re-attaches transient, state-derived attributes after loading."""
+
+    def to_bytes(self, codec: str = None) -> bytes:
+        r"""
+        Serializes this model into a compact binary form, which can be loaded again with :meth:`from_bytes`.
+
+        The connection state (your bot) is not included.
+
+        :param codec: Either ``"msgpack"`` or ``"json"``. Defaults to msgpack if it is installed, otherwise json.
+        :type codec: Optional[:class:`py:str`]
+        :rtype: :class:`py:bytes`
+        """
+        return _pack(self._dump(), codec)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, state=None):
+        r"""
+        Loads a model that was serialized with :meth:`to_bytes`.
+
+        :param data: The serialized model.
+        :param state: The bot to re-attach to the model, used to resolve discord objects. Optional.
+        :type data: :class:`py:bytes`
+        :raises ValueError: The data was not a serialized model of this type.
+        """
+        name, attrs = _unpack(data)
+        if name != cls.__name__:
+            raise ValueError(f"Expected a serialized {cls.__name__}, got {name}.")
+        return cls._load(attrs, state)
+
+
+def dump_models(models: Iterable[_BinaryMixin], codec: str = None) -> bytes:
+    r"""
+    Serializes many models at once, for example the results of :meth:`toppy.client.TopGG.bulk_fetch_bots`.
+
+    This is more compact (and faster) than calling :meth:`to_bytes` on each model.
+
+    :param models: The models to serialize. They can be of different types.
+    :param codec: Either ``"msgpack"`` or ``"json"``. Defaults to msgpack if it is installed, otherwise json.
+    :rtype: :class:`py:bytes`
+    """
+    return _pack([model._dump() for model in models], codec)
+
+
+def load_models(data: bytes, state=None) -> List[_BinaryMixin]:
+    r"""
+    Loads models that were serialized with :func:`dump_models`.
+
+    :param data: The serialized models.
+    :param state: The bot to re-attach to every model. Optional.
+    :rtype: :class:`py:list`
+    :raises ValueError: The data was not serialized by :func:`dump_models`.
+    """
+    try:
+        return [_registry[name]._load(attrs, state) for name, attrs in _unpack(data)]
+    except KeyError as e:
+        raise ValueError(f"Unknown model {e.args[0]!r}.") from e
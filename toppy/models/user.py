@@ -1,11 +1,15 @@
 import warnings
 from datetime import datetime
 from textwrap import shorten
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, TYPE_CHECKING
 
-from discord import User as DiscordUser
-from discord.colour import Colour
-from discord.utils import oauth_url as invite
+from .intern import _no_intern
+from .schema import Field, Schema, parse_iso8601
+from .serialization import _BinaryMixin, _decode_datetime, _encode_datetime
+
+if TYPE_CHECKING:
+    from discord import User as DiscordUser
+    from discord.colour import Colour
 
 
 __all__ = (
@@ -53,6 +57,22 @@ def calculate_avatar_url(user_id: int, discrim: int, _hash: str):
     return f"https://cdn.discordapp.com/avatars/{user_id}/{_hash}.webp"
 
 
+def invite(client_id: str) -> str:
+    # The same URL as discord.utils.oauth_url(client_id), without having to import discord.py for it.
+    return f"https://discord.com/oauth2/authorize?client_id={client_id}&scope=bot+applications.commands"
+
+
+def _raw_colour(value: str) -> str:
+    return (value or "0").lstrip("#")
+
+
+def _approved_at(value: str) -> datetime:
+    try:
+        return parse_iso8601(value)
+    except (TypeError, ValueError):
+        return datetime.min
+
+
 class WeakAttr(dict, _ReprMixin):
     """A simple class that takes a dictionary and allows fetching of items through attributes."""
 
@@ -80,7 +100,7 @@ class UserABC(_ReprMixin):
         raise NotImplementedError
 
 
-class SimpleUser(_ReprMixin):
+class SimpleUser(_ReprMixin, _BinaryMixin):
     """
     A model representing the "simple user" object returned by /bots/{id}/votes.
 
@@ -95,13 +115,23 @@ class SimpleUser(_ReprMixin):
             The user's avatar URL
     """
 
+    _schema_ = Schema(
+        "SimpleUser",
+        Field("id", "id", convert=int, required=True),
+        Field("discriminator", "discriminator", intern=True, default="#0000"),
+        Field("username", "username"),
+    )
+
     def __init__(self, **kwargs):
-        self.id: int = int(kwargs.pop("id"))
-        self.discriminator: str = kwargs.get("discriminator", "#0000")
-        self.username: str = kwargs.get("username")
-        self.avatar: Optional[str] = calculate_avatar_url(
-            self.id, int(self.discriminator[1:]), kwargs.get("avatar", None)
-        )
+        _intern = kwargs.get("interner") or _no_intern
+        self._schema_.decode(self, kwargs, _intern)
+        avatar = kwargs.get("avatar", None)
+        if avatar:
+            # Unique to the user, so there's nothing to gain from interning it.
+            self.avatar: Optional[str] = calculate_avatar_url(self.id, int(self.discriminator[1:]), avatar)
+        else:
+            # One of the 5 default avatars, which many users share.
+            self.avatar = _intern(default_avatar_url(int(self.discriminator[1:])))
 
 
 class Socials(_ReprMixin):
@@ -130,7 +160,7 @@ class Socials(_ReprMixin):
         self.twitter = kwargs.get("twitter", None)
 
 
-class User(UserABC, _ReprMixin):
+class User(UserABC, _ReprMixin, _BinaryMixin):
     """
     Model representing a top.gg user's account.
 
@@ -141,25 +171,33 @@ class User(UserABC, _ReprMixin):
         As such, any or all fields here *may* be None.
     """
 
+    _transient_ = ("_user",)
+
+    _schema_ = Schema(
+        "User",
+        Field("_id", "id", convert=int, required=True),
+        Field("_username", "username"),
+        Field("_discriminator", "discriminator"),
+        Field("_avatar", "avatar"),
+        Field("_bio", "bio"),
+        Field("_banner_url", "banner"),
+        Field("_socials", "social", factory=dict),
+        Field("_raw_colour", "color", convert=_raw_colour, default="0"),  # can be empty, for some reason.
+        Field("_supporter", "supporter", default=False),
+        Field("_site_admin", "admin", default=False),
+        Field("_certified", "certified", default=False),  # if the user has a certified bot
+    )
+
     def __init__(self, **kwargs):
-        self._id: int = int(kwargs.pop("id"))
-        self._username: str = kwargs.get("username")
-        self._discriminator: str = kwargs.get("discriminator")
+        self._schema_.decode(self, kwargs, _no_intern)
         self._default_avatar: str = default_avatar_url(int(self._discriminator))
-        self._avatar: str = kwargs.get("avatar", None)
-        self._bio: Optional[str] = kwargs.get("bio", None)
-        self._banner_url: Optional[str] = kwargs.get("banner", None)
-        self._socials = kwargs.get("social", {})
-        self._raw_colour = (kwargs.get("color", "0") or "0").lstrip("#")  # can be empty, for some reason.
-        self._colour: Colour = Colour(int(self._raw_colour, base=16))
-        self._supporter: bool = kwargs.get("supporter", False)
+        self._colour: int = int(self._raw_colour, base=16)
         self._site_mod: bool = kwargs.get("mod") or kwargs.get("webMod")  # these are the same thing as far as I'm aware
-        self._site_admin: bool = kwargs.get("admin", False)
-        self._certified: bool = kwargs.get("certified", False)  # if the user has a certified bot
-        if kwargs.get("state"):
-            self._user: Optional[DiscordUser] = kwargs["state"].get_user(self.id)
-        else:
-            self._user: Optional[DiscordUser] = None
+        state = kwargs.get("state")
+        self._user: Optional["DiscordUser"] = state.get_user(self.id) if state else None
+
+    def _attach(self, state):
+        self._user = state.get_user(self.id) if state else None
 
     @property
     def socials(self) -> Socials:
@@ -201,21 +239,23 @@ class User(UserABC, _ReprMixin):
         return self._banner_url
 
     @property
-    def colour(self) -> Colour:
+    def colour(self) -> "Colour":
         """The user's preferred navigation colour.
 
         There is an alias for this under toppy.models.User.color
 
         :returns: discord.Colour - the resolved colour
         :rtype: :class:`discord:discord.Colour`"""
-        return self._colour
+        from discord.colour import Colour
+
+        return Colour(self._colour)
 
     @property
-    def color(self) -> Colour:
+    def color(self) -> "Colour":
         """Alias for toppy.models.User.colour"""
         return self.colour
 
-    def user(self, state=None) -> Optional[DiscordUser]:
+    def user(self, state=None) -> Optional["DiscordUser"]:
         """Gets the current discord user object from the top.gg user object.
 
         state can be the bot/client instance, or anything with a get_user method.
@@ -228,7 +268,7 @@ class User(UserABC, _ReprMixin):
         return state.get_user(self.id)
 
 
-class Bot(UserABC, _ReprMixin):
+class Bot(UserABC, _ReprMixin, _BinaryMixin):
     """
     Model representing a top.gg bot
 
@@ -249,6 +289,8 @@ class Bot(UserABC, _ReprMixin):
             The bot's default avatar hash
         prefix: :class:`py:str`
             The bot's prefix
+        library: Optional[:class:`py:str`]
+            The library the bot is written with
         short_description: :class:`py:str`
             The bot's short description on top.gg
         long_description: :class:`py:str`
@@ -286,44 +328,55 @@ class Bot(UserABC, _ReprMixin):
             The total number of votes the bot got this month
         donations_guild: Optional[`py:int`]
             The server ID for donations using donatebot
+
+    .. note::
+        If the bot was fetched with a ``fields`` projection (see :meth:`toppy.client.TopGG.fetch_bots`), only those
+        fields are decoded. Every other attribute is left at its default (usually ``None`` or an empty list).
     """
 
+    _transient_ = ("_user",)
+    _codecs_ = {"approved_at": (_encode_datetime, _decode_datetime)}
+
+    _schema_ = Schema(
+        "Bot",
+        Field("id", "id", convert=int, required=True),
+        Field("username", "username"),
+        Field("discriminator", "discriminator", intern=True),
+        Field("user_avatar", "avatar"),
+        Field("default_avatar", "defAvatar", intern=True),
+        Field("avatar", None),
+        Field("prefix", "prefix", intern=True),
+        Field("library", "lib", intern=True),
+        Field("short_description", "shortdesc"),
+        Field("long_description", "longdesc"),  # NOTE: this can be empty for some reason
+        Field("tags", "tags", many=True, intern=True, factory=list),
+        Field("website", "website"),
+        Field("support", "support"),
+        Field("github", "github"),
+        Field("owners", "owners", many=True, convert=int, factory=list),
+        Field("featured_guilds", "guilds", many=True, convert=int, factory=list),
+        Field("invite", "invite"),
+        Field("approved_at", "date", convert=_approved_at, default=datetime.min),
+        Field("certified", "certifiedBot", default=False),
+        Field("vanity_uri", "vanity"),
+        Field("all_time_votes", "points", default=0),
+        Field("monthly_votes", "monthlyPoints", default=0),
+        Field("donations_guild", "donatebotguildid"),
+        Field("_user", None),
+    )
+
     def __init__(self, **kwargs):
-        self.id: int = int(kwargs.pop("id"))
-        self.username: str = kwargs.get("username")
-        self.discriminator: str = kwargs.get("discriminator")
-        self.user_avatar: Optional[str] = kwargs.get("avatar", None)
-        self.default_avatar: str = kwargs.get("defAvatar")
+        self._schema_.decoder(kwargs.get("fields"))(self, kwargs, kwargs.get("interner") or _no_intern)
         self.avatar: str = self.user_avatar or self.default_avatar
-
-        self.prefix: str = kwargs.get("prefix")
-        self.short_description: str = kwargs.get("shortdesc")
-        self.long_description: Optional[str] = kwargs.get("longdesc", None)  # NOTE: this can be empty for some reason
-        self.tags: List[str] = kwargs.get("tags", [])
-        self.website: Optional[str] = kwargs.get("website", None)
-        self.support: Optional[str] = kwargs.get("support", None)
-        self.github: Optional[str] = kwargs.get("github", None)
-        self.owners: List[int] = list(map(int, kwargs.get("owners", [])))
-        self.featured_guilds: List[int] = list(map(int, kwargs.get("guilds", [])))
-        self.invite: str = kwargs.get("invite", None) or invite(str(self.id))
-        try:
-            self.approved_at: datetime = (
-                datetime.strptime("%Y-%m-%dT%H:%M:%S.%fZ", kwargs.get("date", "")) or datetime.min
-            )
-        except ValueError:
-            self.approved_at = datetime.min
-        self.certified: bool = kwargs.get("certifiedBot", False)
-        self.vanity_uri: Optional[str] = kwargs.get("vanity", None)
-        self.all_time_votes: int = kwargs.get("points", 0)
-        self.monthly_votes: int = kwargs.get("monthlyPoints", 0)
-        self.donations_guild: Optional[int] = kwargs.get("donatebotguildid", None)
-
+        if not self.invite:
+            self.invite: str = invite(str(self.id))
         if kwargs.get("state"):
-            self._user: Optional[DiscordUser] = kwargs["state"].get_user(self.id)
-        else:
-            self._user: Optional[DiscordUser] = None
+            self._user: Optional["DiscordUser"] = kwargs["state"].get_user(self.id)
 
-    def user(self, state=None) -> Optional[DiscordUser]:
+    def _attach(self, state):
+        self._user = state.get_user(self.id) if state else None
+
+    def user(self, state=None) -> Optional["DiscordUser"]:
         """Gets the current discord user object from the top.gg user object.
 
         state can be the bot/client instance, or anything with a get_user method."""
@@ -373,12 +426,15 @@ class BotSearchResults(_ReprMixin):
         )
 
     def __iter__(self):
-        return self.results
+        return iter(self.results)
 
 
-class BotStats(_ReprMixin):
+class BotStats(_ReprMixin, _BinaryMixin):
     """Model representing 3 fields from /bot/{id}/stats"""
 
+    # JSON can't have integer keys, so the shards are stored as pairs.
+    _codecs_ = {"shards": (lambda shards: list(shards.items()), lambda pairs: dict(map(tuple, pairs)))}
+
     def __init__(self, **kwargs):
         self.server_count: int = kwargs.pop("server_count", 0)
         if kwargs.get("shards"):
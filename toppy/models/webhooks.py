@@ -1,10 +1,12 @@
+import re
 from typing import Union, TYPE_CHECKING, Optional, AnyStr, Any
 from enum import Enum
 
-import discord
-
 from .user import _ReprMixin
 
+if TYPE_CHECKING:
+    import discord
+
 
 __all__ = (
     "VoteType",
@@ -23,6 +25,26 @@ class VoteType(Enum):
     """Represents a test vote"""
 
 
+_SNOWFLAKE = re.compile(r"[0-9]{1,20}")
+
+
+def _snowflake(data: dict, key: str):
+    # Discord IDs arrive as strings of digits. Anything else is rejected up front, rather than failing later on, when
+    # something finally calls int() on it.
+    value = data[key]
+    if isinstance(value, bool) or not isinstance(value, (str, int)) or not _SNOWFLAKE.fullmatch(str(value)):
+        raise ValueError(f"{key!r} is not a snowflake: {value!r}")
+    return value
+
+
+def _discord_object(snowflake: str) -> "discord.Object":
+    # discord.py is only imported when a discord object is actually asked for, so that votes can be received (and
+    # forwarded, see ``python -m toppy serve``) without it.
+    from discord import Object
+
+    return Object(int(snowflake))
+
+
 class SharedVote:
     """
     Attributes:
@@ -46,7 +68,12 @@ class SharedVote:
         self.query = query
 
     @property
-    def user(self) -> Union[discord.User, discord.Object]:
+    def user_id(self) -> int:
+        """The ID of the user who voted."""
+        return int(self._user)
+
+    @property
+    def user(self) -> Union["discord.User", "discord.Object"]:
         """
         Returns the user who voted.
 
@@ -59,7 +86,7 @@ class SharedVote:
         us = None
         if self._state:
             us = self._state.get_user(int(self._user))
-        return us or discord.Object(int(self._user))
+        return us or _discord_object(self._user)
 
 
 class ServerVote(SharedVote, _ReprMixin):
@@ -74,14 +101,14 @@ class ServerVote(SharedVote, _ReprMixin):
     def __init__(self, data: dict, *, state=None):
         super().__init__(
             state,
-            data["user"],
+            _snowflake(data, "user"),
             data["type"],
             data.get("query", "")
         )
-        self._guild = data["guild"]
+        self._guild = _snowflake(data, "guild")
 
     @property
-    def guild(self) -> Union[discord.Guild, discord.Object]:
+    def guild(self) -> Union["discord.Guild", "discord.Object"]:
         """
         Returns the guild that was voted on.
 
@@ -91,7 +118,7 @@ class ServerVote(SharedVote, _ReprMixin):
 
         :returns: :class:`discord:discord.Guild` or :class:`discord:discord.Object`.
         """
-        us = discord.Object(int(self._guild))
+        us = _discord_object(self._guild)
         if self._state:
             us = self._state.get_guild(us.id) or us
         return us
@@ -100,6 +127,14 @@ class ServerVote(SharedVote, _ReprMixin):
     def user(self):
         return super().user
 
+    def to_dict(self) -> dict:
+        """
+        Returns the vote as its webhook payload, which :func:`cast_vote` can turn back into a vote.
+
+        :rtype: :class:`py:dict`
+        """
+        return {"guild": self._guild, "user": self._user, "type": self.type.value, "query": self.query}
+
 
 class BotVote(SharedVote, _ReprMixin):
     """
@@ -122,16 +157,16 @@ class BotVote(SharedVote, _ReprMixin):
     def __init__(self, data: dict, *, state=None):
         super().__init__(
             state,
-            data["user"],
+            _snowflake(data, "user"),
             data["type"],
             data.get("query", "")
         )
-        self._bot = data["bot"]
+        self._bot = _snowflake(data, "bot")
         self.is_weekend: bool = data.get("isWeekend", False)
         self.isWeekend = self.is_weekend  # alias
 
     @property
-    def bot(self) -> Union[discord.User, discord.Object]:
+    def bot(self) -> Union["discord.User", "discord.Object"]:
         """
         The resolved bot user for this vote. This is, hopefully, always your current bot.
 
@@ -143,14 +178,37 @@ class BotVote(SharedVote, _ReprMixin):
         us = None
         if self._state:
             us = self._state.get_user(int(self._bot))
-        return us or discord.Object(int(self._bot))
+        return us or _discord_object(self._bot)
 
     @property
     def user(self):
         return super().user
 
+    def to_dict(self) -> dict:
+        """
+        Returns the vote as its webhook payload, which :func:`cast_vote` can turn back into a vote.
+
+        :rtype: :class:`py:dict`
+        """
+        return {
+            "bot": self._bot,
+            "user": self._user,
+            "type": self.type.value,
+            "isWeekend": self.is_weekend,
+            "query": self.query,
+        }
+
 
 def cast_vote(data: dict, state=None) -> Union[BotVote, ServerVote]:
+    """
+    Turns a webhook payload into a :class:`BotVote` or :class:`ServerVote`.
+
+    :raises TypeError: The payload isn't a JSON object.
+    :raises KeyError: A required field is missing.
+    :raises ValueError: A field is invalid, e.g. an ID that isn't a snowflake.
+    """
+    if not isinstance(data, dict):
+        raise TypeError(f"Expected a JSON object, got {type(data).__name__}.")
     if data.get("bot") is not None:
         v = BotVote
     else:
@@ -1 +1 @@
-from .bucket import _routes as routes, Ratelimit
+from .bucket import _routes as routes, Priority, Ratelimit
@@ -1,6 +1,25 @@
+import math
 from datetime import datetime
 from datetime import timedelta
-from typing import Dict
+from enum import IntEnum
+from typing import Dict, Optional
+
+
+class Priority(IntEnum):
+    r"""
+    How important a request is, which decides how much of each bucket it may use (see :class:`Ratelimit`).
+
+    Pass one as ``priority=`` to any :class:`toppy.client.TopGG` method that sends a request.
+    """
+
+    LOW = 0
+    """Background work that can wait, such as bulk fetches and autoposting. Throttled as the bucket fills up."""
+
+    NORMAL = 1
+    """The default. May use everything but the share of each bucket reserved for :attr:`HIGH`."""
+
+    HIGH = 2
+    """User-facing requests, such as vote checks in commands. May use the whole bucket."""
 
 
 class Ratelimit:
@@ -10,16 +29,91 @@ class Ratelimit:
     :param route: str - Not actually used.
     :param hits: int - The maximum number of times the API can be hit before a 429 is expected.
     :param cooldown: float - The cooldown time when hitting a 429. For top.gg, this is always 3600.0 (1 hour)
+    :param reserved: float - The share of ``hits`` (from 0 to 1) that only :attr:`Priority.HIGH` requests may use, so
+        that background work can never use up the budget that user-facing requests need.
+
+    Requests of :attr:`Priority.LOW` are also throttled once half of the budget they may use is gone: they're spread
+    evenly over the rest of the window, rather than using the rest of it up straight away.
+
+    To plan around the budget, see :attr:`remaining`, :attr:`resets_at`, :attr:`rate` and
+    :meth:`time_to_exhaustion`.
     """
 
-    def __init__(self, *, route: str, hits: int, cooldown: float):
+    def __init__(self, *, route: str, hits: int, cooldown: float, reserved: float = 0.1):
         self.route = route
         self.max_hits = hits
         self.hits = 0
         self.cooldown = cooldown
+        self.reserved = reserved
         self.expires = datetime.min
+        self.started = datetime.min
         self.calls = []
 
+    def _refresh(self):
+        # Starts a new window once the current one has ended.
+        if self.expires != datetime.min and datetime.utcnow() > self.expires:
+            self.hits = 0
+            self.expires = self.started = datetime.min
+
+    @property
+    def remaining(self) -> int:
+        r"""
+        How many more hits the current window allows, at any priority. See :meth:`remaining_for`.
+
+        :return: The number of hits left.
+        """
+        return self.remaining_for(Priority.HIGH)
+
+    def remaining_for(self, priority: Priority = Priority.NORMAL) -> int:
+        r"""
+        How many more hits requests of the given priority may use in the current window.
+
+        :param priority: Priority - The priority of the requests.
+        :return: The number of hits left.
+        """
+        self._refresh()
+        return max(self.limit_for(priority) - self.hits, 0)
+
+    @property
+    def resets_at(self) -> Optional[datetime]:
+        r"""
+        When (in UTC) the current window ends and the budget is restored, or None if no window has started.
+
+        :return: The reset time.
+        """
+        self._refresh()
+        return None if self.expires == datetime.min else self.expires
+
+    @property
+    def rate(self) -> float:
+        r"""
+        How fast hits are being used, in hits per second, averaged over the current window so far.
+
+        :return: The rate. ``0.0`` if no window has started.
+        """
+        self._refresh()
+        if self.started == datetime.min:
+            return 0.0
+        # Measured over at least a second, so that one hit doesn't look like a flood.
+        elapsed = max((datetime.utcnow() - self.started).total_seconds(), 1.0)
+        return self.hits / elapsed
+
+    def time_to_exhaustion(self, priority: Priority = Priority.NORMAL) -> float:
+        r"""
+        How long, in seconds, until requests of the given priority run out of budget if hits keep being used at the
+        current :attr:`rate`.
+
+        If this is more than :attr:`retry_after`, the window will reset before the budget runs out.
+
+        :param priority: Priority - The priority of the requests.
+        :return: The projected time. ``0.0`` if the budget is already gone, and infinity if nothing is being used.
+        """
+        remaining = self.remaining_for(priority)
+        if not remaining:
+            return 0.0
+        rate = self.rate
+        return remaining / rate if rate else float("inf")
+
     @property
     def ratelimited(self) -> bool:
         r"""
@@ -46,6 +140,48 @@ class Ratelimit:
             return 0.0
         return max((self.expires - datetime.utcnow()).total_seconds(), 0.0)
 
+    def limit_for(self, priority: Priority = Priority.NORMAL) -> int:
+        r"""
+        How many hits requests of the given priority may use, in each window.
+
+        :param priority: Priority - The priority of the request.
+        :return: The number of hits.
+        """
+        if priority >= Priority.HIGH or not math.isfinite(self.max_hits):
+            # An unlimited bucket (e.g. ``max_hits = float("inf")`` in benchmarks) has nothing worth reserving.
+            return self.max_hits
+        return int(self.max_hits * (1 - self.reserved))
+
+    def ratelimited_for(self, priority: Priority = Priority.NORMAL) -> bool:
+        r"""
+        Like :attr:`ratelimited`, but for a request of the given priority, which may not use the reserved share.
+
+        :param priority: Priority - The priority of the request.
+        :return: True if the request should not be sent yet, otherwise False.
+        """
+        self._refresh()
+        return self.hits >= self.limit_for(priority) and datetime.utcnow() <= self.expires
+
+    def delay_for(self, priority: Priority = Priority.NORMAL, pending: int = None) -> float:
+        r"""
+        How long, in seconds, a request of the given priority should wait before it is sent, to pace itself.
+
+        Only :attr:`Priority.LOW` requests are ever delayed. If the job they're part of is known to need ``pending``
+        more requests (including this one), and that fits in the budget left in this window, they aren't delayed
+        either: the job may as well finish as soon as possible.
+
+        :param priority: Priority - The priority of the request.
+        :param pending: Optional[int] - How many requests the job still has to send, including this one, if known.
+        :return: The delay, in seconds. ``0.0`` if the request can be sent straight away.
+        """
+        if priority > Priority.LOW:
+            return 0.0
+        self._refresh()
+        limit = self.limit_for(priority)
+        if self.hits < limit / 2 or (pending is not None and pending <= limit - self.hits):
+            return 0.0
+        return self.retry_after / max(limit - self.hits, 1)
+
     def sync_from_ratelimit(self, retry_after: float):
         r"""
         Syncs the internal ratelimit clock to that of a 429 response.
@@ -54,13 +190,16 @@ class Ratelimit:
         """
         self.hits = self.max_hits
         self.cooldown = retry_after
+        self.started = datetime.utcnow()
         self.expires = datetime.utcnow() + timedelta(seconds=retry_after)
 
     def add_hit(self):
         r"""Handles adding a hit to the route and dealing with the datetime-y stuff"""
+        self._refresh()
         self.hits += 1
         if self.expires is None or self.expires <= datetime.utcnow():
-            self.expires = datetime.utcnow() + timedelta(seconds=self.cooldown)
+            self.started = datetime.utcnow()
+            self.expires = self.started + timedelta(seconds=self.cooldown)
 
 
 _routes: Dict[str, Ratelimit] = {
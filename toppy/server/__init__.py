@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from typing import Coroutine
+
+from .analytics import *
+from .batcher import *
+from .dedup import *
+from .dispatcher import *
+from .journal import *
+from .stream import *
+from .webhook import *
+from .webhook import _create_callback, _replay
+from ..models import cast_vote
+
+
+__all__ = (
+    "create_server",
+    "VoteAnalytics",
+    "VoteBatcher",
+    "VoteDeduplicator",
+    "VoteDispatcher",
+    "VoteJournal",
+    "VoteSubscription",
+    "WebhookServer",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def start_server(
+    bot, *, host: str = "0.0.0.0", port: int = 8080, path: str = "/", auth: str = None, disable_warnings: bool = False,
+    verbose: bool = True, workers: int = 0, max_queue: int = 1000, dispatcher: VoteDispatcher = None,
+    dedup_window: float = 0, deduplicator: VoteDeduplicator = None, journal_path: str = None,
+    journal: VoteJournal = None, batch_size: int = 0, batch_delay: float = 1.0, batcher: VoteBatcher = None,
+    analytics: VoteAnalytics = None, unix_path: str = None, reuse_port: bool = False, processes: int = 0,
+    max_body_size: int = 16 * 1024, rate_limit: float = None, rate_burst: float = None
+) -> Coroutine[None, None, WebhookServer]:
+    """
+    Creates a vote webhook server.
+
+    This will listen for webhooks on <host>:<port>[/<path>]. To receive votes for several bots on one port, use
+    :class:`WebhookServer` instead.
+
+    MAKE SURE YOUR PORT IS FORWARDED AND THAT YOUR AUTH+PATH IS THE SAME AS THAT ON TOP.GG!
+
+    By default, ``on_vote`` is dispatched before top.gg is sent a response. If ``workers`` is set, votes are instead
+    acknowledged as soon as they are validated, and handled afterwards by that many workers, each awaiting
+    ``on_vote`` (see :class:`VoteDispatcher`). If more than ``max_queue`` votes are waiting to be handled, new votes
+    are refused with a 503, and top.gg will retry them later.
+
+    top.gg re-sends votes it didn't get a timely response for. Setting ``dedup_window`` ignores any vote that was
+    already seen in the last that many seconds (see :class:`VoteDeduplicator`). Duplicates are still answered with a
+    200, but ``on_vote`` isn't dispatched for them.
+
+    Setting ``journal_path`` writes every vote to a :class:`VoteJournal` before it is acknowledged, and marks it as
+    done once it has been handled. Any votes that were left unhandled (for example, because the bot was restarted)
+    are dispatched again when the server starts. This is most useful with ``workers``, which mark a vote as done only
+    once ``on_vote`` (and every dispatcher listener) has finished with it. Without ``workers``, ``on_vote`` is only
+    scheduled, so a vote is marked as done before it has run; only batch handlers are waited for.
+
+    Setting ``batch_size`` also dispatches ``on_vote_batch`` with lists of up to that many votes, each sent at most
+    ``batch_delay`` seconds after its first vote arrived (see :class:`VoteBatcher`). ``on_vote`` is still dispatched
+    for every vote.
+
+    If ``analytics`` is given, it is updated with every accepted vote, so that vote counts, streaks and the monthly
+    leaderboard can be read from it at any time.
+
+    The server can also listen on a Unix domain socket (``unix_path``), or receive votes in several worker processes
+    sharing the port (``processes``). Requests can be limited by size and by rate per remote address
+    (``max_body_size``, ``rate_limit`` and ``rate_burst``). See :class:`WebhookServer` for details.
+
+    :param bot: Your bot instance
+    :param host: The host to run this on. Usually, it's fine to leave this default.
+    :param port: The port to listen to. Make sure it's forwarded. This defaults to 8080.
+    :param path: The bit after your IP/domain. Defaults to /.
+    :param auth: Your authorization you set on your top.gg bot settings. Please don't leave this blank. Please.
+    :param disable_warnings: If True, this will disable any sort of warnings that may arise from the web server.
+    :param verbose: If True, this will log all requests at the INFO level (instead of DEBUG).
+    :param workers: If set, handle votes in the background with this many workers.
+    :param max_queue: How many votes can wait for a worker before new ones are refused. Only used with ``workers``.
+    :param dispatcher: A pre-configured dispatcher to use (e.g. one with extra listeners). Overrides ``workers``.
+    :param dedup_window: If set, ignore repeated deliveries of the same vote within this many seconds.
+    :param deduplicator: A pre-configured deduplicator to use (e.g. to read its hit counts). Overrides
+        ``dedup_window``.
+    :param journal_path: If set, the file to keep a write-ahead log of votes in.
+    :param journal: A pre-configured journal to use. Overrides ``journal_path``.
+    :param batch_size: If set, also dispatch ``on_vote_batch`` with batches of up to this many votes.
+    :param batch_delay: The longest (in seconds) a vote can wait for its batch to fill up.
+    :param batcher: A pre-configured batcher to use. Overrides ``batch_size`` and ``batch_delay``.
+    :param analytics: Vote statistics to keep up to date.
+    :param unix_path: If set, also listen on a Unix domain socket at this path.
+    :param reuse_port: Whether to set ``SO_REUSEPORT``, so that other processes can listen on the same port.
+    :param processes: If set, receive votes in this many worker processes, and forward them to this one.
+    :param max_body_size: The largest request body (in bytes) to accept.
+    :param rate_limit: If set, how many requests per second each remote address can make.
+    :param rate_burst: How many requests each remote address can make at once. Defaults to ``rate_limit``.
+    :type bot: :class:`discord:discord.Client`
+    :type host: :class:`py:str`
+    :type port: :class:`py:int`
+    :type path: :class:`py:str`
+    :type auth: Optional[:class:`py:str`]
+    :type disable_warnings: :class:`py:bool`
+    :type workers: :class:`py:int`
+    :type max_queue: :class:`py:int`
+    :type dispatcher: Optional[:class:`VoteDispatcher`]
+    :type dedup_window: :class:`py:float`
+    :type deduplicator: Optional[:class:`VoteDeduplicator`]
+    :type journal_path: Optional[:class:`py:str`]
+    :type journal: Optional[:class:`VoteJournal`]
+    :type batch_size: :class:`py:int`
+    :type batch_delay: :class:`py:float`
+    :type batcher: Optional[:class:`VoteBatcher`]
+    :type analytics: Optional[:class:`VoteAnalytics`]
+    :type unix_path: Optional[:class:`py:str`]
+    :type reuse_port: :class:`py:bool`
+    :type processes: :class:`py:int`
+    :type max_body_size: :class:`py:int`
+    :type rate_limit: Optional[:class:`py:float`]
+    :type rate_burst: Optional[:class:`py:float`]
+    :return: A coroutine that starts the server, and returns it. Call :meth:`WebhookServer.close` on the result to
+        shut it down gracefully.
+    :rtype: Coroutine[None, None, :class:`WebhookServer`]
+    """
+    server = WebhookServer(
+        host=host,
+        port=port,
+        unix_path=unix_path,
+        reuse_port=reuse_port,
+        processes=processes,
+        max_body_size=max_body_size,
+        rate_limit=rate_limit,
+        rate_burst=rate_burst,
+        disable_warnings=disable_warnings,
+        verbose=verbose,
+    )
+
+    async def inner():
+        await server.register(
+            bot,
+            path=path,
+            auth=auth,
+            workers=workers,
+            max_queue=max_queue,
+            dispatcher=dispatcher,
+            dedup_window=dedup_window,
+            deduplicator=deduplicator,
+            journal_path=journal_path,
+            journal=journal,
+            batch_size=batch_size,
+            batch_delay=batch_delay,
+            batcher=batcher,
+            analytics=analytics,
+        )
+        await server.start()
+        return server
+
+    return inner()
+
+
+def create_server(*args, **kwargs) -> asyncio.Task:
+    """Alias for :function:`start_server`, but imitating the old <1.4.2 behaviour"""
+    return args[0].create_task(start_server(*args, **kwargs))
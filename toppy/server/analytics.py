@@ -0,0 +1,277 @@
+import heapq
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..models import BotVote, ServerVote
+
+
+__all__ = (
+    "VoteAnalytics",
+)
+
+Vote = Union[BotVote, ServerVote]
+
+
+class _RollingCounter:
+    # Counts events in the last ``window`` seconds, in buckets of ``bucket`` seconds. Old buckets are dropped as
+    # they fall out of the window, so both adding and counting are amortised O(1).
+
+    __slots__ = ("window", "bucket", "total", "_buckets")
+
+    def __init__(self, window: float, bucket: float):
+        self.window = window
+        self.bucket = bucket
+        self.total = 0
+        self._buckets: Deque[List[float]] = deque()  # [bucket start, count]
+
+    def _expire(self, now: float):
+        buckets = self._buckets
+        horizon = now - self.window
+        while buckets and buckets[0][0] + self.bucket <= horizon:
+            self.total -= buckets.popleft()[1]
+
+    def add(self, at: float, count: int = 1):
+        start = at - at % self.bucket
+        buckets = self._buckets
+        if not buckets or buckets[-1][0] < start:
+            buckets.append([start, count])
+        else:
+            # Usually the newest bucket, but votes can arrive out of order (e.g. while seeding).
+            i = len(buckets)
+            while i and buckets[i - 1][0] > start:
+                i -= 1
+            if i and buckets[i - 1][0] == start:
+                buckets[i - 1][1] += count
+            else:
+                buckets.insert(i, [start, count])
+        self.total += count
+        self._expire(buckets[-1][0])
+
+    def count(self, now: float) -> int:
+        self._expire(now)
+        return self.total
+
+
+class _Voter:
+    __slots__ = ("last_period", "streak", "best_streak", "month", "monthly")
+
+    def __init__(self):
+        self.last_period = None
+        self.streak = self.best_streak = 0
+        self.month = None
+        self.monthly = 0
+
+
+class VoteAnalytics:
+    r"""
+    Keeps vote statistics up to date as votes arrive, so that they never need recomputing from scratch.
+
+    Three kinds of statistic are kept:
+
+    * The number of votes in the last ``window`` seconds, for each of ``windows``. These are counted in buckets of
+      ``bucket`` seconds, so counts are accurate to within one bucket.
+    * Each user's voting streak: how many ``streak_period``\s (days, by default) in a row they have voted in.
+    * A leaderboard of the ``top_k`` users with the most votes this (UTC) month.
+
+    Every query is O(1), except :meth:`leaderboard` which is O(k log k). Users are tracked in least-recently-voted
+    order, and at most ``max_users`` are kept; the rest are forgotten (their streaks and monthly counts reset).
+
+    Pass this to :func:`start_server` to have it updated by every vote, and call :meth:`seed_from` to start streaks
+    and the leaderboard from the votes top.gg already knows about.
+
+    :param windows: The rolling windows (in seconds) to count votes over.
+    :param bucket: How precise (in seconds) the rolling windows are.
+    :param streak_period: How often (in seconds) a user must vote to keep their streak going.
+    :param top_k: How many users to keep on the leaderboard.
+    :param max_users: The most users to keep streaks and monthly counts for.
+    :type windows: Sequence[:class:`py:float`]
+    :type bucket: :class:`py:float`
+    :type streak_period: :class:`py:float`
+    :type top_k: :class:`py:int`
+    :type max_users: :class:`py:int`
+
+    Attributes:
+        total: :class:`py:int`
+            How many votes have been recorded.
+    """
+
+    def __init__(
+        self,
+        *,
+        windows: Sequence[float] = (3600, 86400),
+        bucket: float = 60,
+        streak_period: float = 86400,
+        top_k: int = 10,
+        max_users: int = 100000,
+    ):
+        self.streak_period = streak_period
+        self.top_k = top_k
+        self.max_users = max_users
+        self.total = 0
+        self._windows: Dict[float, _RollingCounter] = {window: _RollingCounter(window, bucket) for window in windows}
+        self._voters: "OrderedDict[int, _Voter]" = OrderedDict()
+        self._month: Optional[Tuple[int, int]] = None
+        # The leaderboard: {user: monthly votes} for the top k users, plus a min-heap of (votes, user) over it.
+        # Counts only ever go up, so a user can only join the leaderboard by beating its lowest entry. Stale heap
+        # entries (for users whose count has since gone up) are skipped when popped.
+        self._top: Dict[int, int] = {}
+        self._heap: List[Tuple[int, int]] = []
+
+    def add(self, vote: Vote, at: float = None):
+        r"""
+        Records a vote.
+
+        :param vote: The vote.
+        :param at: When the vote happened, as a UNIX timestamp. Defaults to now.
+        """
+        self.record(vote.user_id, at)
+
+    def record(self, user_id: int, at: float = None):
+        r"""
+        Records a vote by a user.
+
+        :param user_id: The ID of the user who voted.
+        :param at: When the vote happened, as a UNIX timestamp. Defaults to now.
+        """
+        if at is None:
+            at = time.time()
+        self.total += 1
+        for counter in self._windows.values():
+            counter.add(at)
+        self._record_voter(user_id, at)
+
+    def _record_voter(self, user_id: int, at: float):
+        # Everything record() does apart from the rolling windows: the user's streak and monthly count.
+        voter = self._voters.get(user_id)
+        if voter is None:
+            voter = self._voters[user_id] = _Voter()
+            if len(self._voters) > self.max_users:
+                self._voters.popitem(last=False)
+        else:
+            self._voters.move_to_end(user_id)
+
+        period = int(at // self.streak_period)
+        if voter.last_period is None or period > voter.last_period + 1:
+            voter.streak = 1
+        elif period == voter.last_period + 1:
+            voter.streak += 1
+        if voter.last_period is None or period > voter.last_period:
+            voter.last_period = period
+        voter.best_streak = max(voter.best_streak, voter.streak)
+
+        when = time.gmtime(at)
+        month = (when.tm_year, when.tm_mon)
+        if self._month is None or month > self._month:
+            self._month = month
+            self._top.clear()
+            self._heap.clear()
+        if month < self._month:
+            # A vote from last month, e.g. while seeding. It counts towards the streak, but not the leaderboard.
+            return
+        if voter.month != month:
+            voter.month = month
+            voter.monthly = 0
+        voter.monthly += 1
+        self._rank(user_id, voter.monthly)
+
+    def _rank(self, user_id: int, count: int):
+        top, heap = self._top, self._heap
+        if user_id not in top:
+            if len(top) >= self.top_k:
+                lowest = self._lowest()
+                if lowest is None or count <= lowest[0]:
+                    return
+                heapq.heappop(heap)
+                del top[lowest[1]]
+        top[user_id] = count
+        heapq.heappush(heap, (count, user_id))
+        if len(heap) > self.top_k * 4:
+            # Too many stale entries; rebuild the heap from the live ones.
+            self._heap = [(count, user) for user, count in top.items()]
+            heapq.heapify(self._heap)
+
+    def _lowest(self) -> Optional[Tuple[int, int]]:
+        heap, top = self._heap, self._top
+        while heap and top.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def seed(self, voters: Iterable, at: float):
+        r"""
+        Records a vote by each of the given users, e.g. from :meth:`toppy.client.TopGG.fetch_votes`, towards their
+        streaks and the monthly leaderboard.
+
+        top.gg doesn't say when these votes happened, so they are all recorded at ``at``, which must be given: pass a
+        time they are known to be from (e.g. the start of the current streak period), not just "now". As their real
+        times are unknown, they don't count towards :meth:`votes_in` or :attr:`total`.
+
+        :param voters: The users (anything with an ``id``) who voted.
+        :param at: When to record the votes at, as a UNIX timestamp.
+        :type at: :class:`py:float`
+        """
+        for voter in voters:
+            self._record_voter(int(voter.id), at)
+
+    async def seed_from(self, client, at: float):
+        r"""
+        Seeds streaks and the leaderboard from your bot's last 1000 votes on top.gg. See :meth:`seed`.
+
+        :param client: The client to fetch the votes with.
+        :param at: When to record the votes at, as a UNIX timestamp.
+        :type client: :class:`toppy.client.TopGG`
+        :type at: :class:`py:float`
+        """
+        self.seed(await client.fetch_votes(), at)
+
+    def votes_in(self, window: float, now: float = None) -> int:
+        r"""
+        Returns how many votes were recorded in the last ``window`` seconds.
+
+        :param window: One of the windows this was created with.
+        :param now: The current time, as a UNIX timestamp. Defaults to now.
+        :rtype: :class:`py:int`
+        :raises ValueError: ``window`` isn't being tracked.
+        """
+        try:
+            counter = self._windows[window]
+        except KeyError:
+            raise ValueError(f"Votes aren't being counted over {window} seconds.") from None
+        return counter.count(time.time() if now is None else now)
+
+    def streak(self, user_id: int, now: float = None) -> int:
+        r"""
+        Returns how many periods in a row a user has voted in, up to now. This is 0 if they missed the last period.
+
+        :param user_id: The user's ID.
+        :param now: The current time, as a UNIX timestamp. Defaults to now.
+        :rtype: :class:`py:int`
+        """
+        voter = self._voters.get(int(user_id))
+        if voter is None:
+            return 0
+        period = int((time.time() if now is None else now) // self.streak_period)
+        return voter.streak if period <= voter.last_period + 1 else 0
+
+    def best_streak(self, user_id: int) -> int:
+        r"""Returns the longest streak a user has had. See :meth:`streak`."""
+        voter = self._voters.get(int(user_id))
+        return voter.best_streak if voter is not None else 0
+
+    def monthly_votes(self, user_id: int) -> int:
+        r"""Returns how many votes a user has made this month."""
+        voter = self._voters.get(int(user_id))
+        return voter.monthly if voter is not None and voter.month == self._month else 0
+
+    def leaderboard(self, k: int = None) -> List[Tuple[int, int]]:
+        r"""
+        Returns the users with the most votes this month, as ``(user ID, votes)`` pairs, most votes first.
+
+        :param k: How many users to return. Defaults to (and can't be more than) ``top_k``.
+        :rtype: List[Tuple[:class:`py:int`, :class:`py:int`]]
+        """
+        k = self.top_k if k is None else min(k, self.top_k)
+        return heapq.nlargest(k, self._top.items(), key=lambda item: (item[1], -item[0]))
+
+    def __repr__(self):
+        return f"VoteAnalytics(total={self.total}, users={len(self._voters)}, top_k={self.top_k})"
@@ -0,0 +1,160 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, List, Optional, Union
+
+from ..models import BotVote, ServerVote
+
+
+__all__ = (
+    "VoteBatcher",
+)
+
+logger = logging.getLogger(__name__)
+
+Vote = Union[BotVote, ServerVote]
+BatchListener = Callable[[List[Vote]], Any]
+
+
+class VoteBatcher:
+    r"""
+    Collects votes into batches, so that they can be handled (e.g. written to a database) many at a time.
+
+    A batch is handed over once it has ``max_size`` votes, or ``max_delay`` seconds after its first vote arrived,
+    whichever comes first. Each batch is dispatched to ``bot`` as ``on_vote_batch`` (if a bot is given), then passed
+    to every listener in turn. Batches are handled one at a time, in order: batches that fill up while one is being
+    handled are merged, and handed over together as soon as it is done. A slow consumer therefore gets bigger batches
+    (larger than ``max_size``, once it has fallen behind) rather than a growing queue of calls.
+
+    With a ``journal``, votes added with their journal ID are only marked as handled once every listener has
+    handled their batch without raising. Those that fail are handled again when the journal is next opened.
+
+    :param bot: The bot to dispatch ``on_vote_batch`` on. Can be None, if you only use listeners.
+    :param max_size: How many votes fill a batch.
+    :param max_delay: The longest (in seconds) a vote can wait for its batch to fill up.
+    :param journal: The journal the votes were written to, if any.
+    :type max_size: :class:`py:int`
+    :type max_delay: :class:`py:float`
+    :type journal: Optional[:class:`VoteJournal`]
+
+    Attributes:
+        votes: :class:`py:int`
+            How many votes have been handed over.
+        batches: :class:`py:int`
+            How many batches have been handed over.
+        failed: :class:`py:int`
+            How many times a listener raised an exception.
+    """
+
+    def __init__(self, bot=None, *, max_size: int = 100, max_delay: float = 1.0, journal=None):
+        if max_size < 1:
+            raise ValueError("Batches must be able to hold at least one vote.")
+        self.bot = bot
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.journal = journal
+        self.listeners: List[BatchListener] = []
+        self.votes = self.batches = self.failed = 0
+        # The batch being filled, and the journal IDs of the votes in it.
+        self._batch: List[Vote] = []
+        self._entries: List[int] = []
+        # Batches that have been handed over, but not yet handled, merged into one.
+        self._ready: List[Vote] = []
+        self._ready_entries: List[int] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Handles the ready votes, one batch after the other, for as long as there are any.
+        self._drainer: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: BatchListener) -> BatchListener:
+        r"""
+        Adds a function to call with every batch. Can be used as a decorator.
+
+        :param listener: A function (or coroutine function) taking a list of votes.
+        """
+        self.listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener: BatchListener):
+        r"""Removes a listener added with :meth:`add_listener`."""
+        self.listeners.remove(listener)
+
+    @property
+    def pending(self) -> int:
+        r"""How many votes are waiting for their batch to be handled."""
+        return len(self._batch) + len(self._ready)
+
+    def add(self, vote: Vote, entry: int = None):
+        r"""
+        Adds a vote to the current batch. Must be called from within a running event loop.
+
+        :param vote: The vote to add.
+        :param entry: The vote's ID in :attr:`journal`, if it has been written to one.
+        """
+        if entry is not None and self.journal is not None:
+            # Whoever else handles the vote (e.g. on_vote) acks it too; it's only done once both have.
+            self.journal.hold(entry)
+            self._entries.append(entry)
+        self._batch.append(vote)
+        if len(self._batch) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_event_loop().call_later(self.max_delay, self._flush)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._batch:
+            return
+        self._ready.extend(self._batch)
+        self._ready_entries.extend(self._entries)
+        self._batch, self._entries = [], []
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.get_event_loop().create_task(self._drain())
+
+    async def _drain(self):
+        while self._ready:
+            batch, self._ready = self._ready, []
+            entries, self._ready_entries = self._ready_entries, []
+            if await self.handle(batch) and self.journal is not None:
+                for entry in entries:
+                    self.journal.ack(entry)
+
+    async def handle(self, votes: List[Vote]) -> bool:
+        r"""
+        Hands a batch of votes to the bot and every listener, right now.
+
+        :returns: True if every listener handled the batch, False if any of them raised.
+        :rtype: :class:`py:bool`
+        """
+        if self.bot is not None:
+            self.bot.dispatch("vote_batch", votes)
+        ok = True
+        for listener in self.listeners:
+            try:
+                result = listener(votes)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                ok = False
+                self.failed += 1
+                logger.exception("Vote batch listener %r failed to handle %d vote(s).", listener, len(votes))
+        self.votes += len(votes)
+        self.batches += 1
+        return ok
+
+    async def flush(self):
+        r"""Hands over the current batch straight away, and waits for every batch to be handled."""
+        self._flush()
+        if self._drainer is not None:
+            await asyncio.gather(self._drainer, return_exceptions=True)
+
+    async def close(self):
+        r"""Alias for :meth:`flush`, to be called when shutting down."""
+        await self.flush()
+
+    def __repr__(self):
+        return (
+            f"VoteBatcher(max_size={self.max_size}, max_delay={self.max_delay}, pending={self.pending}, "
+            f"votes={self.votes}, batches={self.batches}, failed={self.failed})"
+        )
@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple, Union
+
+from ..models import BotVote, ServerVote
+
+
+__all__ = (
+    "VoteDeduplicator",
+)
+
+Vote = Union[BotVote, ServerVote]
+
+
+class VoteDeduplicator:
+    r"""
+    Remembers recently seen votes, so that re-delivered webhooks aren't dispatched twice.
+
+    top.gg re-sends a webhook if it doesn't get a response in time, even if the first delivery was handled. A vote is
+    treated as a duplicate if a vote with the same user, target (bot or server), type and query was seen in the last
+    ``window`` seconds.
+
+    Seen votes are kept in insertion order, so lookups, inserts and expiry are all O(1). At most ``max_size`` votes are
+    remembered; beyond that, the oldest are forgotten early.
+
+    :param window: How long (in seconds) a vote is remembered for.
+    :param max_size: The most votes to remember at once.
+    :type window: :class:`py:float`
+    :type max_size: :class:`py:int`
+
+    Attributes:
+        hits: :class:`py:int`
+            How many duplicate votes have been caught.
+        misses: :class:`py:int`
+            How many new votes have been seen.
+    """
+
+    def __init__(self, window: float = 300, *, max_size: int = 100000):
+        if window <= 0:
+            raise ValueError("The dedup window must be positive.")
+        self.window = window
+        self.max_size = max_size
+        self.hits = self.misses = 0
+        # key -> the time it expires. Expiry times only ever increase, so the oldest entry is always first.
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._clock = time.monotonic
+
+    @staticmethod
+    def key(vote: Vote) -> Tuple[str, str, str, str]:
+        r"""Returns the identity of a vote, used to tell deliveries of the same vote apart from new votes."""
+        target = vote._bot if isinstance(vote, BotVote) else vote._guild
+        return str(vote._user), str(target), vote.type.value, vote.query or ""
+
+    def _expire(self, now: float):
+        seen = self._seen
+        while seen:
+            key, expires = next(iter(seen.items()))
+            if expires > now:
+                break
+            del seen[key]
+
+    def check(self, vote: Vote) -> bool:
+        r"""
+        Checks whether a vote is a duplicate, remembering it if it isn't.
+
+        :returns: True if this vote has already been seen (and should not be dispatched again).
+        :rtype: :class:`py:bool`
+        """
+        now = self._clock()
+        self._expire(now)
+        key = self.key(vote)
+        if key in self._seen:
+            self.hits += 1
+            return True
+        self.misses += 1
+        self._seen[key] = now + self.window
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return False
+
+    def forget(self, vote: Vote):
+        r"""
+        Forgets a vote, so that the next delivery of it is treated as new.
+
+        Used when a vote was seen but couldn't be handled (for example, when the server refused it with a 503).
+        """
+        self._seen.pop(self.key(vote), None)
+
+    def clear(self):
+        r"""Forgets every vote. The hit counters are kept."""
+        self._seen.clear()
+
+    def __contains__(self, vote: Vote) -> bool:
+        self._expire(self._clock())
+        return self.key(vote) in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __repr__(self):
+        return f"VoteDeduplicator(window={self.window}, size={len(self)}, hits={self.hits}, misses={self.misses})"
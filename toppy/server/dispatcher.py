@@ -0,0 +1,200 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, List, Optional, Union
+
+from ..models import BotVote, ServerVote
+
+
+__all__ = (
+    "VoteDispatcher",
+)
+
+logger = logging.getLogger(__name__)
+
+Vote = Union[BotVote, ServerVote]
+Listener = Callable[[Vote], Any]
+
+
+def _vote_handlers(bot) -> list:
+    # What bot.dispatch("vote", vote) would schedule: the bot's own on_vote, then (on a commands.Bot) every on_vote
+    # listener added with @bot.listen() or in a cog.
+    handlers = []
+    method = getattr(bot, "on_vote", None)
+    if method is not None:
+        handlers.append(method)
+    handlers.extend(getattr(bot, "extra_events", {}).get("on_vote", ()))
+    return handlers
+
+
+class VoteDispatcher:
+    r"""
+    A bounded queue of accepted votes, and a pool of workers that hand them to your code.
+
+    Used by the webhook server to acknowledge votes as soon as they are validated: the vote is queued, top.gg gets
+    its 200 straight away, and the (possibly slow) handlers run afterwards in the background. When the queue is
+    full, new votes are refused so that the server can shed load (top.gg will retry them later).
+
+    Each vote is handed to ``bot``'s ``on_vote`` handlers (if a bot is given), then passed to every listener in turn.
+    Workers wait for all of them to finish, so at most ``workers`` votes are handled at once, and votes are refused
+    once the workers fall ``max_queue`` behind. Since ``bot.dispatch`` only schedules ``on_vote`` and returns, the
+    bot's ``on_vote`` and ``on_vote`` listeners (from ``@bot.listen()`` or cogs) are awaited directly instead, which
+    means ``bot.wait_for("vote")`` isn't resolved. A bot with no ``on_vote`` handlers is dispatched to as usual.
+
+    Listeners can be regular functions or coroutine functions, and exceptions raised by them (or by ``on_vote``) are
+    logged and otherwise ignored.
+
+    :param bot: The bot to dispatch ``on_vote`` on. Can be None, if you only use listeners.
+    :param workers: How many votes can be handled concurrently.
+    :param max_queue: How many accepted votes can wait to be handled before new votes are refused.
+    :param retry_after: How many seconds top.gg is told to wait before retrying a refused vote.
+    :param journal: If given, votes submitted with a journal ID are marked as handled in it once every handler
+        (including ``on_vote``) has finished with them.
+    :type workers: :class:`py:int`
+    :type max_queue: :class:`py:int`
+    :type retry_after: :class:`py:int`
+    :type journal: Optional[:class:`VoteJournal`]
+
+    Attributes:
+        accepted: :class:`py:int`
+            How many votes have been queued.
+        refused: :class:`py:int`
+            How many votes were refused because the queue was full.
+        handled: :class:`py:int`
+            How many votes every handler has finished with.
+        failed: :class:`py:int`
+            How many times a handler raised an exception.
+    """
+
+    def __init__(self, bot=None, *, workers: int = 4, max_queue: int = 1000, retry_after: int = 5, journal=None):
+        if workers < 1:
+            raise ValueError("There must be at least one worker.")
+        self.bot = bot
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.journal = journal
+        self.listeners: List[Listener] = []
+        self.accepted = self.refused = self.handled = self.failed = 0
+        # The queue is created once there's a running loop, since on <3.10 it binds to the current loop.
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def add_listener(self, listener: Listener) -> Listener:
+        r"""
+        Adds a function to call with every vote. Can be used as a decorator.
+
+        :param listener: A function (or coroutine function) taking the vote.
+        """
+        self.listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener: Listener):
+        r"""Removes a listener added with :meth:`add_listener`."""
+        self.listeners.remove(listener)
+
+    @property
+    def pending(self) -> int:
+        r"""How many votes are waiting to be handled."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def running(self) -> bool:
+        r"""Whether the workers have been started."""
+        return bool(self._tasks)
+
+    def start(self):
+        r"""
+        Starts the workers. This is done automatically by the first :meth:`submit`, so you rarely need to call this.
+
+        Must be called from within a running event loop.
+        """
+        if self._tasks:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.max_queue)
+        loop = asyncio.get_event_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, vote: Vote, entry: int = None) -> bool:
+        r"""
+        Queues a vote to be handled.
+
+        :param vote: The vote to handle.
+        :param entry: The vote's ID in :attr:`journal`, if it has been written to one.
+
+        :returns: True if the vote was queued, False if the queue is full.
+        :rtype: :class:`py:bool`
+        """
+        if not self._tasks:
+            self.start()
+        try:
+            self._queue.put_nowait((vote, entry))
+        except asyncio.QueueFull:
+            self.refused += 1
+            return False
+        self.accepted += 1
+        return True
+
+    async def handle(self, vote: Vote):
+        r"""
+        Hands a single vote to the bot and every listener, right now, and waits for them to finish. This is what each
+        worker runs.
+        """
+        if self.bot is not None:
+            handlers = _vote_handlers(self.bot)
+            if handlers:
+                results = await asyncio.gather(*(handler(vote) for handler in handlers), return_exceptions=True)
+                for handler, result in zip(handlers, results):
+                    if isinstance(result, Exception):
+                        self.failed += 1
+                        logger.error("on_vote handler %r failed to handle %r.", handler, vote, exc_info=result)
+            else:
+                self.bot.dispatch("vote", vote)
+        for listener in self.listeners:
+            try:
+                result = listener(vote)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                self.failed += 1
+                logger.exception("Vote listener %r failed to handle %r.", listener, vote)
+        self.handled += 1
+
+    async def _worker(self):
+        queue = self._queue
+        while True:
+            vote, entry = await queue.get()
+            try:
+                await self.handle(vote)
+                if entry is not None and self.journal is not None:
+                    self.journal.ack(entry)
+            finally:
+                queue.task_done()
+
+    async def join(self):
+        r"""Waits until every queued vote has been handled."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self, timeout: Optional[float] = 10.0):
+        r"""
+        Stops the workers, first waiting (up to ``timeout`` seconds) for the queued votes to be handled.
+
+        :param timeout: How long to wait for the queue to drain. None waits forever, 0 doesn't wait at all.
+        """
+        if self._tasks and timeout != 0:
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Gave up waiting for %d queued vote(s) to be handled.", self.pending)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def __repr__(self):
+        return (
+            f"VoteDispatcher(workers={self.workers}, pending={self.pending}/{self.max_queue}, "
+            f"accepted={self.accepted}, refused={self.refused}, handled={self.handled}, failed={self.failed})"
+        )
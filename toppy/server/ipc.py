@@ -0,0 +1,262 @@
+import asyncio
+import hmac
+import itertools
+import json
+import logging
+import signal
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from aiohttp import web
+
+from ..models import cast_vote
+from .limits import _check_request, _RejectionLog, _SourceLimiter
+
+
+__all__ = ()
+
+logger = logging.getLogger(__name__)
+
+# (path, remote, authorization, data) -> (status, body, headers). See toppy.server.webhook.
+Router = Callable[[str, str, str, dict], Awaitable[tuple]]
+
+
+def _encode(record) -> bytes:
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+def _line_limit(max_body_size: int) -> int:
+    # The longest line either end may read. A vote is re-encoded before being forwarded, and JSON escapes (``\u0001``)
+    # can make it up to 6 times longer than the body it came from, plus the rest of the record around it.
+    return 6 * max_body_size + 64 * 1024
+
+
+class _IPCServer:
+    # Runs in the bot process. Worker processes send it every vote they receive as a JSON line,
+    # ``[id, path, remote, authorization, data]``, and it answers with ``[id, status, body, headers]``.
+    # It also sends every worker ``[null, {path: auth}]`` when it connects, and whenever the registered bots change,
+    # so that workers can turn away unknown paths and unauthorised requests without forwarding them.
+
+    def __init__(self, path: str, router: Router, max_body_size: int):
+        self.path = path
+        self.router = router
+        self.limit = _line_limit(max_body_size)
+        self.connected = 0
+        self.routes: Dict[str, Optional[str]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self):
+        self._server = await asyncio.start_unix_server(self._client, self.path, limit=self.limit)
+
+    def update_routes(self, routes: Dict[str, Optional[str]]):
+        self.routes = dict(routes)
+        for writer in self._writers:
+            if not writer.is_closing():
+                writer.write(_encode([None, self.routes]))
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connected += 1
+        self._writers.add(writer)
+        writer.write(_encode([None, self.routes]))
+        loop = asyncio.get_event_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    record = json.loads(line)
+                except ValueError as e:
+                    # Too long (the rest of the line has been discarded) or not JSON. Either way, skip just this one
+                    # record: the worker times it out, and the connection carries on for every other vote.
+                    logger.error("Dropped a bad record from a worker process: %s", e)
+                    continue
+                task = loop.create_task(self._answer(writer, record))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            self.connected -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _answer(self, writer: asyncio.StreamWriter, record: list):
+        try:
+            request_id, path, remote, authorization, data = record
+        except (TypeError, ValueError):
+            logger.error("Dropped a malformed record from a worker process: %.200r", record)
+            return
+        try:
+            status, body, headers = await self.router(path, remote, authorization, data)
+        except Exception:
+            logger.exception("Failed to handle a vote forwarded from a worker process.")
+            status, body, headers = 500, '{"detail": "internal error."}', None
+        if not writer.is_closing():
+            writer.write(_encode([request_id, status, body, headers]))
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class _Forwarder:
+    # Runs in each worker process, and sends votes to the bot process's _IPCServer. If the connection is lost, the
+    # next vote reconnects, backing off (up to ``max_backoff`` seconds) while the bot process can't be reached.
+
+    def __init__(self, path: str, max_body_size: int, *, timeout: float = 30.0, max_backoff: float = 5.0):
+        self.path = path
+        self.limit = _line_limit(max_body_size)
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        # {path: encoded auth (or None)}, as last sent by the bot process. None until then.
+        self.routes: Optional[Dict[str, Optional[bytes]]] = None
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connecting = asyncio.Lock()
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._closed = False
+
+    async def connect(self):
+        reader, self._writer = await asyncio.open_unix_connection(self.path, limit=self.limit)
+        self._reader_task = asyncio.get_event_loop().create_task(self._read(reader))
+        self._backoff = 0.0
+
+    async def _reconnect(self):
+        loop = asyncio.get_event_loop()
+        async with self._connecting:
+            if self._writer is not None:
+                return  # another vote got there first
+            if self._closed or loop.time() < self._next_attempt:
+                raise ConnectionError("Not connected to the bot process.")
+            try:
+                await self.connect()
+            except OSError as e:
+                self._backoff = min(max(self._backoff * 2, 0.1), self.max_backoff)
+                self._next_attempt = loop.time() + self._backoff
+                raise ConnectionError(f"Couldn't reconnect to the bot process: {e}") from e
+            logger.info("Reconnected to the bot process.")
+
+    async def _read(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request_id, *reply = json.loads(line)
+                except ValueError as e:
+                    logger.error("Dropped a bad reply from the bot process: %s", e)
+                    continue
+                if request_id is None:
+                    self.routes = {path: auth.encode() if auth else None for path, auth in reply[0].items()}
+                    continue
+                waiter = self._pending.pop(request_id, None)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(reply)
+        finally:
+            self._writer = None
+            for waiter in self._pending.values():
+                if not waiter.done():
+                    waiter.set_exception(ConnectionError("Lost the connection to the bot process."))
+            self._pending.clear()
+
+    async def forward(self, path: str, remote: str, authorization: str, data: dict) -> list:
+        if self._writer is None:
+            await self._reconnect()
+        request_id = next(self._ids)
+        waiter = self._pending[request_id] = asyncio.get_event_loop().create_future()
+        self._writer.write(_encode([request_id, path, remote, authorization, data]))
+        try:
+            return await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError("The bot process didn't answer in time.") from None
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self):
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+
+async def _run_worker(
+    host: str,
+    port: int,
+    ipc_path: str,
+    verbose: bool,
+    max_body_size: int,
+    rate_limit: Optional[float],
+    rate_burst: Optional[float],
+    log_interval: float,
+    disable_warnings: bool,
+):
+    log_level = logging.INFO if verbose else logging.DEBUG
+    forwarder = _Forwarder(ipc_path, max_body_size)
+    limiter = _SourceLimiter(rate_limit, rate_burst) if rate_limit else None
+    rejections = _RejectionLog(log_interval, enabled=not disable_warnings)
+
+    async def callback(request: web.Request) -> web.Response:
+        logger.log(log_level, "Got webhook request from %s.", request.remote)
+        rejected = _check_request(request, limiter, max_body_size, rejections)
+        if rejected is not None:
+            status, body, headers = rejected
+            return web.Response(body=body, status=status, headers=headers)
+        authorization = request.headers.get("Authorization", "")
+        routes = forwarder.routes
+        if routes is not None:
+            # Turned away here, before the body is read, so that a flood of them never reaches the bot process.
+            if request.path not in routes:
+                return web.Response(body='{"detail": "not found."}', status=404)
+            auth = routes[request.path]
+            if auth is not None and not hmac.compare_digest(authorization.encode(), auth):
+                rejections("unauthorized", request.remote)
+                return web.Response(body='{"detail": "unauthorized."}', status=401)
+        # Parse and validate here, so that the bot process only ever sees well-formed votes.
+        try:
+            data = await request.json()
+            cast_vote(data)
+        except (TypeError, ValueError, KeyError) as e:
+            rejections("malformed", request.remote, str(e))
+            return web.Response(body='{"detail": "malformed body."}', status=422)
+        try:
+            status, body, headers = await forwarder.forward(request.path, request.remote, authorization, data)
+        except ConnectionError:
+            return web.Response(body='{"detail": "unavailable."}', status=503, headers={"Retry-After": "5"})
+        return web.Response(body=body, status=status, headers=headers)
+
+    app = web.Application(client_max_size=max_body_size)
+    app.router.add_route("POST", "/{path:.*}", callback)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port, reuse_port=True).start()
+    # Connecting is what tells the bot process that this worker is ready.
+    await forwarder.connect()
+
+    stop = asyncio.Event()
+    asyncio.get_event_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    await stop.wait()
+    # Finishes any in-flight requests before closing the connection they need.
+    await runner.cleanup()
+    await forwarder.close()
+
+
+def _worker_main(*args):
+    # The entry point of each worker process. Ctrl+C is sent to the whole process group, but it's up to the bot
+    # process to shut the workers down (with SIGTERM), so that it can do so in order.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_run_worker(*args))
+    finally:
+        loop.close()
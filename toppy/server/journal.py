@@ -0,0 +1,236 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+__all__ = (
+    "VoteJournal",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class VoteJournal:
+    r"""
+    An append-only log of accepted votes, so that votes which were acknowledged but not yet handled survive a restart.
+
+    Every vote is written to the journal before top.gg is sent a response, and marked as done once it has been
+    handled. When the journal is opened, any vote that was never marked as done is returned to be handled again.
+
+    Writes are batched (group commit): every vote that arrives while the previous batch is being written is written
+    and fsync'ed together in the next one, so a burst of votes costs a handful of fsyncs rather than one each. The
+    file is periodically compacted down to just the unhandled votes.
+
+    The file is made of JSON lines: ``[id, data]`` for a vote, and ``[id]`` once it has been handled.
+
+    :param path: The file to keep the journal in. It is created if it doesn't exist.
+    :param fsync: Whether to fsync each batch. Disabling this trades durability (on power loss) for speed.
+    :param compact_every: How many records to write before compacting the file.
+    :type path: :class:`py:str`
+    :type fsync: :class:`py:bool`
+    :type compact_every: :class:`py:int`
+
+    Attributes:
+        appended: :class:`py:int`
+            How many votes have been written.
+        acked: :class:`py:int`
+            How many votes have been marked as handled.
+        batches: :class:`py:int`
+            How many batches have been written (i.e. how many fsyncs have been done).
+    """
+
+    def __init__(self, path: str, *, fsync: bool = True, compact_every: int = 10000):
+        self.path = path
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self.appended = self.acked = self.batches = 0
+        self._file = None
+        self._next_id = 0
+        # Every vote that was written but not yet acknowledged, by ID. This is what compaction writes out.
+        self._unacked: Dict[int, dict] = {}
+        # How many more acks each vote needs beyond one, when more than one consumer handles it (see hold).
+        self._holds: Dict[int, int] = {}
+        self._buffer: List[bytes] = []
+        self._waiters: List[Tuple[int, asyncio.Future]] = []
+        self._since_compact = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        # Held while the file is being written to or rewritten, since both happen in executor threads.
+        self._lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        r"""How many votes have been written, but not yet marked as handled."""
+        return len(self._unacked)
+
+    def _read(self) -> List[Tuple[int, dict]]:
+        last_id = -1
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as file:
+                for lineno, line in enumerate(file, 1):
+                    try:
+                        record = json.loads(line)
+                        entry = record[0]
+                    except (ValueError, IndexError, TypeError):
+                        # Most likely the last line, torn by a crash mid-write. Nothing in it was acknowledged.
+                        logger.warning("Skipping corrupt record on line %d of vote journal %s.", lineno, self.path)
+                        continue
+                    last_id = max(last_id, entry)
+                    if len(record) > 1:
+                        self._unacked[entry] = record[1]
+                    else:
+                        self._unacked.pop(entry, None)
+        self._next_id = last_id + 1
+        return sorted(self._unacked.items())
+
+    def _write(self, lines: List[bytes]):
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _rewrite(self, entries: List[Tuple[int, dict]]):
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as file:
+            file.write(b"".join(self._encode(entry, data) for entry, data in entries))
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+        if self._file is not None:
+            self._file.close()
+        os.replace(temp, self.path)
+        self._file = open(self.path, "ab")
+        self._since_compact = 0
+
+    @staticmethod
+    def _encode(entry: int, data: dict = None) -> bytes:
+        record = [entry] if data is None else [entry, data]
+        return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+    async def open(self) -> List[Tuple[int, dict]]:
+        r"""
+        Opens the journal, and starts writing to it in the background.
+
+        Must be called (from within a running event loop) before any votes are appended.
+
+        :returns: Every vote that was written in a previous run but never marked as handled, as ``(id, data)`` pairs,
+            oldest first. Call :meth:`ack` with the ID once each has been handled.
+        :rtype: List[Tuple[:class:`py:int`, :class:`py:dict`]]
+        """
+        loop = asyncio.get_event_loop()
+        pending = await loop.run_in_executor(None, self._read)
+        # Start from a compact file, so that the journal doesn't grow across restarts.
+        await loop.run_in_executor(None, self._rewrite, pending)
+        if pending:
+            logger.info("Replaying %d unhandled vote(s) from %s.", len(pending), self.path)
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._flusher = loop.create_task(self._flush_loop())
+        return pending
+
+    async def append(self, data: dict) -> int:
+        r"""
+        Writes a vote to the journal, returning once it is on disk.
+
+        :param data: The vote's raw webhook payload.
+        :returns: The vote's ID in the journal, to pass to :meth:`ack`.
+        :rtype: :class:`py:int`
+        """
+        if self._flusher is None or self._closing:
+            raise RuntimeError("The vote journal is not open.")
+        entry = self._next_id
+        self._next_id += 1
+        self._unacked[entry] = data
+        waiter = asyncio.get_event_loop().create_future()
+        self._buffer.append(self._encode(entry, data))
+        self._waiters.append((entry, waiter))
+        self._wakeup.set()
+        await waiter
+        self.appended += 1
+        return entry
+
+    def hold(self, entry: int):
+        r"""
+        Requires one more :meth:`ack` before a vote counts as handled, for when another consumer (such as a
+        :class:`VoteBatcher`) handles it too. Must be called before the vote's first ack.
+        """
+        if entry in self._unacked:
+            self._holds[entry] = self._holds.get(entry, 0) + 1
+
+    def ack(self, entry: int):
+        r"""
+        Marks a vote as handled, so that it isn't replayed. If the vote is held (see :meth:`hold`), this releases one
+        hold instead.
+
+        This doesn't wait for the mark to be written: if it is lost, the vote is just handled again on the next start.
+        """
+        holds = self._holds.get(entry)
+        if holds is not None:
+            if holds > 1:
+                self._holds[entry] = holds - 1
+            else:
+                del self._holds[entry]
+            return
+        if self._unacked.pop(entry, None) is None:
+            return
+        self.acked += 1
+        self._buffer.append(self._encode(entry))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _flush_loop(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            lines, waiters = self._buffer, self._waiters
+            self._buffer, self._waiters = [], []
+            if lines:
+                try:
+                    async with self._lock:
+                        await loop.run_in_executor(None, self._write, lines)
+                except Exception as e:
+                    logger.exception("Failed to write %d record(s) to vote journal %s.", len(lines), self.path)
+                    for entry, waiter in waiters:
+                        self._unacked.pop(entry, None)
+                        if not waiter.done():
+                            waiter.set_exception(e)
+                else:
+                    self.batches += 1
+                    self._since_compact += len(lines)
+                    for _, waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+            if self._since_compact >= self.compact_every:
+                await self.compact()
+            if self._closing and not self._buffer:
+                return
+
+    async def compact(self):
+        r"""Rewrites the journal so that it only contains unhandled votes. This is done automatically."""
+        logger.debug("Compacting vote journal %s (%d unhandled vote(s)).", self.path, len(self._unacked))
+        async with self._lock:
+            # Snapshot the votes here, since they can be acknowledged while the executor is writing them.
+            entries = sorted(self._unacked.items())
+            await asyncio.get_event_loop().run_in_executor(None, self._rewrite, entries)
+
+    async def close(self):
+        r"""Writes anything outstanding, and closes the journal."""
+        if self._flusher is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._flusher
+        self._flusher = None
+        self._file.close()
+        self._file = None
+
+    def __repr__(self):
+        return (
+            f"VoteJournal({self.path!r}, pending={self.pending}, appended={self.appended}, acked={self.acked}, "
+            f"batches={self.batches})"
+        )
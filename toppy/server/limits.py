@@ -0,0 +1,91 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+__all__ = ()
+
+logger = logging.getLogger(__name__)
+
+_TOO_LARGE = (413, '{"detail": "body too large."}', None)
+_RATELIMITED = (429, '{"detail": "too many requests."}', {"Retry-After": "1"})
+
+
+class _SourceLimiter:
+    # A token bucket per remote address: each source may make ``burst`` requests at once, refilled at ``rate`` per
+    # second. Only the ``max_sources`` most recently seen sources are tracked, so a flood from many addresses can't
+    # grow this without bound.
+
+    __slots__ = ("rate", "burst", "max_sources", "_buckets")
+
+    def __init__(self, rate: float, burst: float = None, max_sources: int = 10000):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self.max_sources = max_sources
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # source -> [tokens, last refill]
+
+    def allow(self, source: str) -> bool:
+        now = time.monotonic()
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            if len(self._buckets) >= self.max_sources:
+                self._buckets.popitem(last=False)
+            self._buckets[source] = [self.burst - 1, now]
+            return True
+        self._buckets.move_to_end(source)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+
+class _RejectionLog:
+    # Counts rejected requests by reason, and logs at most one warning per reason every ``interval`` seconds, so that
+    # a flood of bad requests doesn't also flood the logs.
+
+    def __init__(self, interval: float = 60, *, enabled: bool = True):
+        self.interval = interval
+        self.enabled = enabled
+        self.totals: Dict[str, int] = {}
+        self._unreported: Dict[str, int] = {}
+        self._last: Dict[str, float] = {}
+
+    def __call__(self, reason: str, remote: str, detail: str = ""):
+        self.totals[reason] = self.totals.get(reason, 0) + 1
+        if not self.enabled:
+            return
+        unreported = self._unreported.get(reason, 0) + 1
+        now = time.monotonic()
+        last = self._last.get(reason)
+        if last is not None and now - last < self.interval:
+            self._unreported[reason] = unreported
+            return
+        self._unreported[reason] = 0
+        self._last[reason] = now
+        logger.warning(
+            "Rejected request from %s (%s%s). %d request(s) were rejected for this reason since the last report.",
+            remote,
+            reason,
+            f": {detail}" if detail else "",
+            unreported,
+        )
+
+
+def _check_request(
+    request: web.Request, limiter: Optional[_SourceLimiter], max_body_size: Optional[int], rejections: _RejectionLog
+) -> Optional[Tuple[int, str, Optional[Dict[str, str]]]]:
+    # The checks made before anything else (including auth) is looked at, returning the reply to reject the request
+    # with, if any. These must stay cheap, since they're what stands between a flood of junk and the event loop.
+    if limiter is not None and not limiter.allow(request.remote):
+        rejections("ratelimited", request.remote)
+        return _RATELIMITED
+    if max_body_size is not None and (request.content_length or 0) > max_body_size:
+        rejections("too large", request.remote, f"{request.content_length} bytes")
+        return _TOO_LARGE
+    return None
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+import sys
+from typing import List, Optional
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+
+__all__ = (
+    "VoteSink",
+    "NDJSONSink",
+    "UnixSocketSink",
+    "HTTPSink",
+    "open_sink",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(payloads: List[dict]) -> bytes:
+    return b"".join(json.dumps(payload, separators=(",", ":")).encode() + b"\n" for payload in payloads)
+
+
+class VoteSink:
+    r"""
+    Somewhere to send votes to, used by ``python -m toppy serve`` to hand votes to another process.
+
+    Votes are sent in batches, as their webhook payloads (see :meth:`toppy.models.BotVote.to_dict`).
+    """
+
+    async def send(self, payloads: List[dict]):
+        r"""Sends a batch of votes."""
+        raise NotImplementedError
+
+    async def close(self):
+        r"""Closes the sink, once every batch has been sent."""
+
+
+class NDJSONSink(VoteSink):
+    r"""
+    Appends votes to a file, one JSON object per line.
+
+    :param path: The file to append to. ``-`` writes to stdout instead.
+    :type path: :class:`py:str`
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = sys.stdout.buffer if path == "-" else open(path, "ab")
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+
+    async def send(self, payloads: List[dict]):
+        await asyncio.get_event_loop().run_in_executor(None, self._write, _encode(payloads))
+
+    async def close(self):
+        if self.path != "-":
+            self._file.close()
+
+
+class UnixSocketSink(VoteSink):
+    r"""
+    Streams votes to a Unix domain socket, one JSON object per line. The connection is (re)opened when needed.
+
+    :param path: The socket to connect to.
+    :type path: :class:`py:str`
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def send(self, payloads: List[dict]):
+        data = _encode(payloads)
+        for attempt in range(2):
+            try:
+                if self._writer is None:
+                    _, self._writer = await asyncio.open_unix_connection(self.path)
+                self._writer.write(data)
+                await self._writer.drain()
+                return
+            except (OSError, ConnectionError):
+                self._writer = None
+                if attempt:
+                    raise
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class HTTPSink(VoteSink):
+    r"""
+    POSTs each batch of votes to a URL, as a JSON array. Failed requests are retried with exponential backoff.
+
+    :param url: The URL to POST to.
+    :param retries: How many times to retry a batch before giving up on it.
+    :param headers: Extra headers to send, e.g. for authorization.
+    :type url: :class:`py:str`
+    :type retries: :class:`py:int`
+    :type headers: Optional[:class:`py:dict`]
+    """
+
+    def __init__(self, url: str, *, retries: int = 3, headers: dict = None):
+        self.url = url
+        self.retries = retries
+        self.headers = headers or {}
+        self._session: Optional[ClientSession] = None
+
+    async def send(self, payloads: List[dict]):
+        if self._session is None:
+            self._session = ClientSession(timeout=ClientTimeout(total=30))
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._session.post(self.url, json=payloads, headers=self.headers) as response:
+                    response.raise_for_status()
+                    return
+            except (ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning("Failed to send %d vote(s) to %s (%s), retrying.", len(payloads), self.url, e)
+                await asyncio.sleep(2 ** attempt)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def open_sink(spec: str) -> VoteSink:
+    r"""
+    Creates a sink from a string: ``-`` for stdout, ``unix:<path>`` for a Unix domain socket, an ``http://`` or
+    ``https://`` URL, or otherwise the path of an NDJSON file.
+
+    :param spec: The sink to open.
+    :type spec: :class:`py:str`
+    :rtype: :class:`VoteSink`
+    """
+    if spec.startswith("unix:"):
+        return UnixSocketSink(spec[len("unix:"):])
+    if spec.startswith(("http://", "https://")):
+        return HTTPSink(spec)
+    return NDJSONSink(spec)
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from typing import Callable, Deque, Union
+
+from ..models import BotVote, ServerVote, cast_vote
+
+
+__all__ = (
+    "VoteSubscription",
+)
+
+logger = logging.getLogger(__name__)
+
+Vote = Union[BotVote, ServerVote]
+
+_POLICIES = ("drop_oldest", "block", "spill")
+
+
+class VoteSubscription:
+    r"""
+    A stream of votes, read with ``async for``. Created by :meth:`WebhookServer.votes`.
+
+    Each subscription has its own buffer of up to ``max_size`` votes, so every consumer reads at its own pace. What
+    happens when a consumer falls so far behind that its buffer is full depends on ``overflow``:
+
+    * ``"drop_oldest"`` discards the oldest buffered vote to make room. The server never waits for this consumer.
+    * ``"block"`` makes the server wait for room before it responds to top.gg. Nothing is lost, but a slow consumer
+      slows down vote acknowledgement (and so every other consumer) too.
+    * ``"spill"`` writes votes to a file on disk until the consumer catches up. Nothing is lost, and the server
+      never waits, at the cost of some disk I/O. Votes are still read in the order they arrived.
+
+    .. code-block::
+
+        async with server.votes(max_size=100, overflow="spill") as votes:
+            async for vote in votes:
+                ...
+
+    :param path: Only stream votes for the bot registered on this path. None streams every vote.
+    :param max_size: How many votes to buffer in memory.
+    :param overflow: What to do when the buffer is full. One of ``"drop_oldest"``, ``"block"`` or ``"spill"``.
+    :param spill_path: The file to spill to. Defaults to a temporary file, which is deleted on :meth:`close`.
+    :param state: The bot to attach to votes read back from the spill file.
+    :type path: Optional[:class:`py:str`]
+    :type max_size: :class:`py:int`
+    :type overflow: :class:`py:str`
+    :type spill_path: Optional[:class:`py:str`]
+
+    Attributes:
+        dropped: :class:`py:int`
+            How many votes were discarded because the buffer was full.
+        spilled: :class:`py:int`
+            How many votes were written to the spill file.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: str = None,
+        max_size: int = 1000,
+        overflow: str = "drop_oldest",
+        spill_path: str = None,
+        state=None,
+        on_close: Callable[["VoteSubscription"], None] = None,
+    ):
+        if overflow not in _POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}. Expected one of: {', '.join(_POLICIES)}")
+        if max_size < 1:
+            raise ValueError("The buffer must be able to hold at least one vote.")
+        self.path = path
+        self.max_size = max_size
+        self.overflow = overflow
+        self.state = state
+        self.dropped = self.spilled = 0
+        self.closed = False
+        self._on_close = on_close
+        self._buffer: Deque[Vote] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._spill_path = spill_path
+        self._spill_owned = False
+        self._spill_writer = self._spill_reader = None
+        self._spill_pending = 0
+
+    def __len__(self):
+        return len(self._buffer) + self._spill_pending
+
+    async def put(self, vote: Vote):
+        r"""Adds a vote to the stream. This is done by the server; you shouldn't need to call it."""
+        if self.closed:
+            return
+        if self._spill_pending:
+            # Once anything has been spilled, everything after it must be too, or it would be read out of order.
+            self._spill(vote)
+        elif len(self._buffer) < self.max_size:
+            self._buffer.append(vote)
+        elif self.overflow == "drop_oldest":
+            self._buffer.popleft()
+            self._buffer.append(vote)
+            self.dropped += 1
+        elif self.overflow == "spill":
+            self._spill(vote)
+        else:
+            while len(self._buffer) >= self.max_size and not self.closed:
+                self._writable.clear()
+                await self._writable.wait()
+            if self.closed:
+                return
+            self._buffer.append(vote)
+        self._readable.set()
+
+    def _spill(self, vote: Vote):
+        if self._spill_writer is None:
+            if self._spill_path is None:
+                fd, self._spill_path = tempfile.mkstemp(prefix="toppy-votes-", suffix=".ndjson")
+                os.close(fd)
+                self._spill_owned = True
+            self._spill_writer = open(self._spill_path, "w+b")
+            self._spill_reader = open(self._spill_path, "rb")
+        self._spill_writer.write(json.dumps(vote.to_dict(), separators=(",", ":")).encode() + b"\n")
+        self._spill_pending += 1
+        self.spilled += 1
+
+    def _unspill(self) -> Vote:
+        self._spill_writer.flush()
+        vote = cast_vote(json.loads(self._spill_reader.readline()), self.state)
+        self._spill_pending -= 1
+        if not self._spill_pending:
+            # Caught up, so start the file again rather than letting it grow forever.
+            self._spill_writer.seek(0)
+            self._spill_writer.truncate()
+            self._spill_reader.seek(0)
+        return vote
+
+    async def get(self) -> Vote:
+        r"""
+        Waits for, and returns, the next vote.
+
+        :raises StopAsyncIteration: The subscription was closed, and every buffered vote has been read.
+        """
+        while True:
+            if self._buffer:
+                vote = self._buffer.popleft()
+                self._writable.set()
+                return vote
+            if self._spill_pending:
+                return self._unspill()
+            if self.closed:
+                self._cleanup()
+                raise StopAsyncIteration
+            self._readable.clear()
+            await self._readable.wait()
+
+    def __aiter__(self) -> "VoteSubscription":
+        return self
+
+    async def __anext__(self) -> Vote:
+        return await self.get()
+
+    def close(self):
+        r"""
+        Stops receiving votes. Votes that were already buffered can still be read, after which iteration stops.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._readable.set()
+        self._writable.set()
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def _cleanup(self):
+        if self._spill_writer is not None:
+            self._spill_writer.close()
+            self._spill_reader.close()
+            self._spill_writer = self._spill_reader = None
+            self._spill_pending = 0
+            if self._spill_owned:
+                os.remove(self._spill_path)
+
+    async def __aenter__(self) -> "VoteSubscription":
+        return self
+
+    async def __aexit__(self, *_):
+        self.close()
+        self._buffer.clear()
+        self._cleanup()
+
+    def __repr__(self):
+        return (
+            f"VoteSubscription(path={self.path!r}, overflow={self.overflow!r}, buffered={len(self)}, "
+            f"dropped={self.dropped}, spilled={self.spilled})"
+        )
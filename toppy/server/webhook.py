@@ -0,0 +1,533 @@
+import asyncio
+import hmac
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+from ..models import cast_vote
+from .analytics import VoteAnalytics
+from .batcher import VoteBatcher
+from .dedup import VoteDeduplicator
+from .dispatcher import VoteDispatcher
+from .ipc import _IPCServer, _worker_main
+from .journal import VoteJournal
+from .limits import _check_request, _RejectionLog, _SourceLimiter
+from .stream import VoteSubscription
+
+
+__all__ = (
+    "WebhookServer",
+)
+
+logger = logging.getLogger(__name__)
+
+
+# (status, body, headers) for a webhook response. Kept as plain values so that they can be sent between processes.
+Reply = Tuple[int, str, Optional[Dict[str, str]]]
+
+_ACCEPTED: Reply = (200, '{"detail": "accepted"}', None)
+_DUPLICATE: Reply = (200, '{"detail": "duplicate"}', None)
+_NOT_FOUND: Reply = (404, '{"detail": "not found."}', None)
+_UNAUTHORIZED: Reply = (401, '{"detail": "unauthorized."}', None)
+_MALFORMED: Reply = (422, '{"detail": "malformed body."}', None)
+
+
+def _create_handler(
+    bot,
+    auth,
+    *,
+    disable_warnings: bool = False,
+    verbose: bool = False,
+    dispatcher: VoteDispatcher = None,
+    deduplicator: VoteDeduplicator = None,
+    journal: VoteJournal = None,
+    batcher: VoteBatcher = None,
+    analytics: VoteAnalytics = None,
+    rejections: _RejectionLog = None,
+    publish: Callable[[Any], Awaitable[None]] = None,
+) -> Callable[[str, str, Callable[[], Awaitable[Any]]], Awaitable[Reply]]:
+    # NOTE: This is the hot path for every vote, so nothing in here should block, and logging is lazily formatted.
+    log_level = logging.INFO if verbose else logging.DEBUG
+    if rejections is None:
+        rejections = _RejectionLog(enabled=not disable_warnings)
+    auth = auth.encode() if auth else None
+
+    async def handle(remote: str, authorization: str, read: Callable[[], Awaitable[Any]]) -> Reply:
+        # ``read`` is only awaited once the request is authorised, so that unauthorised bodies are never parsed.
+        logger.log(log_level, "Got webhook request from %s.", remote)
+        # Compared in constant time, so that the secret can't be guessed from how long it takes to be rejected.
+        if auth is not None and not hmac.compare_digest(authorization.encode(), auth):
+            rejections("unauthorized", remote)
+            return _UNAUTHORIZED
+        data = None
+        try:
+            data = await read()
+            logger.log(log_level, "Data from %s: %s", remote, data)
+            vote = cast_vote(data, bot)
+        except (TypeError, ValueError, KeyError) as e:
+            rejections("malformed", remote, f"{data!r} - {e}")
+            return _MALFORMED
+        if deduplicator is not None and deduplicator.check(vote):
+            # A re-delivery of a vote we've already accepted. top.gg still needs a 200, or it'll keep retrying.
+            logger.log(log_level, "Ignoring duplicate %r from %s.", vote, remote)
+            return _DUPLICATE
+        entry = None
+        if journal is not None:
+            # Write-ahead: once top.gg has its 200, the vote must survive a restart.
+            try:
+                entry = await journal.append(data)
+            except Exception:
+                # top.gg gets a 500 and sends the vote again, which mustn't be taken for a duplicate.
+                if deduplicator is not None:
+                    deduplicator.forget(vote)
+                raise
+        if dispatcher is not None:
+            # Ack-first: the vote is handled in the background, after top.gg has had its response.
+            if not dispatcher.submit(vote, entry):
+                logger.warning("Vote queue is full, refusing vote from %s.", remote)
+                if deduplicator is not None:
+                    deduplicator.forget(vote)
+                if entry is not None:
+                    # top.gg will send it again, so there's nothing to replay.
+                    journal.ack(entry)
+                return 503, '{"detail": "overloaded, retry later."}', {"Retry-After": str(dispatcher.retry_after)}
+            logger.log(log_level, "Queued %r for dispatch.", vote)
+        if batcher is not None:
+            # Before on_vote's ack below: with a journal, the vote is only done once its batch has been handled too.
+            batcher.add(vote, entry)
+        if dispatcher is None:
+            # The bot can be None when running headless, with votes only going to the batcher or subscribers.
+            if bot is not None:
+                bot.dispatch("vote", vote)
+                logger.log(log_level, "Dispatched %r to on_vote.", vote)
+            if entry is not None:
+                journal.ack(entry)
+        if analytics is not None:
+            analytics.add(vote)
+        if publish is not None:
+            await publish(vote)
+        return _ACCEPTED
+
+    return handle
+
+
+def _create_callback(bot, auth, **kwargs) -> Callable[[web.Request], Awaitable[web.Response]]:
+    # Wraps a handler (see _create_handler) into an aiohttp request handler.
+    handle = _create_handler(bot, auth, **kwargs)
+
+    async def callback(request: web.Request) -> web.Response:
+        status, body, headers = await handle(request.remote, request.headers.get("Authorization", ""), request.json)
+        return web.Response(body=body, status=status, headers=headers)
+
+    return callback
+
+
+async def _replay(
+    bot,
+    journal: VoteJournal,
+    dispatcher: VoteDispatcher = None,
+    batcher: VoteBatcher = None,
+    analytics: VoteAnalytics = None,
+    publish: Callable[[Any], Awaitable[None]] = None,
+):
+    # Opens the journal, and hands every vote that wasn't handled last run to the bot again.
+    for entry, data in await journal.open():
+        vote = cast_vote(data, bot)
+        if batcher is not None:
+            batcher.add(vote, entry)
+        if dispatcher is not None:
+            if not dispatcher.submit(vote, entry):
+                # The backlog is bigger than the queue. There's no-one to refuse it to, so handle it now.
+                await dispatcher.handle(vote)
+                journal.ack(entry)
+        else:
+            if bot is not None:
+                bot.dispatch("vote", vote)
+            journal.ack(entry)
+        if analytics is not None:
+            analytics.add(vote)
+        if publish is not None:
+            await publish(vote)
+
+
+class _Registration:
+    __slots__ = ("path", "bot", "auth", "handler", "dispatcher", "journal", "batcher")
+
+    def __init__(self, path, bot, auth, handler, dispatcher, journal, batcher):
+        self.path = path
+        self.bot = bot
+        self.auth = auth
+        self.handler = handler
+        self.dispatcher = dispatcher
+        self.journal = journal
+        self.batcher = batcher
+
+
+class WebhookServer:
+    r"""
+    A single webhook server that receives votes for any number of bots, each on its own path and with its own auth.
+
+    Every registration shares one aiohttp application and one listener, and requests are routed by an exact path
+    lookup, so adding more bots costs no extra sockets. Bots can be registered and unregistered while the server is
+    running.
+
+    As well as (or instead of) TCP, the server can listen on a Unix domain socket with ``unix_path``, which saves a
+    TCP hop when it sits behind a local reverse proxy.
+
+    With ``processes``, the HTTP side runs in that many worker processes instead, all accepting connections on the
+    same port (with ``SO_REUSEPORT``). Each worker turns away unknown paths and unauthorised requests before reading
+    them, parses and validates the votes it receives, then forwards them to this process over a Unix domain socket,
+    where they are handled exactly as usual (including the response, so deduplication and backpressure still
+    apply). This spreads the cost of HTTP and JSON parsing across CPUs,
+    but is only available on platforms with ``SO_REUSEPORT`` and Unix domain sockets (e.g. Linux).
+
+    Requests are checked as cheaply as possible before anything else is done with them: bodies over
+    ``max_body_size`` bytes are refused with a 413 before they are read, and if ``rate_limit`` is set, each remote
+    address may only make that many requests per second (with bursts of up to ``rate_burst``), or get a 429. Rejected
+    requests are counted in :attr:`rejections`, and logged at most once every ``log_interval`` seconds per reason.
+    Note that top.gg sends every vote from a handful of addresses, so ``rate_limit`` must be comfortably above your
+    peak vote rate. With ``processes``, each worker process limits (and counts) its own requests.
+
+    .. code-block::
+
+        server = WebhookServer(port=8080)
+        await server.register(bot_one, path="/one", auth="secret one")
+        await server.register(bot_two, path="/two", auth="secret two", workers=4)
+        await server.start()
+        ...
+        await server.close()
+
+    :param host: The host to listen on.
+    :param port: The port to listen on. ``0`` picks any free port, and None doesn't listen on TCP at all.
+    :param unix_path: If set, also listen on a Unix domain socket at this path.
+    :param reuse_port: Whether to set ``SO_REUSEPORT``, so that other processes can listen on the same port.
+    :param processes: If set, receive votes in this many worker processes, and forward them to this one.
+    :param max_body_size: The largest request body (in bytes) to accept.
+    :param rate_limit: If set, how many requests per second each remote address can make.
+    :param rate_burst: How many requests each remote address can make at once. Defaults to ``rate_limit``.
+    :param log_interval: The least time (in seconds) between warnings about rejected requests, per reason.
+    :param disable_warnings: If True, this will disable any sort of warnings that may arise from the web server.
+    :param verbose: If True, this will log all requests at the INFO level (instead of DEBUG).
+    :type host: :class:`py:str`
+    :type port: Optional[:class:`py:int`]
+    :type unix_path: Optional[:class:`py:str`]
+    :type reuse_port: :class:`py:bool`
+    :type processes: :class:`py:int`
+    :type max_body_size: :class:`py:int`
+    :type rate_limit: Optional[:class:`py:float`]
+    :type rate_burst: Optional[:class:`py:float`]
+    :type log_interval: :class:`py:float`
+    :type disable_warnings: :class:`py:bool`
+    :type verbose: :class:`py:bool`
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "0.0.0.0",
+        port: Optional[int] = 8080,
+        unix_path: str = None,
+        reuse_port: bool = False,
+        processes: int = 0,
+        max_body_size: int = 16 * 1024,
+        rate_limit: float = None,
+        rate_burst: float = None,
+        log_interval: float = 60,
+        disable_warnings: bool = False,
+        verbose: bool = False,
+    ):
+        if processes and not port:
+            raise ValueError("Worker processes need a fixed port to share.")
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.reuse_port = reuse_port
+        self.processes = processes
+        self.max_body_size = max_body_size
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.log_interval = log_interval
+        self.disable_warnings = disable_warnings
+        self.verbose = verbose
+        self._routes: Dict[str, _Registration] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._ipc: Optional[_IPCServer] = None
+        self._ipc_dir: Optional[str] = None
+        self._workers: List[multiprocessing.Process] = []
+        self._subscriptions: Set[VoteSubscription] = set()
+        self._limiter = _SourceLimiter(rate_limit, rate_burst) if rate_limit else None
+        self._rejections = _RejectionLog(log_interval, enabled=not disable_warnings)
+        # client_max_size also covers chunked bodies, which don't say how long they are up front.
+        self.app = web.Application(client_max_size=max_body_size)
+        self.app.router.add_route("POST", "/{path:.*}", self._route)
+
+    async def _route(self, request: web.Request) -> web.Response:
+        rejected = _check_request(request, self._limiter, self.max_body_size, self._rejections)
+        registration = self._routes.get(request.path)
+        if rejected is not None:
+            status, body, headers = rejected
+        elif registration is None:
+            status, body, headers = _NOT_FOUND
+        else:
+            status, body, headers = await registration.handler(
+                request.remote, request.headers.get("Authorization", ""), request.json
+            )
+        return web.Response(body=body, status=status, headers=headers)
+
+    async def _route_forwarded(self, path: str, remote: str, authorization: str, data: dict) -> Reply:
+        # Votes received by worker processes, already parsed.
+        registration = self._routes.get(path)
+        if registration is None:
+            return _NOT_FOUND
+
+        async def read():
+            return data
+
+        return await registration.handler(remote, authorization, read)
+
+    @property
+    def paths(self) -> List[str]:
+        r"""Every path that has a bot registered on it."""
+        return list(self._routes)
+
+    @property
+    def rejections(self) -> Dict[str, int]:
+        r"""How many requests have been rejected (by this process), by reason."""
+        return dict(self._rejections.totals)
+
+    @property
+    def addresses(self) -> List[Tuple]:
+        r"""The addresses the server is listening on. Only available once started."""
+        if self._runner is None:
+            raise RuntimeError("The webhook server has not been started.")
+        return self._runner.addresses
+
+    async def register(
+        self,
+        bot,
+        *,
+        path: str = "/",
+        auth: str = None,
+        workers: int = 0,
+        max_queue: int = 1000,
+        dispatcher: VoteDispatcher = None,
+        dedup_window: float = 0,
+        deduplicator: VoteDeduplicator = None,
+        journal_path: str = None,
+        journal: VoteJournal = None,
+        batch_size: int = 0,
+        batch_delay: float = 1.0,
+        batcher: VoteBatcher = None,
+        analytics: VoteAnalytics = None,
+    ):
+        r"""
+        Starts receiving votes for a bot on the given path. See :func:`start_server` for what each option does.
+
+        If the bot has a journal, any votes left unhandled in it are dispatched before this returns.
+
+        :param bot: The bot to dispatch votes to. This can be None, if votes are only read through a batcher or
+            :meth:`votes`.
+        :param path: The path top.gg sends this bot's votes to.
+        :param auth: The authorization set on top.gg for this bot.
+        :raises ValueError: A bot is already registered on this path.
+        """
+        if path in self._routes:
+            raise ValueError(f"A bot is already registered on {path!r}.")
+        if dispatcher is None and workers:
+            dispatcher = VoteDispatcher(bot, workers=workers, max_queue=max_queue)
+        if deduplicator is None and dedup_window:
+            deduplicator = VoteDeduplicator(dedup_window)
+        if journal is None and journal_path:
+            journal = VoteJournal(journal_path)
+        if batcher is None and batch_size:
+            batcher = VoteBatcher(bot, max_size=batch_size, max_delay=batch_delay)
+        if journal is not None and dispatcher is not None and dispatcher.journal is None:
+            dispatcher.journal = journal
+        if journal is not None and batcher is not None and batcher.journal is None:
+            batcher.journal = journal
+
+        async def publish(vote):
+            for subscription in tuple(self._subscriptions):
+                if subscription.path is None or subscription.path == path:
+                    await subscription.put(vote)
+
+        if journal is not None:
+            await _replay(bot, journal, dispatcher, batcher, analytics, publish)
+        handler = _create_handler(
+            bot,
+            auth,
+            disable_warnings=self.disable_warnings,
+            verbose=self.verbose,
+            dispatcher=dispatcher,
+            deduplicator=deduplicator,
+            journal=journal,
+            batcher=batcher,
+            analytics=analytics,
+            rejections=self._rejections,
+            publish=publish,
+        )
+        self._routes[path] = _Registration(path, bot, auth, handler, dispatcher, journal, batcher)
+        self._update_workers()
+        logger.debug("Registered %r on %s.", bot, path)
+
+    async def unregister(self, path: str, *, close: bool = True):
+        r"""
+        Stops receiving votes on the given path. Votes sent to it afterwards get a 404.
+
+        :param path: The path the bot was registered on.
+        :param close: Whether to wait for the bot's queued votes and batches to be handled, then close its journal.
+        :raises KeyError: No bot is registered on this path.
+        """
+        registration = self._routes.pop(path)
+        self._update_workers()
+        logger.debug("Unregistered %r from %s.", registration.bot, path)
+        if not close:
+            return
+        if registration.dispatcher is not None:
+            await registration.dispatcher.close()
+        if registration.batcher is not None:
+            await registration.batcher.close()
+        if registration.journal is not None:
+            await registration.journal.close()
+
+    def votes(
+        self, path: str = None, *, max_size: int = 1000, overflow: str = "drop_oldest", spill_path: str = None
+    ) -> VoteSubscription:
+        r"""
+        Subscribes to accepted votes, to be read with ``async for``. See :class:`VoteSubscription` for the options.
+
+        Every subscription gets every vote (for its path), independently of the others and of ``on_vote``.
+
+        .. code-block::
+
+            async with server.votes("/one", overflow="spill") as votes:
+                async for vote in votes:
+                    await reward(vote.user)
+
+        :param path: Only stream votes for the bot registered on this path. None streams every vote.
+        :rtype: :class:`VoteSubscription`
+        """
+        registration = self._routes.get(path) if path is not None else None
+        subscription = VoteSubscription(
+            path=path,
+            max_size=max_size,
+            overflow=overflow,
+            spill_path=spill_path,
+            state=registration.bot if registration is not None else None,
+            on_close=self._subscriptions.discard,
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    async def start(self):
+        r"""
+        Starts listening for votes, starting the worker processes first if there are any.
+
+        :raises RuntimeError: A worker process failed to start (for example, because the port is in use).
+        """
+        if self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        if self.unix_path:
+            await web.UnixSite(self._runner, self.unix_path).start()
+        if self.processes:
+            await self._start_workers()
+        elif self.port is not None:
+            await web.TCPSite(self._runner, self.host, self.port, reuse_port=self.reuse_port or None).start()
+        logger.log(
+            logging.INFO if self.verbose else logging.DEBUG,
+            "Started top.gg webhook server on %s with %d bot(s) and %d worker process(es).",
+            ", ".join(map(str, [f"{self.host}:{self.port}"] if self.processes else self._runner.addresses)),
+            len(self._routes),
+            self.processes,
+        )
+
+    def _update_workers(self):
+        # Worker processes check paths and auth themselves, before reading the body, so they need to know them.
+        if self._ipc is not None:
+            self._ipc.update_routes({path: registration.auth for path, registration in self._routes.items()})
+
+    async def _start_workers(self, timeout: float = 30):
+        self._ipc_dir = tempfile.mkdtemp(prefix="toppy-")
+        ipc_path = os.path.join(self._ipc_dir, "votes.sock")
+        self._ipc = _IPCServer(ipc_path, self._route_forwarded, self.max_body_size)
+        self._update_workers()
+        await self._ipc.start()
+        # Spawn (rather than fork), so that the workers don't inherit the bot's event loop and connections.
+        context = multiprocessing.get_context("spawn")
+        for n in range(self.processes):
+            worker = context.Process(
+                target=_worker_main,
+                args=(
+                    self.host,
+                    self.port,
+                    ipc_path,
+                    self.verbose,
+                    self.max_body_size,
+                    self.rate_limit,
+                    self.rate_burst,
+                    self.log_interval,
+                    self.disable_warnings,
+                ),
+                name=f"toppy-webhook-{n}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+        # Each worker connects once it is listening.
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        while self._ipc.connected < self.processes:
+            if any(worker.exitcode is not None for worker in self._workers) or loop.time() > deadline:
+                await self.close()
+                raise RuntimeError("A webhook worker process failed to start.")
+            await asyncio.sleep(0.05)
+
+    async def _stop_workers(self, timeout: float = 10):
+        loop = asyncio.get_event_loop()
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.terminate()  # SIGTERM, which the worker handles by finishing its in-flight requests
+        for worker in self._workers:
+            await loop.run_in_executor(None, worker.join, timeout)
+            if worker.is_alive():
+                logger.warning("Webhook worker %s didn't stop in time, killing it.", worker.name)
+                worker.kill()
+        self._workers = []
+        if self._ipc is not None:
+            await self._ipc.close()
+            self._ipc = None
+        if self._ipc_dir is not None:
+            shutil.rmtree(self._ipc_dir, ignore_errors=True)
+            self._ipc_dir = None
+
+    async def close(self):
+        r"""
+        Shuts the server down gracefully: stops accepting connections, waits for in-flight requests (including those
+        in worker processes), then unregisters every bot, handling any votes they still have queued. Finally, every
+        subscription is closed, which ends its ``async for`` once the votes it has buffered have been read.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        await self._stop_workers()
+        for path in list(self._routes):
+            await self.unregister(path)
+        for subscription in tuple(self._subscriptions):
+            subscription.close()
+
+    async def __aenter__(self) -> "WebhookServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    def __repr__(self):
+        return f"WebhookServer(host={self.host!r}, port={self.port}, paths={self.paths})"
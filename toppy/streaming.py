@@ -0,0 +1,132 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Optional
+
+
+__all__ = (
+    "iter_json_array",
+)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _StreamReader:
+    """
+    A tiny pull-based JSON reader that works on an async stream of byte chunks.
+
+    It only understands enough structure to walk through arrays and objects, and hands every value it needs
+    to the stdlib decoder, so only the value currently being decoded has to be held in memory.
+    """
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    async def _fill(self) -> bool:
+        """Reads the next chunk into the buffer, discarding everything already consumed."""
+        if self.eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            text = self._utf8.decode(b"", final=True)
+        else:
+            text = self._utf8.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    async def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not await self._fill():
+                raise ValueError("Unexpected end of JSON stream.")
+
+    async def expect(self, char: str):
+        """Consumes the next non-whitespace character, raising ValueError if it isn't ``char``."""
+        got = await self.peek()
+        if got != char:
+            raise ValueError(f"Expected {char!r} at position {self.pos}, got {got!r}.")
+        self.pos += 1
+
+    async def value(self) -> Any:
+        """Decodes the next complete JSON value."""
+        await self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not await self._fill():
+                    raise
+                continue
+            if end == len(self.buffer) and await self._fill():
+                # A number (or literal) that ends exactly on a chunk boundary may continue in the next chunk.
+                continue
+            self.pos = end
+            return obj
+
+    async def array(self) -> AsyncIterator[Any]:
+        """Yields each element of the next JSON array, one at a time."""
+        await self.expect("[")
+        if await self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield await self.value()
+            separator = await self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' at position {self.pos - 1}, got {separator!r}.")
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes], key: str = None, *, meta: Optional[dict] = None
+) -> AsyncIterator[Any]:
+    r"""
+    Incrementally decodes a JSON array from a stream of bytes, yielding each element as soon as it is complete.
+
+    :param chunks: An async iterable of raw byte chunks, such as ``response.content.iter_chunked(n)``.
+    :param key: If the document is an object, the key holding the array to stream (e.g. ``"results"``).
+        If None, the document itself must be an array.
+    :param meta: An optional dictionary to store every other top-level key of the object in.
+        Keys that appear after ``key`` are only available once iteration has finished.
+    :type key: Optional[:class:`py:str`]
+    :type meta: Optional[:class:`py:dict`]
+    :raises ValueError: The stream was not valid JSON, or did not have the expected shape.
+    """
+    reader = _StreamReader(chunks)
+    if key is None:
+        async for item in reader.array():
+            yield item
+        return
+
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        return
+    while True:
+        name = await reader.value()
+        await reader.expect(":")
+        if name == key:
+            async for item in reader.array():
+                yield item
+        else:
+            value = await reader.value()
+            if meta is not None:
+                meta[name] = value
+        separator = await reader.peek()
+        reader.pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' at position {reader.pos - 1}, got {separator!r}.")